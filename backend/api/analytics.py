@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from typing import List, Optional, Union
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status, Query
+from typing import Dict, List, Optional, Union
 from pydantic import BaseModel
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from core.analytics_engine import calculate_engagement_rate, merge_monthly_stats, merge_daily_stats, merge_series, reach_weighted_rate
+from core.cache import response_cache
+from core.trajectory import TRAJECTORY_COLUMNS, trajectory_matrix, summarize_days, observed_value
+from core.config import settings
 from models.user import User
 from repositories.instagram_repository import instagram_repository
+from api.conditional import get_cache_key, check_not_modified
 from middleware.auth.simple_auth import get_current_user
 
 router = APIRouter()
@@ -29,6 +35,7 @@ class MonthlyStats(BaseModel):
     month: str
     followers_count: int
     follows_count: int
+    new_followers: int = 0
     media_count: int
     profile_views: int
     website_clicks: int
@@ -36,6 +43,8 @@ class MonthlyStats(BaseModel):
     total_comments: int
     total_shares: int
     total_saved: int
+    total_reach: int = 0
+    avg_engagement_rate: float = 0.0
 
 class YearlyAnalytics(BaseModel):
     account_id: str
@@ -46,24 +55,131 @@ class YearlyAnalytics(BaseModel):
 class DailyStats(BaseModel):
     date: date
     posts_count: int
-    new_followers: int
+    # None for days inside a downsampled (weekly/monthly) period
+    new_followers: Optional[int] = None
     reach: int
-    profile_views: int
-    website_clicks: int
+    profile_views: Optional[int] = None
+    website_clicks: Optional[int] = None
 
 class MonthlyAnalytics(BaseModel):
     account_id: str
     month: str
     daily_stats: List[DailyStats]
 
-def calculate_engagement_rate(like_count: int, comments_count: int, shares: int, saved: int, reach: int) -> float:
-    """Calculate engagement rate (small decimal 1 place)"""
-    if reach == 0:
-        return 0.0
-    
-    total_engagements = like_count + comments_count + shares + saved
-    rate = (total_engagements / reach) * 100
-    return round(rate, 1)
+class SeriesPoint(BaseModel):
+    period: date
+    posts_count: int
+    total_likes: int
+    total_comments: int
+    total_shares: int
+    total_saved: int
+    total_reach: int
+    avg_engagement_rate: float
+    followers_count: int
+    # None for periods inside a coarser downsampled period
+    new_followers: Optional[int] = None
+    profile_views: Optional[int] = None
+    website_clicks: Optional[int] = None
+
+class SeriesAnalytics(BaseModel):
+    account_id: str
+    interval: str
+    start_date: date
+    end_date: date
+    series: List[SeriesPoint]
+
+class TrajectoryPoint(BaseModel):
+    day: int
+    posts_count: int
+    mean: Optional[float] = None
+    median: Optional[float] = None
+
+class PostTrajectory(BaseModel):
+    ig_media_id: str
+    published_date: date
+    milestones: Dict[str, Optional[int]]
+
+class TrajectoryAnalytics(BaseModel):
+    account_id: str
+    metric: str
+    days: int
+    curve: List[TrajectoryPoint]
+    milestones: List[TrajectoryPoint]
+    posts: List[PostTrajectory]
+
+class OverviewPost(BaseModel):
+    ig_media_id: str
+    timestamp: datetime
+    media_type: str
+    media_url: str
+    thumbnail_url: Optional[str] = None
+    permalink: str
+    like_count: int
+    comments_count: int
+    reach: Optional[int] = None
+    engagement_rate: Optional[float] = None
+
+class LatestInsights(BaseModel):
+    latest_date: Optional[date] = None
+    followers_count: Optional[int] = None
+    follows_count: Optional[int] = None
+    media_count: Optional[int] = None
+    profile_views: Optional[int] = None
+    website_clicks: Optional[int] = None
+
+class MonthToDateStats(BaseModel):
+    posts_count: int
+    total_likes: int
+    total_comments: int
+    total_shares: int
+    total_saved: int
+    total_reach: int
+    profile_views: int
+    website_clicks: int
+
+class AccountOverview(BaseModel):
+    ig_user_id: str
+    name: str
+    username: str
+    profile_picture_url: Optional[str] = None
+    latest_insights: LatestInsights
+    month_to_date: MonthToDateStats
+    top_posts: List[OverviewPost]
+
+class AnalyticsOverview(BaseModel):
+    month: str
+    accounts: List[AccountOverview]
+
+# Days of account stats to look back so early-month overviews still show latest insights
+OVERVIEW_INSIGHTS_LOOKBACK_DAYS = 7
+
+# Period units supported by the series endpoint (weeks start on Monday)
+SERIES_INTERVALS = ['day', 'week', 'month']
+# Longest range served by the series endpoint (about 3 years of daily points)
+SERIES_MAX_DAYS = 1100
+
+# Days since publish reported as "day-N" performance by default
+DEFAULT_TRAJECTORY_MILESTONES = [1, 7, 30]
+TRAJECTORY_MAX_DAYS = 365
+
+def get_post_engagement_rate(post: Dict) -> Optional[float]:
+    """Get engagement rate stored with the latest stats (small decimal 1 place)"""
+    rate = post.get('engagement_rate')
+    if rate is None:
+        # Stats saved before the rate was stored
+        rate = calculate_engagement_rate(
+            like_count=post.get('like_count'),
+            comments_count=post.get('comments_count'),
+            shares=post.get('shares'),
+            saved=post.get('saved'),
+            reach=post.get('reach')
+        )
+    return round(float(rate), 1) if rate is not None else None
+
+async def gather_repository_queries(*queries):
+    """Run independent repository reads concurrently, each bounded by the analytics query timeout"""
+    timeout = settings.ANALYTICS_QUERY_TIMEOUT
+    return await asyncio.gather(*(asyncio.wait_for(query, timeout=timeout) for query in queries))
 
 @router.get("/posts/{account_id}", response_model=List[PostAnalytics])
 async def get_posts_analytics(
@@ -74,9 +190,26 @@ async def get_posts_analytics(
     sort_by: str = Query('timestamp', description="Sort by field: timestamp, like_count, reach, engagement_rate"),
     sort_order: str = Query('desc', description="Sort order: asc, desc"),
     limit: int = Query(25, ge=1, le=100, description="Limit number of results"),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+    response: Response = None
 ):
     """投稿分析データを取得（フィルタリング・ソート対応）"""
+    cache_key = await get_cache_key('posts', account_id, {
+        'start_date': start_date,
+        'end_date': end_date,
+        'media_type': media_type,
+        'sort_by': sort_by,
+        'sort_order': sort_order,
+        'limit': limit
+    }, request)
+    not_modified = check_not_modified(request, response, cache_key)
+    if not_modified is not None:
+        return not_modified
+    cached = response_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        return cached
+    
     # Verify account exists
     account = await instagram_repository.get_by_id(account_id)
     if not account:
@@ -101,7 +234,9 @@ async def get_posts_analytics(
                     start_date=start_datetime,
                     end_date=end_datetime, 
                     media_type=m_type,
-                    limit=limit
+                    limit=limit,
+                    sort_by=sort_by,
+                    descending=(sort_order.lower() == 'desc')
                 )
                 posts_data.extend(posts)
         else:
@@ -111,20 +246,15 @@ async def get_posts_analytics(
                 start_date=start_datetime,
                 end_date=end_datetime,
                 media_type=None,
-                limit=limit
+                limit=limit,
+                sort_by=sort_by,
+                descending=(sort_order.lower() == 'desc')
             )
         
-        # Convert to response model with engagement rate calculation
+        # Convert to response model with stored engagement rate
         result = []
         for post in posts_data:
-            # Calculate engagement rate
-            engagement_rate = calculate_engagement_rate(
-                like_count=post.get('like_count', 0),
-                comments_count=post.get('comments_count', 0),
-                shares=post.get('shares', 0),
-                saved=post.get('saved', 0),
-                reach=post.get('reach', 1)  # Avoid division by zero
-            )
+            engagement_rate = get_post_engagement_rate(post)
             
             # Parse timestamp string to datetime
             timestamp_str = post['timestamp']
@@ -153,7 +283,7 @@ async def get_posts_analytics(
             )
             result.append(post_analytics)
         
-        # Sort results if requested
+        # Sort results if requested (engagement_rate is already ordered in the query; this merges media types)
         if sort_by and result:
             reverse_sort = (sort_order.lower() == 'desc')
             
@@ -167,7 +297,10 @@ async def get_posts_analytics(
                 result.sort(key=lambda x: x.engagement_rate or 0, reverse=reverse_sort)
         
         # Apply limit after sorting (in case multiple media types were requested)
-        return result[:limit]
+        result = result[:limit]
+        if cache_key:
+            response_cache.set(cache_key, result)
+        return result
         
     except Exception as e:
         raise HTTPException(
@@ -179,7 +312,9 @@ async def get_posts_analytics(
 async def get_yearly_analytics(
     account_id: str,
     year: Optional[int] = Query(None, description="対象年（未指定時は現在年）"),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+    response: Response = None
 ):
     """年間分析データを取得"""
     # Set default year if not provided
@@ -198,6 +333,14 @@ async def get_yearly_analytics(
             detail="年は2020年から2030年の範囲で指定してください"
         )
     
+    cache_key = await get_cache_key('yearly', account_id, {'year': year}, request)
+    not_modified = check_not_modified(request, response, cache_key)
+    if not_modified is not None:
+        return not_modified
+    cached = response_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        return cached
+    
     # Verify account exists
     account = await instagram_repository.get_by_id(account_id)
     if not account:
@@ -207,96 +350,50 @@ async def get_yearly_analytics(
         )
     
     try:
-        # Get monthly account stats and media aggregation
-        account_stats = await instagram_repository.get_monthly_account_stats(account_id, year)
-        media_stats = await instagram_repository.get_monthly_media_aggregation(account_id, year)
-        total_posts = await instagram_repository.get_total_posts_count(account_id, year)
-        
-        # Merge data by month and calculate metrics
-        monthly_data = {}
-        
-        # Process account stats
-        for stat in account_stats:
-            month = stat['month']
-            monthly_data[month] = {
-                'month': month,
-                'followers_count': stat['followers_count'],
-                'follows_count': 0,  # Will be calculated as difference
-                'media_count': 0,
-                'profile_views': stat['profile_views'],
-                'website_clicks': stat['website_clicks'],
-                'total_likes': 0,
-                'total_comments': 0,
-                'total_shares': 0,
-                'total_saved': 0
-            }
-        
-        # Process media stats
-        for stat in media_stats:
-            month = stat['month']
-            if month in monthly_data:
-                monthly_data[month].update({
-                    'media_count': stat['media_count'],
-                    'total_likes': stat['total_likes'],
-                    'total_comments': stat['total_comments'],
-                    'total_shares': stat['total_shares'],
-                    'total_saved': stat['total_saved']
-                })
-            else:
-                monthly_data[month] = {
-                    'month': month,
-                    'followers_count': 0,
-                    'follows_count': 0,
-                    'media_count': stat['media_count'],
-                    'profile_views': 0,
-                    'website_clicks': 0,
-                    'total_likes': stat['total_likes'],
-                    'total_comments': stat['total_comments'],
-                    'total_shares': stat['total_shares'],
-                    'total_saved': stat['total_saved']
-                }
+        # Get monthly account stats, media aggregation and post count concurrently
+        account_stats, media_stats, total_posts = await gather_repository_queries(
+            instagram_repository.get_monthly_account_stats(account_id, year),
+            instagram_repository.get_monthly_media_aggregation(account_id, year),
+            instagram_repository.get_total_posts_count(account_id, year)
+        )
         
-        # Sort by month and calculate follows_count (new followers)
-        sorted_months = sorted(monthly_data.keys())
-        monthly_stats = []
-        prev_followers = 0
-        
-        for month in sorted_months:
-            month_data = monthly_data[month]
-            current_followers = month_data['followers_count']
-            
-            # Calculate new followers as difference from previous month
-            if prev_followers > 0:
-                month_data['follows_count'] = current_followers - prev_followers
-            else:
-                month_data['follows_count'] = current_followers
-            
-            monthly_stats.append(MonthlyStats(**month_data))
-            prev_followers = current_followers
+        # Merge data by month (follows_count is the month's follower growth maintained at ingestion)
+        monthly_stats = [
+            MonthlyStats(**month_data)
+            for month_data in merge_monthly_stats(account_stats, media_stats)
+        ]
         
         # Handle empty data case
         if not monthly_stats:
-            return YearlyAnalytics(
+            result = YearlyAnalytics(
                 account_id=account_id,
                 monthly_stats=[],
                 total_posts=0,
                 avg_engagement_rate=0.0
             )
+        else:
+            # Reach-weighted average of the monthly engagement rates
+            avg_engagement_rate = round(reach_weighted_rate(
+                [stat.avg_engagement_rate for stat in monthly_stats],
+                [stat.total_reach for stat in monthly_stats]
+            ), 1)
+            
+            result = YearlyAnalytics(
+                account_id=account_id,
+                monthly_stats=monthly_stats,
+                total_posts=total_posts,
+                avg_engagement_rate=avg_engagement_rate
+            )
         
-        # Calculate average engagement rate
-        total_engagements = sum(stat.total_likes + stat.total_comments + stat.total_shares + stat.total_saved for stat in monthly_stats)
-        avg_engagement_rate = 0.0
-        if total_posts > 0:
-            # Simple approximation for avg engagement rate
-            avg_engagement_rate = round((total_engagements / total_posts) * 0.1, 1)  # Rough estimation
+        if cache_key:
+            response_cache.set(cache_key, result)
+        return result
         
-        return YearlyAnalytics(
-            account_id=account_id,
-            monthly_stats=monthly_stats,
-            total_posts=total_posts,
-            avg_engagement_rate=avg_engagement_rate
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Analytics query timed out"
         )
-        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -308,7 +405,9 @@ async def get_monthly_analytics(
     account_id: str,
     year: Optional[int] = Query(None, description="対象年（未指定時は現在年）"),
     month: Optional[int] = Query(None, ge=1, le=12, description="対象月（未指定時は現在月）"),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+    response: Response = None
 ):
     """月間分析データを取得"""
     # Set default year and month if not provided
@@ -342,6 +441,14 @@ async def get_monthly_analytics(
             detail="月は1から12の範囲で指定してください"
         )
     
+    cache_key = await get_cache_key('monthly', account_id, {'year': year, 'month': month}, request)
+    not_modified = check_not_modified(request, response, cache_key)
+    if not_modified is not None:
+        return not_modified
+    cached = response_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        return cached
+    
     # Verify account exists
     account = await instagram_repository.get_by_id(account_id)
     if not account:
@@ -351,67 +458,298 @@ async def get_monthly_analytics(
         )
     
     try:
-        # Get daily account stats and media aggregation
-        account_stats = await instagram_repository.get_daily_account_stats(account_id, year, month)
-        media_stats = await instagram_repository.get_daily_media_stats_aggregation(account_id, year, month)
-        
-        # Merge account and media data by date
-        daily_data = {}
-        
-        # Process account stats (includes profile_views, website_clicks, new_followers)
-        for stat in account_stats:
-            date = stat['date']
-            daily_data[date] = {
-                'date': date,
-                'posts_count': stat.get('posts_count', 0),
-                'new_followers': stat.get('new_followers', 0),
-                'reach': stat.get('reach', 0),
-                'profile_views': stat.get('profile_views', 0),
-                'website_clicks': stat.get('website_clicks', 0)
-            }
-        
-        # Process media stats (includes posts_count, reach)
-        for stat in media_stats:
-            date = stat['date']
-            if date in daily_data:
-                # Update posts_count and reach from media data
-                daily_data[date]['posts_count'] = stat.get('posts_count', 0)
-                daily_data[date]['reach'] = stat.get('reach', 0)
-            else:
-                # Create new entry if not exists
-                daily_data[date] = {
-                    'date': date,
-                    'posts_count': stat.get('posts_count', 0),
-                    'new_followers': 0,
-                    'reach': stat.get('reach', 0),
-                    'profile_views': 0,
-                    'website_clicks': 0
-                }
-        
-        # Sort by date and convert to DailyStats
-        sorted_dates = sorted(daily_data.keys())
-        daily_stats = []
+        # Get daily account stats and media aggregation concurrently
+        account_stats, media_stats = await gather_repository_queries(
+            instagram_repository.get_daily_account_stats(account_id, year, month),
+            instagram_repository.get_daily_media_stats_aggregation(account_id, year, month)
+        )
         
-        for date in sorted_dates:
-            day_data = daily_data[date]
-            daily_stats.append(DailyStats(
-                date=day_data['date'],
-                posts_count=day_data['posts_count'],
-                new_followers=day_data['new_followers'],
-                reach=day_data['reach'],
-                profile_views=day_data['profile_views'],
-                website_clicks=day_data['website_clicks']
-            ))
+        # Merge account and media data by date (posts_count and reach come from media data)
+        daily_stats = [
+            DailyStats(**day_data)
+            for day_data in merge_daily_stats(account_stats, media_stats)
+        ]
         
         # Handle empty data case - return empty daily_stats instead of error
-        return MonthlyAnalytics(
+        result = MonthlyAnalytics(
             account_id=account_id,
             month=f"{year}-{month:02d}",
             daily_stats=daily_stats
         )
         
+        if cache_key:
+            response_cache.set(cache_key, result)
+        return result
+        
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Analytics query timed out"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch monthly analytics: {str(e)}"
+        )
+
+@router.get("/series/{account_id}", response_model=SeriesAnalytics)
+async def get_series_analytics(
+    account_id: str,
+    start_date: date = Query(..., description="開始日 (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="終了日 (YYYY-MM-DD、未指定時は今日)"),
+    interval: str = Query('day', description="集計単位: day, week, month"),
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+    response: Response = None
+):
+    """任意期間の分析データを取得（データのない期間も0埋めした連続系列）"""
+    if end_date is None:
+        end_date = date.today()
+    
+    # Validate parameters
+    if interval not in SERIES_INTERVALS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="集計単位は day, week, month のいずれかで指定してください"
+        )
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="終了日は開始日以降で指定してください"
+        )
+    if (end_date - start_date).days > SERIES_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"期間は{SERIES_MAX_DAYS}日以内で指定してください"
+        )
+    
+    cache_key = await get_cache_key('series', account_id, {
+        'start_date': start_date,
+        'end_date': end_date,
+        'interval': interval
+    }, request)
+    not_modified = check_not_modified(request, response, cache_key)
+    if not_modified is not None:
+        return not_modified
+    cached = response_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        return cached
+    
+    # Verify account exists
+    account = await instagram_repository.get_by_id(account_id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram account not found"
+        )
+    
+    try:
+        # Both series are aggregated and zero-filled over the same calendar by the database
+        account_series, media_series = await gather_repository_queries(
+            instagram_repository.get_account_stats_series(account_id, start_date, end_date, interval),
+            instagram_repository.get_media_stats_series(account_id, start_date, end_date, interval)
+        )
+        
+        result = SeriesAnalytics(
+            account_id=account_id,
+            interval=interval,
+            start_date=start_date,
+            end_date=end_date,
+            series=[SeriesPoint(**point) for point in merge_series(account_series, media_series)]
+        )
+        
+        if cache_key:
+            response_cache.set(cache_key, result)
+        return result
+    
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Analytics query timed out"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch series analytics: {str(e)}"
+        )
+
+@router.get("/trajectories/{account_id}", response_model=TrajectoryAnalytics)
+async def get_trajectory_analytics(
+    account_id: str,
+    metric: str = Query('reach', description="対象メトリクス: reach, like_count, saved"),
+    days: int = Query(30, ge=1, le=TRAJECTORY_MAX_DAYS, description="成長曲線の日数（投稿からの経過日数）"),
+    milestones: List[int] = Query(DEFAULT_TRAJECTORY_MILESTONES, description="Day-N指標の経過日数"),
+    published_since: Optional[date] = Query(None, description="対象投稿の投稿日の下限 (YYYY-MM-DD)"),
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+    response: Response = None
+):
+    """投稿の成長曲線とDay-N指標を取得（全投稿の経過日数別の推移）"""
+    # Validate parameters
+    if metric not in TRAJECTORY_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="メトリクスは reach, like_count, saved のいずれかで指定してください"
+        )
+    if not milestones or any(day < 0 or day > TRAJECTORY_MAX_DAYS for day in milestones):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Day-N指標の経過日数は0から{TRAJECTORY_MAX_DAYS}の範囲で指定してください"
+        )
+    
+    cache_key = await get_cache_key('trajectories', account_id, {
+        'metric': metric,
+        'days': days,
+        'milestones': milestones,
+        'published_since': published_since
+    }, request)
+    not_modified = check_not_modified(request, response, cache_key)
+    if not_modified is not None:
+        return not_modified
+    cached = response_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        return cached
+    
+    # Verify account exists
+    account = await instagram_repository.get_by_id(account_id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram account not found"
+        )
+    
+    try:
+        trajectories, = await gather_repository_queries(
+            instagram_repository.get_media_trajectories(account_id, published_since)
+        )
+        
+        # Posts x days-since-publish matrix covering the curve and every milestone
+        matrix = trajectory_matrix(trajectories, metric, max(days, *milestones))
+        summary = summarize_days(matrix)
+        
+        posts = [
+            PostTrajectory(
+                ig_media_id=trajectory['ig_media_id'],
+                published_date=trajectory['published_date'],
+                milestones={
+                    f"day_{day}": observed_value(matrix, i, day)
+                    for day in milestones
+                }
+            ) for i, trajectory in enumerate(trajectories)
+        ]
+        
+        result = TrajectoryAnalytics(
+            account_id=account_id,
+            metric=metric,
+            days=days,
+            curve=[TrajectoryPoint(**point) for point in summary[:days + 1]],
+            milestones=[TrajectoryPoint(**summary[day]) for day in milestones],
+            posts=posts
+        )
+        
+        if cache_key:
+            response_cache.set(cache_key, result)
+        return result
+    
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Analytics query timed out"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch trajectory analytics: {str(e)}"
+        )
+
+@router.get("/overview", response_model=AnalyticsOverview)
+async def get_analytics_overview(
+    top_posts: int = Query(3, ge=0, le=10, description="アカウント毎の上位投稿数（当月リーチ順）"),
+    current_user: User = Depends(get_current_user)
+):
+    """全アカウントの概要（最新インサイト・当月累計・上位投稿）を一括取得"""
+    now = datetime.now()
+    month_start = datetime(now.year, now.month, 1)
+    stats_start = min(month_start, now - timedelta(days=OVERVIEW_INSIGHTS_LOOKBACK_DAYS))
+    month_start_str = month_start.date().isoformat()
+    
+    accounts = await instagram_repository.get_all()
+    if not accounts:
+        return AnalyticsOverview(month=f"{now.year}-{now.month:02d}", accounts=[])
+    
+    try:
+        # Two set-based queries cover every account
+        ig_user_ids = [account.ig_user_id for account in accounts]
+        account_stats, recent_posts = await gather_repository_queries(
+            instagram_repository.get_recent_account_stats(ig_user_ids, stats_start),
+            instagram_repository.get_recent_media_posts_with_stats(ig_user_ids, month_start)
+        )
+        
+        overviews = []
+        for account in accounts:
+            stats_rows = account_stats.get(account.ig_user_id, [])
+            posts = recent_posts.get(account.ig_user_id, [])
+            
+            # Latest insights (rows are sorted by date)
+            latest = stats_rows[-1] if stats_rows else {}
+            latest_insights = LatestInsights(
+                latest_date=latest.get('date'),
+                followers_count=latest.get('followers_count'),
+                follows_count=latest.get('follows_count'),
+                media_count=latest.get('media_count'),
+                profile_views=latest.get('profile_views'),
+                website_clicks=latest.get('website_clicks')
+            )
+            
+            # Month-to-date totals
+            month_rows = [row for row in stats_rows if row['date'] >= month_start_str]
+            month_to_date = MonthToDateStats(
+                posts_count=len(posts),
+                total_likes=sum(post.get('like_count') or 0 for post in posts),
+                total_comments=sum(post.get('comments_count') or 0 for post in posts),
+                total_shares=sum(post.get('shares') or 0 for post in posts),
+                total_saved=sum(post.get('saved') or 0 for post in posts),
+                total_reach=sum(post.get('reach') or 0 for post in posts),
+                profile_views=sum(row.get('profile_views') or 0 for row in month_rows),
+                website_clicks=sum(row.get('website_clicks') or 0 for row in month_rows)
+            )
+            
+            # Top posts of the month by reach
+            ranked_posts = sorted(posts, key=lambda post: (post.get('reach') or 0, post.get('like_count') or 0), reverse=True)
+            overview_posts = [
+                OverviewPost(
+                    ig_media_id=post['ig_media_id'],
+                    timestamp=post['timestamp'],
+                    media_type=post['media_type'],
+                    media_url=post['media_url'],
+                    thumbnail_url=post.get('thumbnail_url'),
+                    permalink=post['permalink'],
+                    like_count=post.get('like_count') or 0,
+                    comments_count=post.get('comments_count') or 0,
+                    reach=post.get('reach'),
+                    engagement_rate=get_post_engagement_rate(post) if post.get('reach') else None
+                ) for post in ranked_posts[:top_posts]
+            ]
+            
+            overviews.append(AccountOverview(
+                ig_user_id=account.ig_user_id,
+                name=account.name,
+                username=account.username,
+                profile_picture_url=account.profile_picture_url,
+                latest_insights=latest_insights,
+                month_to_date=month_to_date,
+                top_posts=overview_posts
+            ))
+        
+        return AnalyticsOverview(month=f"{now.year}-{now.month:02d}", accounts=overviews)
+    
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Analytics query timed out"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch analytics overview: {str(e)}"
         )
\ No newline at end of file
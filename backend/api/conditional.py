@@ -0,0 +1,38 @@
+from typing import Optional, Tuple
+from fastapi import Request, Response, status
+from core.cache import response_cache
+from repositories.instagram_repository import instagram_repository
+
+def revalidation_requested(request: Optional[Request]) -> bool:
+    """Check whether the client asked for the current data version (Cache-Control: no-cache)"""
+    if request is None:
+        return False
+    directives = [directive.strip().lower() for directive in request.headers.get('cache-control', '').split(',')]
+    return 'no-cache' in directives
+
+async def get_cache_key(endpoint: str, account_id: str, params: dict, request: Optional[Request] = None) -> Optional[Tuple]:
+    """Build cache key for the account's current data version (None if version unavailable)"""
+    version = await instagram_repository.get_data_version(account_id, refresh=revalidation_requested(request))
+    if version is None:
+        return None
+    return response_cache.make_key(endpoint, account_id, version, params)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check If-None-Match header against ETag (weak comparison as per RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+def check_not_modified(request: Request, response: Response, cache_key: Optional[Tuple]) -> Optional[Response]:
+    """Attach ETag to the response; return 304 response when the client already has it"""
+    if cache_key is None or request is None:
+        return None
+    etag = response_cache.make_etag(cache_key)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi.responses import StreamingResponse
+from models.user import User
+from repositories.instagram_repository import instagram_repository
+from middleware.auth.simple_auth import get_current_user
+
+router = APIRouter()
+
+EXPORT_COLUMNS = [
+    'date',
+    'ig_media_id',
+    'timestamp',
+    'media_type',
+    'permalink',
+    'caption',
+    'like_count',
+    'comments_count',
+    'reach',
+    'views',
+    'shares',
+    'saved',
+    'engagement_rate'
+]
+
+MEDIA_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson'
+}
+
+async def stream_csv(account_id: str, start_date: Optional[date], end_date: Optional[date]):
+    """Stream export rows as CSV (header first, then one chunk per page)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue()
+    
+    async for rows in instagram_repository.iter_media_stats_export(account_id, start_date, end_date):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+async def stream_ndjson(account_id: str, start_date: Optional[date], end_date: Optional[date]):
+    """Stream export rows as newline-delimited JSON (one chunk per page)"""
+    async for rows in instagram_repository.iter_media_stats_export(account_id, start_date, end_date):
+        yield ''.join(
+            json.dumps({column: row.get(column) for column in EXPORT_COLUMNS}, ensure_ascii=False) + '\n'
+            for row in rows
+        )
+
+@router.get("/{account_id}")
+async def export_media_stats(
+    account_id: str,
+    format: str = Query('csv', pattern='^(csv|ndjson)$', description="出力形式: csv, ndjson"),
+    start_date: Optional[date] = Query(None, description="集計日の開始日 (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="集計日の終了日 (YYYY-MM-DD)"),
+    current_user: User = Depends(get_current_user)
+):
+    """投稿と日次統計をCSV / NDJSONでストリーミング出力"""
+    # Verify account exists
+    account = await instagram_repository.get_by_id(account_id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram account not found"
+        )
+    
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="開始日は終了日以前の日付を指定してください"
+        )
+    
+    stream = stream_csv if format == 'csv' else stream_ndjson
+    return StreamingResponse(
+        stream(account_id, start_date, end_date),
+        media_type=MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{account_id}_media_stats.{format}"'}
+    )
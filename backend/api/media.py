@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status, Query
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from models.user import User
 from repositories.instagram_repository import instagram_repository
+from api.conditional import get_cache_key, check_not_modified
 from middleware.auth.simple_auth import get_current_user
 
 router = APIRouter()
@@ -42,9 +43,16 @@ class MediaPostWithStats(BaseModel):
 async def get_media_posts(
     account_id: str,
     limit: Optional[int] = Query(25, ge=1, le=100),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+    response: Response = None
 ):
     """アカウントの投稿一覧を取得"""
+    cache_key = await get_cache_key('media', account_id, {'limit': limit}, request)
+    not_modified = check_not_modified(request, response, cache_key)
+    if not_modified is not None:
+        return not_modified
+    
     # Verify account exists
     account = await instagram_repository.get_by_id(account_id)
     if not account:
@@ -78,18 +86,16 @@ async def get_media_insights(
     current_user: User = Depends(get_current_user)
 ):
     """特定投稿のインサイトデータを取得"""
-    # Get latest stats from database
-    media_stats = await instagram_repository.get_media_stats(media_id)
+    # Get latest stats from database (the latest run stays in the table through archiving and compaction)
+    latest_stats = (await instagram_repository.get_latest_media_stats([media_id])).get(media_id)
     
-    if not media_stats:
+    # Posts without stats come back as default empty stats (no date)
+    if not latest_stats or latest_stats.get('date') is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Media insights not found"
         )
     
-    # Get latest stats (most recent entry)
-    latest_stats = media_stats[0]
-    
     # Convert to response model
     insights = []
     
@@ -127,7 +133,7 @@ async def collect_media_insights(
         )
     
     # Get account info for access token
-    account = await instagram_repository.get_by_id(target_media['ig_user_id'])
+    account = await instagram_repository.get_by_id(target_media['ig_user_id'], with_token=True)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -141,7 +147,8 @@ async def collect_media_insights(
         target_media['media_type'],
         account.access_token,
         target_media.get('like_count', 0),
-        target_media.get('comments_count', 0)
+        target_media.get('comments_count', 0),
+        target_media['ig_user_id']
     )
     
     if not result.get("success"):
@@ -165,7 +172,7 @@ async def collect_all_media_insights(
 ):
     """アカウントの全投稿のインサイトデータを収集"""
     # Verify account exists
-    account = await instagram_repository.get_by_id(account_id)
+    account = await instagram_repository.get_by_id(account_id, with_token=True)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -199,9 +206,20 @@ async def get_media_with_stats(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     media_type: Optional[str] = Query(None),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    request: Request = None,
+    response: Response = None
 ):
     """統計データ付きの投稿一覧を取得（投稿分析ページ用）"""
+    cache_key = await get_cache_key('media_stats', account_id, {
+        'start_date': start_date,
+        'end_date': end_date,
+        'media_type': media_type
+    }, request)
+    not_modified = check_not_modified(request, response, cache_key)
+    if not_modified is not None:
+        return not_modified
+    
     # Verify account exists
     account = await instagram_repository.get_by_id(account_id)
     if not account:
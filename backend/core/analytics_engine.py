@@ -0,0 +1,76 @@
+"""
+分析集計エンジン
+期間別の集計・0埋めはDB側の集計関数 (models/sql/migrations/003_analytics_functions.sql) で行い、
+ここではアカウント系列と投稿系列を期間キーで結合し、エンゲージメント率を計算する
+(結合するのは期間数分の行だけなので、標準の辞書操作で行う)
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+# Aggregated fields holding rates (all other aggregated fields are integer counts)
+RATE_FIELDS = {'avg_engagement_rate'}
+# Account flow metrics, NULL for periods inside a coarser rollup (kept as None instead of 0)
+NULLABLE_FIELDS = {'new_followers', 'profile_views', 'website_clicks'}
+
+def calculate_engagement_rate(like_count: int, comments_count: int, shares: int, saved: int, reach: Optional[int]) -> Optional[float]:
+    """Engagement rate in percent: (likes + comments + shares + saved) / reach (None when reach is unknown)"""
+    if reach is None:
+        return None
+    if reach == 0:
+        return 0.0
+    
+    total_engagements = (like_count or 0) + (comments_count or 0) + (shares or 0) + (saved or 0)
+    return round((total_engagements / reach) * 100, 2)
+
+def reach_weighted_rate(rates: List[float], reach: List[int]) -> float:
+    """Average engagement rate weighted by reach (0.0 when there is no reach)"""
+    total_reach = sum(reach_value or 0 for reach_value in reach)
+    if total_reach <= 0:
+        return 0.0
+    return round(sum((rate or 0) * (reach_value or 0) for rate, reach_value in zip(rates, reach)) / total_reach, 2)
+
+def field_value(name: str, value) -> Optional[float]:
+    """Plain Python value of an aggregated field (NULL rates become 0.0, NULL counts 0 unless nullable)"""
+    if name in RATE_FIELDS:
+        return float(value or 0)
+    if value is None:
+        return None if name in NULLABLE_FIELDS else 0
+    return int(value)
+
+def merge_by_key(key: str, sources: List[Tuple[List[Dict], List[str]]]) -> List[Dict]:
+    """Outer-join aggregated series on key, ordered by key; each source fills its own fields (0 where it has no row)"""
+    merged = {label: {key: label} for label in sorted({str(row[key]) for rows, _ in sources for row in rows})}
+    
+    for rows, fields in sources:
+        for merged_row in merged.values():
+            merged_row.update((name, 0.0 if name in RATE_FIELDS else 0) for name in fields)
+        for row in rows:
+            merged[str(row[key])].update((name, field_value(name, row.get(name))) for name in fields)
+    
+    return list(merged.values())
+
+def merge_monthly_stats(account_stats: List[Dict], media_stats: List[Dict]) -> List[Dict]:
+    """Merge monthly account and media aggregations (follows_count carries the monthly follower change)"""
+    account_fields = ['followers_count', 'new_followers', 'profile_views', 'website_clicks']
+    media_fields = [
+        'media_count', 'total_likes', 'total_comments', 'total_shares', 'total_saved', 'total_reach', 'avg_engagement_rate'
+    ]
+    rows = merge_by_key('month', [(account_stats, account_fields), (media_stats, media_fields)])
+    for row in rows:
+        row['follows_count'] = row['new_followers']
+    
+    return rows
+
+def merge_daily_stats(account_stats: List[Dict], media_stats: List[Dict]) -> List[Dict]:
+    """Merge daily account and media series (posts_count and reach come from media data)"""
+    account_fields = ['new_followers', 'profile_views', 'website_clicks']
+    media_fields = ['posts_count', 'reach']
+    return merge_by_key('date', [(account_stats, account_fields), (media_stats, media_fields)])
+
+def merge_series(account_series: List[Dict], media_series: List[Dict]) -> List[Dict]:
+    """Merge account and media series of the same periods"""
+    account_fields = ['followers_count', 'new_followers', 'profile_views', 'website_clicks']
+    media_fields = [
+        'posts_count', 'total_likes', 'total_comments', 'total_shares', 'total_saved', 'total_reach', 'avg_engagement_rate'
+    ]
+    return merge_by_key('period', [(account_series, account_fields), (media_series, media_fields)])
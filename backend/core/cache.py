@@ -0,0 +1,73 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from core.config import settings
+
+class ResponseCache:
+    """In-memory response cache keyed by endpoint, parameters and per-account data version"""
+
+    def __init__(self, max_entries: int, version_check_seconds: float):
+        self.max_entries = max_entries
+        self.version_check_seconds = version_check_seconds
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._versions: Dict[str, Tuple[str, float]] = {}
+
+    def make_key(self, endpoint: str, ig_user_id: str, version: str, params: Dict[str, Any]) -> Tuple:
+        """Build a cache key from endpoint, account, data version and query parameters"""
+        normalized = tuple(sorted(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in params.items()
+        ))
+        return (endpoint, ig_user_id, version, normalized)
+
+    def make_etag(self, key: Tuple) -> str:
+        """Build a strong ETag from a cache key"""
+        return '"' + hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32] + '"'
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get cached response (None on miss)"""
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key: Hashable, value: Any):
+        """Store response, evicting the least recently used entries beyond max_entries"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_known_version(self, ig_user_id: str) -> Optional[str]:
+        """Get data version seen recently enough to skip re-reading it from the database"""
+        known = self._versions.get(ig_user_id)
+        if known is None:
+            return None
+        version, checked_at = known
+        if time.monotonic() - checked_at > self.version_check_seconds:
+            return None
+        return version
+
+    def set_version(self, ig_user_id: str, version: str):
+        """Record the current data version; entries of older versions are dropped"""
+        known = self._versions.get(ig_user_id)
+        self._versions[ig_user_id] = (version, time.monotonic())
+        if known is not None and known[0] != version:
+            self.invalidate(ig_user_id)
+
+    def invalidate(self, ig_user_id: str):
+        """Drop all cached responses for an account"""
+        for key in [key for key in self._entries if key[1] == ig_user_id]:
+            del self._entries[key]
+
+    def clear(self):
+        """Drop all cached responses and known versions"""
+        self._entries.clear()
+        self._versions.clear()
+
+# Global response cache instance
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    version_check_seconds=settings.RESPONSE_CACHE_VERSION_CHECK_SECONDS
+)
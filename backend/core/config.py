@@ -11,6 +11,11 @@ class Settings:
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_ANON_KEY: str = os.getenv("SUPABASE_ANON_KEY", "")
     SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
+    # "supabase" or "local" (embedded SQLite file, aggregations on DuckDB)
+    DATABASE_BACKEND: str = os.getenv("DATABASE_BACKEND", "supabase")
+    LOCAL_DATABASE_PATH: str = os.getenv("LOCAL_DATABASE_PATH", "instagram_analytics.db")
+    # "duckdb" or "sqlite" (falls back to sqlite when DuckDB or its sqlite extension is unavailable)
+    LOCAL_AGGREGATION_ENGINE: str = os.getenv("LOCAL_AGGREGATION_ENGINE", "duckdb")
     
     # Instagram API
     INSTAGRAM_APP_ID: str = os.getenv("INSTAGRAM_APP_ID", "")
@@ -25,10 +30,39 @@ class Settings:
     # API
     API_V1_PREFIX: str = "/api/v1"
     
+    # Analytics
+    ANALYTICS_QUERY_TIMEOUT: float = float(os.getenv("ANALYTICS_QUERY_TIMEOUT", "10"))
+    
+    # Response cache (invalidated by per-account data version, see account_data_versions)
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    RESPONSE_CACHE_VERSION_CHECK_SECONDS: float = float(os.getenv("RESPONSE_CACHE_VERSION_CHECK_SECONDS", "5"))
+    
+    # Media insight refresh policy (daily while young, weekly until INSIGHT_REFRESH_WEEKLY_UNTIL_DAYS, then monthly)
+    INSIGHT_REFRESH_DAILY_UNTIL_DAYS: int = int(os.getenv("INSIGHT_REFRESH_DAILY_UNTIL_DAYS", "14"))
+    INSIGHT_REFRESH_WEEKLY_UNTIL_DAYS: int = int(os.getenv("INSIGHT_REFRESH_WEEKLY_UNTIL_DAYS", "90"))
+    # Daily relative reach growth that keeps an older post on the daily schedule
+    INSIGHT_REFRESH_HOT_VELOCITY: float = float(os.getenv("INSIGHT_REFRESH_HOT_VELOCITY", "0.02"))
+    # "nested": media list with expanded insights (calls per page), "per_metric": one insights call per post and metric
+    # Both modes only save insights of posts due under the refresh policy above
+    MEDIA_INSIGHTS_FETCH_MODE: str = os.getenv("MEDIA_INSIGHTS_FETCH_MODE", "nested")
+    
+    # Unsupported metric negative cache (see unsupported_media_metrics)
+    UNSUPPORTED_METRIC_CACHE_TTL_DAYS: int = int(os.getenv("UNSUPPORTED_METRIC_CACHE_TTL_DAYS", "30"))
+    UNSUPPORTED_METRIC_CACHE_PER_ACCOUNT: bool = os.getenv("UNSUPPORTED_METRIC_CACHE_PER_ACCOUNT", "false").lower() == "true"
+    
+    # Parquet archive of closed months of daily_media_stats (empty = disabled, see core/stats_archive.py)
+    STATS_ARCHIVE_PATH: str = os.getenv("STATS_ARCHIVE_PATH", "")
+    # Most recent months kept in the primary table (the current month included)
+    STATS_ARCHIVE_HOT_MONTHS: int = int(os.getenv("STATS_ARCHIVE_HOT_MONTHS", "3"))
+    
+    # Stats retention (per-day rows until STATS_RETENTION_DAILY_DAYS, then weekly, then monthly after STATS_RETENTION_WEEKLY_DAYS)
+    STATS_RETENTION_DAILY_DAYS: int = int(os.getenv("STATS_RETENTION_DAILY_DAYS", "180"))
+    STATS_RETENTION_WEEKLY_DAYS: int = int(os.getenv("STATS_RETENTION_WEEKLY_DAYS", "730"))
+    
     def __init__(self):
         """Validate required settings - PoC level validation"""
         # PoC: Only warn about missing settings, don't raise error
-        if not self.SUPABASE_URL or not self.SUPABASE_ANON_KEY:
+        if self.DATABASE_BACKEND == "supabase" and (not self.SUPABASE_URL or not self.SUPABASE_ANON_KEY):
             print("⚠️  Warning: SUPABASE_URL and SUPABASE_ANON_KEY not set")
             print("   Set these environment variables for full functionality")
 
@@ -1,16 +1,30 @@
+import threading
 from supabase import create_client, Client
 from core.config import settings
 
 class DatabaseConnection:
-    """Supabase database connection manager"""
+    """Database connection manager (Supabase or local embedded database, see DATABASE_BACKEND)"""
     
     def __init__(self):
         self._client: Client = None
+        self._lock = threading.Lock()
     
     @property
     def client(self) -> Client:
-        """Get Supabase client instance"""
+        """Get database client instance (LocalDatabase exposes the same query interface)"""
         if self._client is None:
+            # Concurrent first requests must not create (and initialize) two clients
+            with self._lock:
+                return self._create_client()
+        return self._client
+    
+    def _create_client(self) -> Client:
+        """Create the client of the configured backend unless another thread already did"""
+        if self._client is None:
+            if settings.DATABASE_BACKEND == "local":
+                from core.local_database import LocalDatabase
+                self._client = LocalDatabase(settings.LOCAL_DATABASE_PATH, settings.LOCAL_AGGREGATION_ENGINE)
+                return self._client
             if not settings.SUPABASE_URL or not settings.SUPABASE_ANON_KEY:
                 print("❌ Error: Cannot create Supabase client - missing environment variables")
                 return None
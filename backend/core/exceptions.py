@@ -24,5 +24,11 @@ class RateLimitError(InstagramAPIError):
 class DatabaseConnectionError(Exception):
     """データベース接続エラー"""
     def __init__(self, message: str = "データベースに接続できません"):
+        self.message = message
+        super().__init__(self.message)
+
+class LocalQueryError(Exception):
+    """ローカルDB (DATABASE_BACKEND=local) のクエリエラー"""
+    def __init__(self, message: str = "ローカルデータベースのクエリに失敗しました"):
         self.message = message
         super().__init__(self.message)
\ No newline at end of file
@@ -0,0 +1,635 @@
+"""
+ローカル組み込みデータベース (DATABASE_BACKEND=local)
+Supabase クライアントと同じクエリビルダー (table().select().eq()...execute(), rpc()) を SQLite 上で実装し、
+リポジトリを変更せずに1台のマシンでAPI・データ収集を動かす
+- 参照・書き込み: SQLite (WAL, テーブルは create_tables_sqlite.sql)
+- 集計RPC (account_stats_series, media_stats_series): DuckDB で SQLite ファイルを読み取って集計
+  (DuckDB / sqlite拡張が使えない場合は SQLite で集計。拡張はダウンロードしないため事前に INSTALL sqlite が必要)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from core.exceptions import LocalQueryError
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'sql', 'create_tables_sqlite.sql')
+
+FILTER_OPERATORS = {
+    'eq': '=',
+    'neq': '!=',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+    'in': 'IN'
+}
+
+# Period expressions per aggregation engine (weeks start on Monday like date_trunc)
+PERIOD_EXPRESSIONS = {
+    'sqlite': {
+        'day': "date({column})",
+        'week': "date({column}, '-6 days', 'weekday 1')",
+        'month': "strftime('%Y-%m-01', {column})"
+    },
+    'duckdb': {
+        'day': "CAST(date_trunc('day', CAST({column} AS TIMESTAMP)) AS DATE)",
+        'week': "CAST(date_trunc('week', CAST({column} AS TIMESTAMP)) AS DATE)",
+        'month': "CAST(date_trunc('month', CAST({column} AS TIMESTAMP)) AS DATE)"
+    }
+}
+# Account metrics counted over a period (unknown for periods inside a coarser rollup)
+ACCOUNT_FLOW_FIELDS = ['new_followers', 'profile_views', 'website_clicks']
+# FLOOR(SUM(total) / SUM(count)) as integer (DuckDB rounds on CAST, SQLite truncates)
+FLOOR_AVERAGE = {
+    'sqlite': "CAST(SUM({total}) * 1.0 / SUM({count}) AS INTEGER)",
+    'duckdb': "CAST(FLOOR(SUM({total}) / SUM({count})) AS INTEGER)"
+}
+
+def split_top_level(text: str) -> List[str]:
+    """Split a select string on commas outside parentheses"""
+    parts, depth, current = [], 0, ''
+    for char in text:
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        depth += (char == '(') - (char == ')')
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+def parse_select(columns: str) -> Tuple[List[str], List[Dict]]:
+    """Split a PostgREST select into plain columns and embedded resources"""
+    plain, embeds = [], []
+    for part in split_top_level(columns):
+        if '(' not in part:
+            plain.append(part)
+            continue
+        name, inner_columns = part.split('(', 1)
+        name, _, hint = name.strip().partition('!')
+        embeds.append({
+            'table': name,
+            'inner': hint == 'inner',
+            'columns': split_top_level(inner_columns.rstrip()[:-1]) or ['*']
+        })
+    return plain, embeds
+
+def period_calendar(start_date: date, end_date: date, interval: str) -> List[date]:
+    """Periods from the one containing start_date through end_date (generate_series over date_trunc)"""
+    if interval == 'week':
+        current = start_date - timedelta(days=start_date.weekday())
+    elif interval == 'month':
+        current = start_date.replace(day=1)
+    else:
+        current = start_date
+    
+    periods = []
+    while current <= end_date:
+        periods.append(current)
+        if interval == 'week':
+            current += timedelta(days=7)
+        elif interval == 'month':
+            current += timedelta(days=monthrange(current.year, current.month)[1])
+        else:
+            current += timedelta(days=1)
+    return periods
+
+def period_last_day(period: date, interval: str) -> date:
+    """Last day of the calendar period starting on the day"""
+    if interval == 'week':
+        return period + timedelta(days=6)
+    if interval == 'month':
+        return period.replace(day=monthrange(period.year, period.month)[1])
+    return period
+
+def cover_account_series(series: List[Dict], rollups: List[tuple], interval: str) -> List[Dict]:
+    """Fill account series periods inside rollups coarser than the period (as account_stats_series does)
+    
+    Flow metrics of covered periods are unknown (None) and their follower count is the rollups' average;
+    periods without any data carry the previous follower count forward.
+    """
+    known = 0
+    for row in series:
+        first, last = row['period'], period_last_day(date.fromisoformat(row['period']), interval).isoformat()
+        covering = [rollup for rollup in rollups if str(rollup[0])[:10] <= last and str(rollup[1])[:10] >= first]
+        if covering:
+            for field in ACCOUNT_FLOW_FIELDS:
+                row[field] = None
+            if row['followers_count'] is None:
+                row['followers_count'] = int(sum(rollup[2] for rollup in covering) // sum(rollup[3] for rollup in covering))
+        if row['followers_count'] is None:
+            row['followers_count'] = known
+        known = row['followers_count']
+    return series
+
+class LocalResponse:
+    """Query result with the same attributes as a PostgREST response"""
+    
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+class LocalQuery:
+    """Query builder for one table (subset of the PostgREST builder used by the repositories)"""
+    
+    def __init__(self, database: "LocalDatabase", table: str):
+        self.database = database
+        self.table = table
+        self.method = 'select'
+        self.columns = '*'
+        self.count = None
+        self.payload = None
+        self.on_conflict = ''
+        self.filters: List[Tuple[str, str, Any]] = []
+        self.orders: List[Tuple[str, bool]] = []
+        # Offset and limit live in params like the PostgREST builder (see BaseRepository._execute_all)
+        self.params = httpx.QueryParams()
+    
+    def select(self, columns: str = '*', count: Optional[str] = None) -> "LocalQuery":
+        self.method, self.columns, self.count = 'select', columns, count
+        return self
+    
+    def insert(self, payload) -> "LocalQuery":
+        self.method, self.payload = 'insert', payload
+        return self
+    
+    def upsert(self, payload, on_conflict: str = '') -> "LocalQuery":
+        self.method, self.payload, self.on_conflict = 'upsert', payload, on_conflict
+        return self
+    
+    def update(self, payload: Dict) -> "LocalQuery":
+        self.method, self.payload = 'update', payload
+        return self
+    
+    def delete(self) -> "LocalQuery":
+        self.method = 'delete'
+        return self
+    
+    def _filter(self, operator: str, column: str, value) -> "LocalQuery":
+        self.filters.append((column, operator, value))
+        return self
+    
+    def eq(self, column: str, value) -> "LocalQuery":
+        return self._filter('eq', column, value)
+    
+    def neq(self, column: str, value) -> "LocalQuery":
+        return self._filter('neq', column, value)
+    
+    def gt(self, column: str, value) -> "LocalQuery":
+        return self._filter('gt', column, value)
+    
+    def gte(self, column: str, value) -> "LocalQuery":
+        return self._filter('gte', column, value)
+    
+    def lt(self, column: str, value) -> "LocalQuery":
+        return self._filter('lt', column, value)
+    
+    def lte(self, column: str, value) -> "LocalQuery":
+        return self._filter('lte', column, value)
+    
+    def in_(self, column: str, values) -> "LocalQuery":
+        return self._filter('in', column, list(values))
+    
+    def order(self, column: str, desc: bool = False) -> "LocalQuery":
+        self.orders.append((column, desc))
+        return self
+    
+    def limit(self, size: int) -> "LocalQuery":
+        self.params = self.params.set('limit', size)
+        return self
+    
+    def execute(self) -> LocalResponse:
+        return self.database.execute_query(self)
+
+class LocalRpc:
+    """Call of a database function (aggregations, see migrations/003_analytics_functions.sql)"""
+    
+    def __init__(self, database: "LocalDatabase", name: str, arguments: Dict):
+        self.database = database
+        self.name = name
+        self.arguments = arguments
+        self.params = httpx.QueryParams()
+    
+    def execute(self) -> LocalResponse:
+        rows = self.database.execute_rpc(self.name, self.arguments)
+        offset = int(self.params.get('offset', 0))
+        limit = self.params.get('limit')
+        return LocalResponse(rows[offset:offset + int(limit)] if limit is not None else rows[offset:])
+
+class LocalDatabase:
+    """SQLite database exposing the Supabase client interface used by the repositories"""
+    
+    def __init__(self, path: str, aggregation_engine: str = 'duckdb'):
+        self.path = path
+        self.aggregation_engine = aggregation_engine
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with open(SCHEMA_PATH, encoding='utf-8') as handle:
+            self._connection.executescript(handle.read())
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._columns: Dict[str, Dict[str, str]] = {}
+        self._duckdb = self._connect_duckdb() if aggregation_engine == 'duckdb' else None
+        if self._duckdb is None:
+            self.aggregation_engine = 'sqlite'
+    
+    def _connect_duckdb(self):
+        """DuckDB connection with the SQLite file attached (None when DuckDB or its installed sqlite extension is unavailable)"""
+        try:
+            import duckdb
+            # Extensions are never downloaded here: startup must not depend on network access
+            connection = duckdb.connect(config={'autoinstall_known_extensions': False})
+            connection.execute("LOAD sqlite")
+            connection.execute(f"ATTACH '{os.path.abspath(self.path)}' AS oltp (TYPE sqlite, READ_ONLY)")
+            return connection
+        except Exception as e:
+            print(f"⚠️  DuckDB集計を使用できません ({e}) - SQLiteで集計します")
+            return None
+    
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+    
+    def rpc(self, name: str, arguments: Dict) -> LocalRpc:
+        return LocalRpc(self, name, arguments)
+    
+    # --- Schema ---
+    
+    def columns(self, table: str) -> Dict[str, str]:
+        """Declared column types of a table"""
+        if table not in self._columns:
+            rows = self._connection.execute(f'PRAGMA table_info("{table}")').fetchall()
+            if not rows:
+                raise LocalQueryError(f"Unknown table: {table}")
+            self._columns[table] = {row['name']: (row['type'] or '').upper() for row in rows}
+        return self._columns[table]
+    
+    def primary_key(self, table: str) -> List[str]:
+        rows = self._connection.execute(f'PRAGMA table_info("{table}")').fetchall()
+        return [row['name'] for row in sorted(rows, key=lambda row: row['pk']) if row['pk']]
+    
+    def relationship(self, table: str, embedded: str) -> Tuple[str, str, bool]:
+        """Join columns (table side, embedded side) and whether the embedded resource is a list"""
+        for row in self._connection.execute(f'PRAGMA foreign_key_list("{table}")').fetchall():
+            if row['table'] == embedded:
+                return row['from'], row['to'], False
+        for row in self._connection.execute(f'PRAGMA foreign_key_list("{embedded}")').fetchall():
+            if row['table'] == table:
+                return row['to'], row['from'], True
+        raise LocalQueryError(f"No relationship between {table} and {embedded}")
+    
+    def _name(self, table: str, column: str) -> str:
+        """Quoted column name (unknown columns are rejected like PostgREST does)"""
+        if column not in self.columns(table):
+            raise LocalQueryError(f"Unknown column: {table}.{column}")
+        return f'"{column}"'
+    
+    def _column(self, table: str, column: str) -> str:
+        """Quoted table-qualified column name"""
+        return f'"{table}".{self._name(table, column)}'
+    
+    def _expand_columns(self, table: str, columns: List[str]) -> List[str]:
+        names = []
+        for column in columns:
+            names.extend(self.columns(table) if column == '*' else [column])
+        return names
+    
+    # --- Value conversion (JSON arrays, timestamps without time zone like Postgres TIMESTAMP) ---
+    
+    def _to_db(self, table: str, column: str, value):
+        declared = self.columns(table).get(column, '')
+        if value is None:
+            return None
+        if declared == 'JSON':
+            return json.dumps(value)
+        if declared == 'TIMESTAMP' and isinstance(value, (str, datetime)):
+            moment = datetime.fromisoformat(value.replace('Z', '+00:00')) if isinstance(value, str) else value
+            return moment.replace(tzinfo=None).isoformat(timespec='seconds')
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, bool):
+            return int(value)
+        return value
+    
+    def _from_db(self, table: str, column: str, value):
+        if value is not None and self.columns(table).get(column) == 'JSON':
+            return json.loads(value)
+        return value
+    
+    def _row(self, table: str, row: sqlite3.Row) -> Dict:
+        return {column: self._from_db(table, column, row[column]) for column in row.keys()}
+    
+    # --- Query execution ---
+    
+    def execute_query(self, query: LocalQuery) -> LocalResponse:
+        with self._lock:
+            try:
+                if query.method == 'select':
+                    return self._select(query)
+                response = getattr(self, f"_{query.method}")(query)
+                self._connection.commit()
+                return response
+            except sqlite3.Error as e:
+                self._connection.rollback()
+                raise LocalQueryError(str(e)) from e
+    
+    def _where(self, query: LocalQuery, joined: Dict[str, bool]) -> Tuple[List[str], List, Dict[str, Tuple[List[str], List]]]:
+        """WHERE conditions and parameters, plus JOIN conditions per left-joined resource"""
+        conditions, values = [], []
+        join_filters = {table: ([], []) for table, inner in joined.items() if not inner}
+        for column, operator, value in query.filters:
+            table, _, name = column.rpartition('.')
+            table = table or query.table
+            if table != query.table and table not in joined:
+                raise LocalQueryError(f"Filter on a resource that is not embedded: {column}")
+            
+            if operator == 'in':
+                if not value:
+                    condition, parameters = '0 = 1', []
+                else:
+                    condition = f"{self._column(table, name)} IN ({', '.join('?' for _ in value)})"
+                    parameters = [self._to_db(table, name, item) for item in value]
+            else:
+                condition = f"{self._column(table, name)} {FILTER_OPERATORS[operator]} ?"
+                parameters = [self._to_db(table, name, value)]
+            
+            # Filters on a left-joined resource only narrow the embedded rows (as in PostgREST)
+            if table in join_filters:
+                join_filters[table][0].append(condition)
+                join_filters[table][1].extend(parameters)
+            else:
+                conditions.append(condition)
+                values.extend(parameters)
+        return conditions, values, join_filters
+    
+    def _select(self, query: LocalQuery) -> LocalResponse:
+        plain, embeds = parse_select(query.columns)
+        one_embeds = []
+        many_embeds = []
+        for embed in embeds:
+            local_column, foreign_column, is_list = self.relationship(query.table, embed['table'])
+            embed.update({'local_column': local_column, 'foreign_column': foreign_column})
+            (many_embeds if is_list else one_embeds).append(embed)
+            if is_list and embed['inner']:
+                raise LocalQueryError(f"Inner join on a list resource is not supported: {embed['table']}")
+        
+        joined = {embed['table']: embed['inner'] for embed in one_embeds}
+        conditions, values, join_filters = self._where(query, joined)
+        
+        columns = self._expand_columns(query.table, plain)
+        # Keys needed to attach list resources are fetched even when not selected
+        hidden = [embed['local_column'] for embed in many_embeds if embed['local_column'] not in columns]
+        selected = [f"{self._column(query.table, column)} AS \"{column}\"" for column in columns + hidden]
+        for embed in one_embeds:
+            # The join key tells a missing resource (null) from one whose selected columns are null
+            selected.append(f"{self._column(embed['table'], embed['foreign_column'])} AS \"{embed['table']}.\"")
+            for column in self._expand_columns(embed['table'], embed['columns']):
+                selected.append(f"{self._column(embed['table'], column)} AS \"{embed['table']}.{column}\"")
+        
+        source, parameters = f'"{query.table}"', []
+        for embed in one_embeds:
+            join = 'JOIN' if embed['inner'] else 'LEFT JOIN'
+            on = [f"{self._column(query.table, embed['local_column'])} = {self._column(embed['table'], embed['foreign_column'])}"]
+            if embed['table'] in join_filters:
+                on += join_filters[embed['table']][0]
+                parameters += join_filters[embed['table']][1]
+            source += f" {join} \"{embed['table']}\" ON {' AND '.join(on)}"
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        parameters += values
+        
+        order = ''
+        if query.orders:
+            order = ' ORDER BY ' + ', '.join(
+                f"{self._column(query.table, column)} {'DESC' if desc else 'ASC'}" for column, desc in query.orders
+            )
+        limit = ''
+        if query.params.get('limit') is not None or query.params.get('offset') is not None:
+            limit = f" LIMIT {int(query.params.get('limit', -1))} OFFSET {int(query.params.get('offset', 0))}"
+        
+        rows = self._connection.execute(f"SELECT {', '.join(selected)} FROM {source}{where}{order}{limit}", parameters).fetchall()
+        
+        data = []
+        for row in rows:
+            record = {column: self._from_db(query.table, column, row[column]) for column in columns + hidden}
+            for embed in one_embeds:
+                nested = {
+                    column: self._from_db(embed['table'], column, row[f"{embed['table']}.{column}"])
+                    for column in self._expand_columns(embed['table'], embed['columns'])
+                }
+                record[embed['table']] = nested if row[f"{embed['table']}."] is not None else None
+            data.append(record)
+        
+        for embed in many_embeds:
+            self._attach_list(embed, data)
+        for record in data:
+            for column in hidden:
+                record.pop(column, None)
+        
+        count = None
+        if query.count:
+            count = self._connection.execute(f"SELECT COUNT(*) FROM {source}{where}", parameters).fetchone()[0]
+        return LocalResponse(data, count)
+    
+    def _attach_list(self, embed: Dict, data: List[Dict]):
+        """Attach rows of a one-to-many resource to each record"""
+        keys = list({record[embed['local_column']] for record in data if record[embed['local_column']] is not None})
+        columns = self._expand_columns(embed['table'], embed['columns'])
+        fetched = columns + ([embed['foreign_column']] if embed['foreign_column'] not in columns else [])
+        
+        grouped: Dict[Any, List[Dict]] = {}
+        # Stay below SQLite's bound parameter limit
+        for start in range(0, len(keys), 900):
+            chunk = keys[start:start + 900]
+            rows = self._connection.execute(
+                f"SELECT {', '.join(self._column(embed['table'], column) for column in fetched)} FROM \"{embed['table']}\" "
+                f"WHERE {self._column(embed['table'], embed['foreign_column'])} IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            ).fetchall()
+            for row in rows:
+                values = self._row(embed['table'], row)
+                key = values[embed['foreign_column']]
+                grouped.setdefault(key, []).append({column: values[column] for column in columns})
+        
+        for record in data:
+            record[embed['table']] = grouped.get(record[embed['local_column']], [])
+    
+    def _records(self, query: LocalQuery) -> List[Dict]:
+        payload = query.payload
+        return payload if isinstance(payload, list) else [payload]
+    
+    def _insert(self, query: LocalQuery, conflict: str = '') -> LocalResponse:
+        data = []
+        for record in self._records(query):
+            names = ', '.join(self._name(query.table, column) for column in record)
+            placeholders = ', '.join('?' for _ in record)
+            values = [self._to_db(query.table, column, value) for column, value in record.items()]
+            row = self._connection.execute(
+                f"INSERT INTO \"{query.table}\" ({names}) VALUES ({placeholders}){conflict} RETURNING *",
+                values
+            ).fetchone()
+            if row is not None:
+                data.append(self._row(query.table, row))
+        return LocalResponse(data)
+    
+    def _upsert(self, query: LocalQuery) -> LocalResponse:
+        keys = [column.strip() for column in query.on_conflict.split(',') if column.strip()] or self.primary_key(query.table)
+        data = []
+        for record in self._records(query):
+            updates = [column for column in record if column not in keys]
+            action = 'DO UPDATE SET ' + ', '.join(f'"{column}" = excluded."{column}"' for column in updates) if updates else 'DO NOTHING'
+            single = LocalQuery(self, query.table).insert(record)
+            conflict = ', '.join(self._name(query.table, key) for key in keys)
+            data.extend(self._insert(single, f" ON CONFLICT ({conflict}) {action}").data)
+        return LocalResponse(data)
+    
+    def _update(self, query: LocalQuery) -> LocalResponse:
+        conditions, parameters, _ = self._where(query, {})
+        assignments = ', '.join(f"{self._name(query.table, column)} = ?" for column in query.payload)
+        values = [self._to_db(query.table, column, value) for column, value in query.payload.items()]
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self._connection.execute(f"UPDATE \"{query.table}\" SET {assignments}{where} RETURNING *", values + parameters).fetchall()
+        return LocalResponse([self._row(query.table, row) for row in rows])
+    
+    def _delete(self, query: LocalQuery) -> LocalResponse:
+        conditions, parameters, _ = self._where(query, {})
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self._connection.execute(f"DELETE FROM \"{query.table}\"{where} RETURNING *", parameters).fetchall()
+        return LocalResponse([self._row(query.table, row) for row in rows])
+    
+    # --- Aggregations (same results as migrations/003_analytics_functions.sql) ---
+    
+    def execute_rpc(self, name: str, arguments: Dict) -> List[Dict]:
+        functions = {
+            'account_stats_series': self._account_stats_series,
+            'media_stats_series': self._media_stats_series
+        }
+        if name not in functions:
+            raise LocalQueryError(f"Unknown function: {name}")
+        
+        start_date = date.fromisoformat(arguments['p_start_date'])
+        end_date = date.fromisoformat(arguments['p_end_date'])
+        interval = arguments.get('p_interval', 'day')
+        if interval not in ('day', 'week', 'month'):
+            raise LocalQueryError(f"Unknown interval: {interval}")
+        return functions[name](arguments['p_ig_user_id'], start_date, end_date, interval)
+    
+    def _aggregate(self, build_sql) -> Tuple[List[str], List[tuple]]:
+        """Run an aggregation on DuckDB over the SQLite file (SQLite when DuckDB is unavailable)"""
+        if self.aggregation_engine == 'duckdb':
+            sql, parameters = build_sql('duckdb', 'oltp.')
+            with self._lock:
+                cursor = self._duckdb.cursor()
+                try:
+                    cursor.execute(sql, parameters)
+                    return [column[0] for column in cursor.description], cursor.fetchall()
+                finally:
+                    cursor.close()
+        
+        sql, parameters = build_sql('sqlite', '')
+        with self._lock:
+            cursor = self._connection.execute(sql, parameters)
+            return [column[0] for column in cursor.description], [tuple(row) for row in cursor.fetchall()]
+    
+    def _zero_filled(self, columns: List[str], rows: List[tuple], start_date: date, end_date: date, interval: str, keep_missing: Tuple[str, ...] = ()) -> List[Dict]:
+        """One row per calendar period with zeros where there is no data (None for the keep_missing columns)"""
+        by_period = {str(row[0])[:10]: dict(zip(columns, row)) for row in rows}
+        series = []
+        for period in period_calendar(start_date, end_date, interval):
+            row = by_period.get(period.isoformat(), {})
+            series.append({
+                'period': period.isoformat(),
+                **{column: row.get(column) if column in keep_missing else row.get(column) or 0 for column in columns if column != 'period'}
+            })
+        return series
+    
+    def _account_stats_series(self, ig_user_id: str, start_date: date, end_date: date, interval: str) -> List[Dict]:
+        def build_sql(engine: str, schema: str):
+            period = PERIOD_EXPRESSIONS[engine][interval]
+            followers = FLOOR_AVERAGE[engine].format(total='followers_total', count='days')
+            return f"""
+                WITH samples AS (
+                    SELECT "date" AS day, followers_count AS followers_total, 1 AS days, new_followers, profile_views, website_clicks
+                    FROM {schema}daily_account_stats
+                    WHERE ig_user_id = ? AND "date" BETWEEN ? AND ?
+                    UNION ALL
+                    SELECT period_start, followers_total, days, new_followers, profile_views, website_clicks
+                    FROM {schema}account_stats_rollups
+                    WHERE ig_user_id = ? AND period_start <= ? AND period_end >= ?
+                      AND {period.format(column='period_start')} = {period.format(column='period_end')}
+                )
+                SELECT
+                    {period.format(column='day')} AS period,
+                    {followers} AS followers_count,
+                    SUM(new_followers) AS new_followers,
+                    SUM(profile_views) AS profile_views,
+                    SUM(website_clicks) AS website_clicks
+                FROM samples
+                GROUP BY 1
+            """, [ig_user_id, start_date.isoformat(), end_date.isoformat(), ig_user_id, end_date.isoformat(), start_date.isoformat()]
+        
+        def build_covering_sql(engine: str, schema: str):
+            period = PERIOD_EXPRESSIONS[engine][interval]
+            return f"""
+                SELECT period_start, period_end, followers_total, days
+                FROM {schema}account_stats_rollups
+                WHERE ig_user_id = ? AND period_start <= ? AND period_end >= ?
+                  AND {period.format(column='period_start')} <> {period.format(column='period_end')}
+            """, [ig_user_id, end_date.isoformat(), start_date.isoformat()]
+        
+        columns, rows = self._aggregate(build_sql)
+        series = self._zero_filled(columns, rows, start_date, end_date, interval, keep_missing=('followers_count',))
+        _, covering = self._aggregate(build_covering_sql)
+        return cover_account_series(series, covering, interval)
+    
+    def _media_stats_series(self, ig_user_id: str, start_date: date, end_date: date, interval: str) -> List[Dict]:
+        def build_sql(engine: str, schema: str):
+            period = PERIOD_EXPRESSIONS[engine][interval].format(column='"timestamp"')
+            return f"""
+                WITH posts AS (
+                    SELECT ig_media_id, {period} AS period
+                    FROM {schema}media_posts
+                    WHERE ig_user_id = ? AND "timestamp" >= ? AND "timestamp" < ?
+                ),
+                latest AS (
+                    SELECT
+                        s.ig_media_id,
+                        s.like_count,
+                        s.comments_count,
+                        COALESCE(s.shares, 0) AS shares,
+                        COALESCE(s.saved, 0) AS saved,
+                        COALESCE(s.reach, 0) AS reach,
+                        COALESCE(
+                            s.engagement_rate,
+                            (s.like_count + s.comments_count + COALESCE(s.shares, 0) + COALESCE(s.saved, 0)) * 100.0 / NULLIF(s.reach, 0),
+                            0
+                        ) AS engagement_rate
+                    FROM posts
+                    JOIN {schema}daily_media_stats s ON s.ig_media_id = posts.ig_media_id
+                    WHERE s."date" = (SELECT MAX(m."date") FROM {schema}daily_media_stats m WHERE m.ig_media_id = posts.ig_media_id)
+                )
+                SELECT
+                    posts.period AS period,
+                    COUNT(*) AS posts_count,
+                    COALESCE(SUM(l.like_count), 0) AS total_likes,
+                    COALESCE(SUM(l.comments_count), 0) AS total_comments,
+                    COALESCE(SUM(l.shares), 0) AS total_shares,
+                    COALESCE(SUM(l.saved), 0) AS total_saved,
+                    COALESCE(SUM(l.reach), 0) AS total_reach,
+                    SUM(l.engagement_rate * l.reach) / NULLIF(SUM(l.reach), 0) AS avg_engagement_rate
+                FROM posts
+                LEFT JOIN latest l ON l.ig_media_id = posts.ig_media_id
+                GROUP BY posts.period
+            """, [ig_user_id, start_date.isoformat(), (end_date + timedelta(days=1)).isoformat()]
+        
+        columns, rows = self._aggregate(build_sql)
+        series = self._zero_filled(columns, rows, start_date, end_date, interval)
+        for row in series:
+            row['avg_engagement_rate'] = round(float(row['avg_engagement_rate']), 2)
+        return series
@@ -0,0 +1,79 @@
+"""
+未対応メトリクスのネガティブキャッシュ
+メディアタイプ/プロダクトタイプ (FEED, REELS, STORY ...) 毎に「このメトリクスは取得できない」
+というAPI応答を記録し、TTL内は同じ呼び出しを行わない (unsupported_media_metrics テーブルに永続化)
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from core.config import settings
+
+# ig_user_id value of entries that apply to all accounts
+ALL_ACCOUNTS = ''
+# media_type value of entries for metrics the media list rejected when expanded on it (insights.metric(...))
+MEDIA_LIST_EXPANSION = 'MEDIA_LIST'
+
+class UnsupportedMetricCache:
+    """Negative cache keyed by (media_type, product_type, metric, ig_user_id)"""
+    
+    def __init__(self, ttl_days: int, per_account: bool = False):
+        self.ttl_days = ttl_days
+        self.per_account = per_account
+        self._entries: Dict[Tuple[str, str, str, str], datetime] = {}
+        self._new_entries: Dict[Tuple[str, str, str, str], Dict] = {}
+    
+    def make_key(self, media_type: str, product_type: Optional[str], metric: str, ig_user_id: Optional[str] = None) -> Tuple[str, str, str, str]:
+        """Build a cache key (account part only when caching per account)"""
+        account = ig_user_id if self.per_account and ig_user_id else ALL_ACCOUNTS
+        return (media_type or '', product_type or '', metric, account)
+    
+    def is_unsupported(self, media_type: str, product_type: Optional[str], metric: str, ig_user_id: Optional[str] = None) -> bool:
+        """Whether the metric is known to be unsupported (account entries and all-account entries)"""
+        now = datetime.now()
+        for key in {self.make_key(media_type, product_type, metric, ig_user_id), self.make_key(media_type, product_type, metric)}:
+            expires_at = self._entries.get(key)
+            if expires_at and expires_at > now:
+                return True
+        return False
+    
+    def is_unsupported_for_any(self, metric: str) -> bool:
+        """Whether any media type / product type is known not to support the metric"""
+        now = datetime.now()
+        return any(key[2] == metric and expires_at > now for key, expires_at in self._entries.items())
+    
+    def filter_metrics(self, media_type: str, product_type: Optional[str], metrics: List[str], ig_user_id: Optional[str] = None) -> List[str]:
+        """Metrics that are not known to be unsupported"""
+        return [metric for metric in metrics if not self.is_unsupported(media_type, product_type, metric, ig_user_id)]
+    
+    def record(self, media_type: str, product_type: Optional[str], metric: str, ig_user_id: Optional[str] = None, error: Optional[str] = None):
+        """Record an unsupported metric response until the TTL expires"""
+        key = self.make_key(media_type, product_type, metric, ig_user_id)
+        expires_at = datetime.now() + timedelta(days=self.ttl_days)
+        self._entries[key] = expires_at
+        self._new_entries[key] = {
+            'media_type': key[0],
+            'product_type': key[1],
+            'metric': key[2],
+            'ig_user_id': key[3],
+            'error_message': error,
+            'expires_at': expires_at.isoformat()
+        }
+        print(f"   🚫 未対応メトリクスを記録: {metric} ({key[0]}/{key[1] or '-'}) {self.ttl_days}日間スキップ")
+    
+    def load(self, rows: List[Dict]):
+        """Load persisted entries (unsupported_media_metrics rows)"""
+        for row in rows:
+            key = (row['media_type'], row['product_type'], row['metric'], row['ig_user_id'])
+            self._entries[key] = datetime.fromisoformat(row['expires_at'])
+    
+    def pop_new_entries(self) -> List[Dict]:
+        """Entries recorded since the last call (to be persisted)"""
+        entries = list(self._new_entries.values())
+        self._new_entries.clear()
+        return entries
+
+# Global metric cache instance
+unsupported_metric_cache = UnsupportedMetricCache(
+    ttl_days=settings.UNSUPPORTED_METRIC_CACHE_TTL_DAYS,
+    per_account=settings.UNSUPPORTED_METRIC_CACHE_PER_ACCOUNT
+)
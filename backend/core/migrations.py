@@ -0,0 +1,69 @@
+"""
+スキーマのバージョン管理マイグレーション (Postgres)
+models/sql/migrations/NNN_説明.sql を番号順に適用し、適用済みのバージョンを schema_migrations に記録する
+- 各ファイルは1トランザクションで適用 (失敗したファイルはロールバックされ、再実行で最初から適用)
+- create_tables.sql から作成したDBにも適用できるよう、各ファイルは再実行可能 (IF NOT EXISTS 等) に書く
+- 実行: scripts/migrate_database.py
+ローカルSQLite (create_tables_sqlite.sql) は接続時にスキーマ全体を適用するため対象外
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Set
+
+MIGRATIONS_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'sql', 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+SCHEMA_MIGRATIONS_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+def discover_migrations(directory: str = MIGRATIONS_PATH) -> List[Dict]:
+    """Migration files ({version, name, path}) sorted by version"""
+    migrations = {}
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {filename}")
+        migrations[version] = {'version': version, 'name': match.group(2), 'path': os.path.join(directory, filename)}
+    return [migrations[version] for version in sorted(migrations)]
+
+def applied_versions(connection) -> Set[int]:
+    """Versions recorded in schema_migrations (the table is created on first use)"""
+    with connection.cursor() as cursor:
+        cursor.execute(SCHEMA_MIGRATIONS_SQL)
+        cursor.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cursor.fetchall()}
+    connection.commit()
+    return versions
+
+def pending_migrations(connection, target: Optional[int] = None) -> List[Dict]:
+    """Migrations not applied yet, up to the target version"""
+    applied = applied_versions(connection)
+    return [
+        migration for migration in discover_migrations()
+        if migration['version'] not in applied and (target is None or migration['version'] <= target)
+    ]
+
+def apply_migration(connection, migration: Dict):
+    """Run one migration file and record it in the same transaction"""
+    with open(migration['path'], encoding='utf-8') as handle:
+        sql = handle.read()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (migration['version'], migration['name'])
+            )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
@@ -0,0 +1,59 @@
+"""
+投稿インサイト更新ポリシー
+投稿の経過日数と直近のリーチ増加速度から、当日インサイトを再取得すべき投稿を判定する
+- 投稿から INSIGHT_REFRESH_DAILY_UNTIL_DAYS 日までは毎日
+- INSIGHT_REFRESH_WEEKLY_UNTIL_DAYS 日までは週1回
+- それ以降は月1回 (リーチが伸び続けている投稿は毎日)
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+from core.config import settings
+from core.trajectory import decode_deltas
+
+WEEKLY_REFRESH_INTERVAL_DAYS = 7
+MONTHLY_REFRESH_INTERVAL_DAYS = 30
+# Days of trajectory used to measure recent reach growth
+VELOCITY_WINDOW_DAYS = 7
+
+def refresh_interval_days(age_days: int) -> int:
+    """Days between insight refreshes for a post of the given age"""
+    if age_days <= settings.INSIGHT_REFRESH_DAILY_UNTIL_DAYS:
+        return 1
+    if age_days <= settings.INSIGHT_REFRESH_WEEKLY_UNTIL_DAYS:
+        return WEEKLY_REFRESH_INTERVAL_DAYS
+    return MONTHLY_REFRESH_INTERVAL_DAYS
+
+def last_refreshed_date(published_date: date, trajectory: Dict) -> date:
+    """Date of the latest stats recorded in a trajectory"""
+    last_day = trajectory['first_day'] + len(trajectory['reach_deltas']) - 1
+    return published_date + timedelta(days=last_day)
+
+def reach_velocity(trajectory: Dict) -> Optional[float]:
+    """Relative daily reach growth over the last VELOCITY_WINDOW_DAYS of a trajectory (None without history)"""
+    reach = decode_deltas(trajectory['reach_deltas'])
+    window = min(VELOCITY_WINDOW_DAYS, len(reach) - 1)
+    if window <= 0:
+        return None
+    
+    previous = reach[-1 - window]
+    return float(reach[-1] - previous) / max(int(previous), 1) / window
+
+def plan_refresh(published_date: date, trajectory: Optional[Dict], today: date) -> Tuple[bool, str]:
+    """Decide whether a post needs fresh insights today; returns (refresh, reason)"""
+    if not trajectory or not trajectory.get('reach_deltas'):
+        return True, 'new'
+    
+    days_since_refresh = (today - last_refreshed_date(published_date, trajectory)).days
+    if days_since_refresh <= 0:
+        return False, 'fresh'
+    
+    age_days = (today - published_date).days
+    if days_since_refresh >= refresh_interval_days(age_days):
+        return True, 'scheduled'
+    
+    velocity = reach_velocity(trajectory)
+    if velocity is not None and velocity >= settings.INSIGHT_REFRESH_HOT_VELOCITY:
+        return True, 'velocity'
+    
+    return False, 'skipped'
@@ -0,0 +1,89 @@
+"""
+日次統計の保持ポリシー (ダウンサンプリング)
+保持期間を過ぎた日次統計を週・月単位のロールアップ (account_stats_rollups, media_stats_rollups) に集約する
+- STATS_RETENTION_DAILY_DAYS 日より前: 週単位 (週は月初で区切り、月をまたがない)
+- STATS_RETENTION_WEEKLY_DAYS 日より前: 月単位
+- アカウント統計: 期間の合計値と日数 (フォロワー数の平均 = followers_total / days)、期間最終日の値
+- 投稿統計: 期間内で最後に観測した値 (累計値のため)
+区切り日は期間の境界に揃えるため、集約済みの期間に後から日次の行が増えることはない
+"""
+
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Summed over the period
+ACCOUNT_SUM_FIELDS = ['new_followers', 'profile_views', 'website_clicks']
+# Value on the last day of the period
+ACCOUNT_LAST_FIELDS = ['followers_count', 'follows_count', 'media_count']
+MEDIA_ROLLUP_FIELDS = ['like_count', 'comments_count', 'reach', 'views', 'shares', 'saved', 'engagement_rate']
+
+def period_start(day: date, granularity: str) -> date:
+    """First day of the rollup period containing the day (weeks start on Monday or the 1st)"""
+    month_start = day.replace(day=1)
+    if granularity == 'month':
+        return month_start
+    return max(day - timedelta(days=day.weekday()), month_start)
+
+def period_end(start: date, granularity: str) -> date:
+    """Last day of the rollup period starting on the day"""
+    month_end = start.replace(day=monthrange(start.year, start.month)[1])
+    if granularity == 'month':
+        return month_end
+    return min(start + timedelta(days=6 - start.weekday()), month_end)
+
+def retention_cutoffs(today: date, daily_days: int, weekly_days: int) -> Tuple[date, date]:
+    """(daily_before, weekly_before): days before daily_before become weekly, weeks before weekly_before monthly"""
+    daily_before = period_start(today - timedelta(days=daily_days), 'week')
+    weekly_before = period_start(today - timedelta(days=max(weekly_days, daily_days)), 'month')
+    return daily_before, weekly_before
+
+def group_by_period(rows: Iterable[Dict], granularity: str, day_of: Callable[[Dict], str]) -> Dict[date, List[Dict]]:
+    """Rows per rollup period, in input order"""
+    periods: Dict[date, List[Dict]] = {}
+    for row in rows:
+        periods.setdefault(period_start(date.fromisoformat(day_of(row)), granularity), []).append(row)
+    return periods
+
+def sum_or_none(values: Iterable[Optional[int]]) -> Optional[int]:
+    """Sum of the known values (None when none is known, like SQL SUM)"""
+    known = [value for value in values if value is not None]
+    return sum(known) if known else None
+
+def account_rollup(ig_user_id: str, start: date, granularity: str, rows: List[Dict]) -> Dict:
+    """One account_stats_rollups row from daily stats or finer rollups sorted by day"""
+    last = rows[-1]
+    return {
+        'ig_user_id': ig_user_id,
+        'granularity': granularity,
+        'period_start': start.isoformat(),
+        'period_end': period_end(start, granularity).isoformat(),
+        'days': sum(row.get('days', 1) for row in rows),
+        'followers_total': sum(row.get('followers_total', row['followers_count']) for row in rows),
+        **{field: last[field] for field in ACCOUNT_LAST_FIELDS},
+        **{field: sum_or_none(row.get(field) for row in rows) for field in ACCOUNT_SUM_FIELDS}
+    }
+
+def media_rollups(rows: Iterable[Dict], granularity: str) -> List[Dict]:
+    """Last observation of each post per period from stats runs and existing rollups
+    
+    A run is observed on its first and last day; rollup rows on their date.
+    Keeping the latest observation makes merging with existing rollups idempotent.
+    """
+    latest: Dict[tuple, Tuple[str, Dict]] = {}
+    for row in rows:
+        for observed in {row['date'], row.get('last_seen_date') or row['date']}:
+            key = (row['ig_media_id'], period_start(date.fromisoformat(observed), granularity))
+            if key not in latest or observed > latest[key][0]:
+                latest[key] = (observed, row)
+    
+    return [
+        {
+            'ig_media_id': ig_media_id,
+            'granularity': granularity,
+            'period_start': start.isoformat(),
+            'date': observed,
+            **{field: row.get(field) for field in MEDIA_ROLLUP_FIELDS}
+        }
+        for (ig_media_id, start), (observed, row) in latest.items()
+    ]
@@ -0,0 +1,189 @@
+"""
+日次投稿統計のParquetアーカイブ (STATS_ARCHIVE_PATH)
+締め済みの月の daily_media_stats をアカウント/年/月で分割したParquetに移し、DuckDBで読み取る
+- 配置: {STATS_ARCHIVE_PATH}/daily_media_stats/ig_user_id=.../year=YYYY/month=M/part-{最小id}-{最大id}.parquet
+- 書き込み: scripts/archive_daily_stats.py (書き込み後に読み戻せた行だけ主テーブルから削除)
+- 共有: APIと同じストレージ (共有ボリューム等) を指す必要がある。APIは起動時に読み取り側の印 (.api_reader) を置き、
+  印のないアーカイブ (CI等のローカルディレクトリ) にはスクリプトが書き込まない
+- 参照: リポジトリが主テーブル (ホット) の行と合わせて読み取る (エクスポートは月パーティションごとにストリーミング)
+各投稿の最新の行は主テーブルに残すため、最新値を使う集計 (media_stats_series 等) は主テーブルだけで完結する
+"""
+
+import json
+import os
+import socket
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from core.config import settings
+
+ARCHIVE_TABLE = 'daily_media_stats'
+# Written by the API at startup: the archive job only moves rows into storage the API reads
+READER_MARKER = '.api_reader'
+
+# Archived columns and their Parquet (DuckDB) types
+ARCHIVE_COLUMNS = {
+    'id': 'BIGINT',
+    'date': 'DATE',
+    'ig_media_id': 'VARCHAR',
+    'like_count': 'INTEGER',
+    'comments_count': 'INTEGER',
+    'reach': 'INTEGER',
+    'views': 'INTEGER',
+    'shares': 'INTEGER',
+    'saved': 'INTEGER',
+    'engagement_rate': 'DOUBLE',
+    'last_seen_date': 'DATE'
+}
+
+def sql_literal(value: str) -> str:
+    """Quote a string (file path) for DuckDB SQL"""
+    return "'" + value.replace("'", "''") + "'"
+
+class StatsArchive:
+    """Month-partitioned Parquet archive of daily_media_stats read through DuckDB"""
+    
+    def __init__(self, root: str):
+        self.root = root
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether an archive directory is configured"""
+        return bool(self.root)
+    
+    def register_reader(self) -> None:
+        """Mark the archive as read by this API instance"""
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, READER_MARKER), 'w', encoding='utf-8') as handle:
+            json.dump({'host': socket.gethostname(), 'path': os.path.abspath(self.root), 'registered_at': datetime.now().isoformat()}, handle)
+    
+    def has_reader(self) -> bool:
+        """Whether an API instance reads this archive"""
+        return os.path.isfile(os.path.join(self.root, READER_MARKER))
+    
+    def account_path(self, ig_user_id: str) -> str:
+        """Directory holding all partitions of an account"""
+        return os.path.join(self.root, ARCHIVE_TABLE, f"ig_user_id={ig_user_id}")
+    
+    def partition_path(self, ig_user_id: str, year: int, month: int) -> str:
+        """Directory of one account month"""
+        return os.path.join(self.account_path(ig_user_id), f"year={year}", f"month={month}")
+    
+    def archived_months(self, ig_user_id: str) -> List[Tuple[int, int]]:
+        """(year, month) partitions that exist for an account"""
+        months = []
+        account_path = self.account_path(ig_user_id)
+        if not os.path.isdir(account_path):
+            return months
+        for year_dir in os.listdir(account_path):
+            for month_dir in os.listdir(os.path.join(account_path, year_dir)):
+                months.append((int(year_dir.split('=')[1]), int(month_dir.split('=')[1])))
+        return sorted(months)
+    
+    def write_partition(self, ig_user_id: str, year: int, month: int, rows: List[Dict]) -> str:
+        """Write stats rows of one account month as a new Parquet part (atomic rename)"""
+        import duckdb
+        
+        directory = self.partition_path(ig_user_id, year, month)
+        os.makedirs(directory, exist_ok=True)
+        ids = [row['id'] for row in rows]
+        path = os.path.join(directory, f"part-{min(ids)}-{max(ids)}.parquet")
+        staging = path + '.ndjson'
+        
+        # Rows are staged as NDJSON: DuckDB reads it far faster than parameterized inserts
+        with open(staging, 'w', encoding='utf-8') as handle:
+            for row in rows:
+                handle.write(json.dumps({column: row.get(column) for column in ARCHIVE_COLUMNS}, ensure_ascii=False) + '\n')
+        
+        columns = ', '.join(f"{column}: '{column_type}'" for column, column_type in ARCHIVE_COLUMNS.items())
+        connection = duckdb.connect()
+        try:
+            connection.execute(f"""
+                COPY (
+                    SELECT * FROM read_json({sql_literal(staging)}, format = 'newline_delimited', columns = {{{columns}}})
+                    ORDER BY ig_media_id, date
+                ) TO {sql_literal(path + '.tmp')} (FORMAT parquet, COMPRESSION zstd)
+            """)
+            os.replace(path + '.tmp', path)
+        finally:
+            connection.close()
+            os.remove(staging)
+        return path
+    
+    def archived_ids(self, ig_user_id: str, year: int, month: int) -> set:
+        """Row ids already stored in an account month (re-runs skip rewriting them)"""
+        directory = self.partition_path(ig_user_id, year, month)
+        if not os.path.isdir(directory):
+            return set()
+        import duckdb
+        
+        connection = duckdb.connect()
+        try:
+            glob = sql_literal(os.path.join(directory, '*.parquet'))
+            return {row[0] for row in connection.execute(f"SELECT id FROM read_parquet({glob})").fetchall()}
+        finally:
+            connection.close()
+    
+    def read_media_stats(self, ig_user_id: str, start_date: Optional[date] = None, end_date: Optional[date] = None, ig_media_id: Optional[str] = None) -> List[Dict]:
+        """Archived stats runs of an account overlapping the range, ordered by id"""
+        if not self.archived_months(ig_user_id):
+            return []
+        
+        conditions, parameters = range_conditions(start_date, end_date)
+        if end_date:
+            # Runs start in their partition month, so later months are pruned by path
+            conditions.append("year * 12 + month <= ?")
+            parameters.append(end_date.year * 12 + end_date.month)
+        if ig_media_id:
+            conditions.append("ig_media_id = ?")
+            parameters.append(ig_media_id)
+        return self._read(os.path.join(self.account_path(ig_user_id), '*', '*', '*.parquet'), conditions, parameters)
+    
+    def read_month_media_stats(self, ig_user_id: str, year: int, month: int, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Dict]:
+        """Archived stats runs of one account month overlapping the range, ordered by id"""
+        directory = self.partition_path(ig_user_id, year, month)
+        if not os.path.isdir(directory):
+            return []
+        conditions, parameters = range_conditions(start_date, end_date)
+        return self._read(os.path.join(directory, '*.parquet'), conditions, parameters)
+    
+    def _read(self, path: str, conditions: List[str], parameters: List) -> List[Dict]:
+        """Archived rows of the Parquet files matching the path, deduplicated and ordered by id"""
+        import duckdb
+        
+        glob = sql_literal(path)
+        connection = duckdb.connect()
+        try:
+            cursor = connection.execute(f"""
+                SELECT DISTINCT ON (id) {', '.join(ARCHIVE_COLUMNS)}
+                FROM read_parquet({glob}, hive_partitioning = true, hive_types = {{'year': INTEGER, 'month': INTEGER}})
+                {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                ORDER BY id
+            """, parameters)
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+        finally:
+            connection.close()
+        
+        return [
+            {column: value.isoformat() if isinstance(value, date) else value for column, value in zip(columns, row)}
+            for row in rows
+        ]
+
+def range_conditions(start_date: Optional[date], end_date: Optional[date]) -> Tuple[List[str], List]:
+    """DuckDB conditions selecting the runs that overlap the date range"""
+    conditions, parameters = [], []
+    if start_date:
+        conditions.append("COALESCE(last_seen_date, date) >= ?")
+        parameters.append(start_date)
+    if end_date:
+        conditions.append("date <= ?")
+        parameters.append(end_date)
+    return conditions, parameters
+
+def merge_stats_rows(archived: List[Dict], hot: List[Dict]) -> List[Dict]:
+    """Archived and hot rows by id (hot wins for rows present in both after an interrupted archive run)"""
+    hot_ids = {row['id'] for row in hot}
+    return sorted([row for row in archived if row['id'] not in hot_ids] + hot, key=lambda row: row['id'])
+
+# Global archive instance
+stats_archive = StatsArchive(settings.STATS_ARCHIVE_PATH)
@@ -0,0 +1,97 @@
+"""
+投稿メトリクス推移 (trajectory)
+投稿毎のリーチ/いいね/保存の累計値を「投稿からの経過日数」で並べ、
+前日差分の配列 (delta-encoded) として保持・復元する
+"""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Tracked metric -> delta array column
+TRAJECTORY_COLUMNS = {
+    'reach': 'reach_deltas',
+    'like_count': 'like_deltas',
+    'saved': 'saved_deltas'
+}
+
+def float_column(rows: List[Dict], key: str) -> np.ndarray:
+    """Load a numeric column as float64 (missing or NULL values become NaN)"""
+    return np.fromiter(
+        (np.nan if row.get(key) is None else row[key] for row in rows), dtype=np.float64, count=len(rows)
+    )
+
+def encode_deltas(values: np.ndarray) -> List[int]:
+    """Encode cumulative values as day-over-day deltas (first element is the first value)"""
+    return np.diff(values.astype(np.int64), prepend=0).tolist()
+
+def decode_deltas(deltas: List[int]) -> np.ndarray:
+    """Decode day-over-day deltas back to cumulative values"""
+    return np.cumsum(np.asarray(deltas or [], dtype=np.int64))
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry the last observed value over unobserved (NaN) days; leading gaps become 0"""
+    observed = ~np.isnan(values)
+    last_observed = np.maximum.accumulate(np.where(observed, np.arange(len(values)), 0))
+    return np.nan_to_num(values[last_observed])
+
+def build_trajectory(days: List[int], rows: List[Dict]) -> Dict:
+    """Build a trajectory from stats rows observed at the given days since publish"""
+    start, end = min(days), max(days)
+    positions = np.asarray(days) - start
+    trajectory = {'first_day': int(start)}
+    for metric, column in TRAJECTORY_COLUMNS.items():
+        values = np.full(end - start + 1, np.nan)
+        values[positions] = float_column(rows, metric)
+        trajectory[column] = encode_deltas(forward_fill(values))
+    return trajectory
+
+def decode_trajectory(trajectory: Dict) -> Tuple[List[int], List[Dict]]:
+    """Expand a trajectory to days since publish and per-day metric values"""
+    values = {metric: decode_deltas(trajectory[column]).tolist() for metric, column in TRAJECTORY_COLUMNS.items()}
+    length = len(values['reach'])
+    days = list(range(trajectory['first_day'], trajectory['first_day'] + length))
+    rows = [{metric: values[metric][i] for metric in TRAJECTORY_COLUMNS} for i in range(length)]
+    return days, rows
+
+def add_observation(trajectory: Optional[Dict], day: int, row: Dict) -> Dict:
+    """Record one day's stats in a trajectory (replaces an earlier value of the same day)"""
+    if not trajectory:
+        return build_trajectory([day], [row])
+    
+    days, rows = decode_trajectory(trajectory)
+    kept = [i for i, observed_day in enumerate(days) if observed_day != day]
+    return build_trajectory([days[i] for i in kept] + [day], [rows[i] for i in kept] + [row])
+
+def trajectory_matrix(trajectories: List[Dict], metric: str, days: int) -> np.ndarray:
+    """Values per post (rows) by day since publish 0..days (columns); NaN where not observed"""
+    matrix = np.full((len(trajectories), days + 1), np.nan)
+    column = TRAJECTORY_COLUMNS[metric]
+    for i, trajectory in enumerate(trajectories):
+        first_day = trajectory['first_day']
+        if first_day > days:
+            continue
+        values = decode_deltas(trajectory[column])[:days + 1 - first_day]
+        matrix[i, first_day:first_day + len(values)] = values
+    return matrix
+
+def observed_value(matrix: np.ndarray, post: int, day: int) -> Optional[int]:
+    """Value of a post on a day since publish (None when not observed)"""
+    value = matrix[post, day]
+    return None if np.isnan(value) else int(value)
+
+def summarize_days(matrix: np.ndarray) -> List[Dict]:
+    """Posts observed, mean and median per day since publish"""
+    observed = ~np.isnan(matrix)
+    counts = observed.sum(axis=0)
+    totals = np.where(observed, matrix, 0).sum(axis=0)
+    
+    summary = []
+    for day, count in enumerate(counts.tolist()):
+        column = matrix[observed[:, day], day]
+        summary.append({
+            'day': day,
+            'posts_count': count,
+            'mean': round(float(totals[day] / count), 1) if count else None,
+            'median': float(np.median(column)) if count else None
+        })
+    return summary
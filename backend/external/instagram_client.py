@@ -3,18 +3,40 @@ import json
 from typing import Dict, Any, Optional, List
 import os
 from datetime import datetime
+from core.metric_cache import MEDIA_LIST_EXPANSION, UnsupportedMetricCache, unsupported_metric_cache
+
+DEFAULT_GRAPH_API_URL = "https://graph.facebook.com/v23.0"
+
+# Graph API multi-id lookup (?ids=a,b,c) accepts at most 50 ids per request
+MULTI_ID_LOOKUP_LIMIT = 50
+# Responses that fail the same way for any subset of ids (token, permission, rate limit): not bisected
+UNSPLITTABLE_STATUS_CODES = {401, 403, 429}
+
+# 検証済みフィールド構成 (media_product_type: FEED / REELS / STORY / AD)
+MEDIA_FIELDS = 'id,timestamp,media_type,media_product_type,caption,like_count,comments_count,media_url,thumbnail_url,permalink'
+
+# Insight metrics per media type (VIDEO投稿のみ views を追加)
+MEDIA_INSIGHT_METRICS = {
+    'IMAGE': ['reach', 'shares', 'saved'],
+    'CAROUSEL_ALBUM': ['reach', 'shares', 'saved'],
+    'VIDEO': ['reach', 'shares', 'saved', 'views']
+}
+# Metrics supported by every media type (safe to expand on the whole media list)
+COMMON_INSIGHT_METRICS = [metric for metric in MEDIA_INSIGHT_METRICS['IMAGE'] if all(metric in metrics for metrics in MEDIA_INSIGHT_METRICS.values())]
 
 class InstagramAPIClient:
     """Instagram API client for token management and account operations"""
     
-    def __init__(self, app_id: str = None, app_secret: str = None, access_token: str = None):
+    def __init__(self, app_id: str = None, app_secret: str = None, access_token: str = None, metric_cache: UnsupportedMetricCache = None, graph_api_url: str = None):
         self.app_id = app_id or os.getenv('INSTAGRAM_APP_ID')
         self.app_secret = app_secret or os.getenv('INSTAGRAM_APP_SECRET') 
         self.access_token = access_token or os.getenv('INSTAGRAM_ACCESS_TOKEN')
+        # Metrics known to be unsupported per media type / product type are not requested
+        self.metric_cache = metric_cache or unsupported_metric_cache
         
-        # Base URLs
-        self.graph_api_url = "https://graph.facebook.com/v23.0"
-        self.oauth_url = "https://graph.facebook.com/v23.0/oauth/access_token"
+        # Base URLs (INSTAGRAM_GRAPH_API_URL points the client at another server, e.g. scripts/mock_graph_api.py)
+        self.graph_api_url = (graph_api_url or os.getenv('INSTAGRAM_GRAPH_API_URL') or DEFAULT_GRAPH_API_URL).rstrip('/')
+        self.oauth_url = f"{self.graph_api_url}/oauth/access_token"
     
     def make_request(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Make API request and return JSON response with enhanced error handling"""
@@ -26,8 +48,8 @@ class InstagramAPIClient:
             error_data = None
             status_code = getattr(e.response, 'status_code', None)
             
-            # Parse error response
-            if hasattr(e, 'response') and e.response:
+            # Parse error response (a Response is falsy for 4xx/5xx, so compare with None)
+            if getattr(e, 'response', None) is not None:
                 try:
                     error_data = e.response.json()
                 except:
@@ -68,6 +90,22 @@ class InstagramAPIClient:
         else:
             return f"Instagram API呼び出しに失敗しました（ステータス: {status_code}）"
     
+    def _is_unsupported_metric_error(self, result: Dict[str, Any]) -> bool:
+        """Whether an error response says the metric is not supported for the media (product) type"""
+        if result.get("status_code") != 400:
+            return False
+        error = (result.get("error_data") or {}).get("error")
+        if not isinstance(error, dict):
+            return False
+        # e.g. "(#100) The Media Insights API does not support the views metric for this media product type."
+        return error.get("error_subcode") == 2108006 or "not support" in str(error.get("message", "")).lower()
+    
+    def _record_unsupported_metrics(self, media_type: str, product_type: Optional[str], insights_result: Dict[str, Any], ig_user_id: str = None):
+        """Record metrics that failed as unsupported in the negative cache"""
+        for metric, result in insights_result.items():
+            if result.get("unsupported"):
+                self.metric_cache.record(media_type, product_type, metric, ig_user_id, result.get("error"))
+    
     def _get_error_type(self, status_code: int) -> str:
         """Get error type for structured logging"""
         if status_code == 401:
@@ -265,9 +303,8 @@ class InstagramAPIClient:
         """Get Instagram media posts for an account"""
         try:
             # 検証済みフィールド構成を使用
-            fields = 'id,timestamp,media_type,caption,like_count,comments_count,media_url,thumbnail_url,permalink'
             params = {
-                'fields': fields,
+                'fields': MEDIA_FIELDS,
                 'limit': limit,
                 'access_token': access_token
             }
@@ -284,6 +321,205 @@ class InstagramAPIClient:
             print(f"   ⚠️ Media posts取得例外: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    def get_user_media_with_insights(self, ig_user_id: str, access_token: str, limit: int = 25) -> Dict[str, Any]:
+        """Get media posts together with their insights using nested field expansion
+        
+        Metrics shared by all media types are expanded on the media list itself
+        (insights.metric(...)), type-specific metrics are fetched with multi-id lookups,
+        so calls grow with pages instead of posts x metrics. Each post gets an
+        "insights_data" dict in the get_media_insights format.
+        """
+        try:
+            # Metrics rejected by some media type (or by the list expansion) are fetched per type instead of on the whole list
+            expanded_metrics = [metric for metric in COMMON_INSIGHT_METRICS if not self.metric_cache.is_unsupported_for_any(metric)]
+            params = {
+                'fields': f"{MEDIA_FIELDS},insights.metric({','.join(expanded_metrics)})" if expanded_metrics else MEDIA_FIELDS,
+                'access_token': access_token
+            }
+            
+            # Follow cursors until limit posts are collected
+            media_list = []
+            while len(media_list) < limit:
+                params['limit'] = limit - len(media_list)
+                result = self.graph_api_request(f'/{ig_user_id}/media', params)
+                
+                if not result["success"] and expanded_metrics and self._is_unsupported_metric_error(result):
+                    # A post on this page rejected an expanded metric: remember it so later runs don't
+                    # expand it either, and fetch it per media type with multi-id lookups instead
+                    error = (result.get("error_data") or {}).get("error", {}).get("message")
+                    for metric in expanded_metrics:
+                        self.metric_cache.record(MEDIA_LIST_EXPANSION, None, metric, ig_user_id, error)
+                    expanded_metrics = []
+                    params['fields'] = MEDIA_FIELDS
+                    continue
+                
+                if not result["success"]:
+                    print(f"   ⚠️ Media posts (insights付き) 取得失敗: {result.get('error', 'Unknown error')}")
+                    return {"success": False, "error": result.get("error", "Unknown error"), "error_type": result.get("error_type")}
+                
+                page = result["data"]
+                media_list.extend(page.get("data", []))
+                paging = page.get("paging", {})
+                if not page.get("data") or 'next' not in paging:
+                    break
+                params['after'] = paging.get("cursors", {}).get("after")
+            
+            groups = {}
+            for media in media_list:
+                media['insights_data'] = self._parse_nested_insights(media.pop('insights', None), expanded_metrics)
+                groups.setdefault((media.get('media_type'), media.get('media_product_type')), []).append(media)
+            
+            # Type-specific metrics (e.g. views on VIDEO) per media type / product type
+            for (media_type, product_type), typed_media in groups.items():
+                metrics = MEDIA_INSIGHT_METRICS.get(media_type, MEDIA_INSIGHT_METRICS['IMAGE'])
+                supported = self.metric_cache.filter_metrics(media_type, product_type, metrics, ig_user_id)
+                extra_metrics = [metric for metric in supported if metric not in expanded_metrics]
+                if extra_metrics:
+                    self._add_extra_insights(typed_media, extra_metrics, access_token, ig_user_id)
+            
+            return {"success": True, "data": media_list}
+        
+        except Exception as e:
+            print(f"   ⚠️ Media posts (insights付き) 取得例外: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    def _parse_nested_insights(self, insights: Optional[Dict], metrics: List[str]) -> Dict[str, Any]:
+        """Convert an expanded insights edge to the get_media_insights result format"""
+        insights_result = {}
+        for metric_data in (insights or {}).get("data", []):
+            values = metric_data.get("values", [])
+            if values:
+                insights_result[metric_data.get("name")] = {
+                    "success": True,
+                    "value": values[0].get("value", 0),
+                    "raw_data": metric_data
+                }
+        
+        for metric in metrics:
+            if metric not in insights_result:
+                insights_result[metric] = {
+                    "success": False,
+                    "error": "No data in response"
+                }
+        return insights_result
+    
+    def _add_extra_insights(self, media_list: List[Dict], metrics: List[str], access_token: str, ig_user_id: str = None):
+        """Add type-specific metrics to media insights with multi-id lookups (per-post requests as fallback)"""
+        for start in range(0, len(media_list), MULTI_ID_LOOKUP_LIMIT):
+            chunk = media_list[start:start + MULTI_ID_LOOKUP_LIMIT]
+            result = self.graph_api_request('/', {
+                'ids': ','.join(media['id'] for media in chunk),
+                'fields': f"insights.metric({','.join(metrics)})",
+                'access_token': access_token
+            })
+            
+            for media in chunk:
+                if result["success"]:
+                    media_insights = result["data"].get(media['id'], {}).get('insights')
+                    media['insights_data'].update(self._parse_nested_insights(media_insights, metrics))
+                else:
+                    # Fallback: a media in the chunk rejected a metric
+                    fallback = self.get_media_insights(media['id'], access_token, metrics)
+                    self._record_unsupported_metrics(media.get('media_type'), media.get('media_product_type'), fallback.get("data", {}), ig_user_id)
+                    media['insights_data'].update(fallback.get("data", {}))
+    
+    def get_known_media_insights(self, media_list: List[Dict], access_token: str, ig_user_id: str = None) -> Dict[str, Any]:
+        """Get current counts and insights of known posts outside the media listing with multi-id lookups
+        
+        media_list items need "id" and "media_type"; each found post gets like_count, comments_count
+        and "insights_data" (get_media_insights format). Lookups are grouped by media type so every
+        chunk asks for the same metrics; a failed chunk falls back to per-post requests.
+        """
+        groups = {}
+        for media in media_list:
+            groups.setdefault((media.get('media_type'), media.get('media_product_type')), []).append(media)
+        
+        found, errors = [], []
+        for (media_type, product_type), typed_media in groups.items():
+            metrics = MEDIA_INSIGHT_METRICS.get(media_type, MEDIA_INSIGHT_METRICS['IMAGE'])
+            supported = self.metric_cache.filter_metrics(media_type, product_type, metrics, ig_user_id)
+            fields = f"like_count,comments_count,insights.metric({','.join(supported)})" if supported else 'like_count,comments_count'
+            
+            for start in range(0, len(typed_media), MULTI_ID_LOOKUP_LIMIT):
+                chunk = typed_media[start:start + MULTI_ID_LOOKUP_LIMIT]
+                result = self.graph_api_request('/', {
+                    'ids': ','.join(media['id'] for media in chunk),
+                    'fields': fields,
+                    'access_token': access_token
+                })
+                
+                if result["success"]:
+                    for media in chunk:
+                        data = result["data"].get(media['id'])
+                        if data is None:
+                            errors.append({"ig_media_ids": [media['id']], "error": "Not in response"})
+                            continue
+                        media.update(like_count=data.get('like_count', 0), comments_count=data.get('comments_count', 0))
+                        media['insights_data'] = self._parse_nested_insights(data.get('insights'), supported)
+                        found.append(media)
+                    continue
+                
+                # Fallback: a post in the chunk was deleted or rejected a metric
+                counts = self.get_media_counts([media['id'] for media in chunk], access_token)
+                errors.extend(counts["errors"])
+                for media in chunk:
+                    if media['id'] not in counts["data"]:
+                        continue
+                    media.update(like_count=counts["data"][media['id']].get('like_count', 0), comments_count=counts["data"][media['id']].get('comments_count', 0))
+                    insights = self.get_media_insights(media['id'], access_token, supported) if supported else {"data": {}}
+                    self._record_unsupported_metrics(media_type, product_type, insights.get("data", {}), ig_user_id)
+                    media['insights_data'] = insights.get("data", {})
+                    found.append(media)
+        
+        return {
+            "success": not errors,
+            "data": found,
+            "errors": errors
+        }
+    
+    def get_media_counts(self, ig_media_ids: List[str], access_token: str, fields: str = 'like_count,comments_count') -> Dict[str, Any]:
+        """Get current counts of known media posts with multi-id lookups (MULTI_ID_LOOKUP_LIMIT ids per request)
+        
+        A failed chunk is bisected, so one deleted or inaccessible post only loses its own counts.
+        """
+        counts = {}
+        errors = []
+        
+        for start in range(0, len(ig_media_ids), MULTI_ID_LOOKUP_LIMIT):
+            self._lookup_media_counts(ig_media_ids[start:start + MULTI_ID_LOOKUP_LIMIT], access_token, fields, counts, errors)
+        
+        return {
+            "success": not errors,
+            "data": counts,
+            "errors": errors
+        }
+    
+    def _lookup_media_counts(self, chunk: List[str], access_token: str, fields: str, counts: Dict, errors: List[Dict]):
+        """Look up one chunk of media ids; on failure retry each half until the failing ids are isolated"""
+        try:
+            result = self.graph_api_request('/', {
+                'ids': ','.join(chunk),
+                'fields': fields,
+                'access_token': access_token
+            })
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        
+        if result["success"]:
+            # Response is keyed by media id: {"<id>": {"like_count": .., "comments_count": .., "id": "<id>"}}
+            counts.update(result["data"])
+            return
+        
+        # Transport errors (no response) are not caused by an id either
+        if len(chunk) > 1 and result.get("status_code") is not None and result["status_code"] not in UNSPLITTABLE_STATUS_CODES:
+            middle = len(chunk) // 2
+            self._lookup_media_counts(chunk[:middle], access_token, fields, counts, errors)
+            self._lookup_media_counts(chunk[middle:], access_token, fields, counts, errors)
+            return
+        
+        print(f"   ⚠️ Media counts取得失敗 ({len(chunk)}件): {result.get('error', 'Unknown error')}")
+        errors.append({"ig_media_ids": chunk, "error": result.get("error", "Unknown error")})
+    
     def get_media_insights(self, ig_media_id: str, access_token: str, metrics: List[str] = None) -> Dict[str, Any]:
         """Get insights for specific media post"""
         try:
@@ -323,7 +559,8 @@ class InstagramAPIClient:
                     else:
                         insights_result[metric] = {
                             "success": False,
-                            "error": result.get("error", "No data in response")
+                            "error": result.get("error", "No data in response"),
+                            "unsupported": self._is_unsupported_metric_error(result)
                         }
                         print(f"      ❌ {metric}: {result.get('error', 'レスポンスなし')}")
                         
@@ -348,18 +585,21 @@ class InstagramAPIClient:
             print(f"❌ Media Insights取得例外: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def get_media_insights_with_type(self, ig_media_id: str, media_type: str, access_token: str) -> Dict[str, Any]:
-        """Get insights for media with type-specific metrics"""
+    def get_media_insights_with_type(self, ig_media_id: str, media_type: str, access_token: str, product_type: str = None, ig_user_id: str = None) -> Dict[str, Any]:
+        """Get insights for media with type-specific metrics (skipping metrics known to be unsupported)"""
         try:
-            # 基本メトリクス
-            metrics = ['reach', 'shares', 'saved']
-            
-            # VIDEO投稿には views メトリクス追加
-            if media_type == 'VIDEO':
-                metrics.append('views')
+            # メディアタイプ別メトリクス (VIDEO投稿には views 追加)
+            metrics = MEDIA_INSIGHT_METRICS.get(media_type, MEDIA_INSIGHT_METRICS['IMAGE'])
+            supported = self.metric_cache.filter_metrics(media_type, product_type, metrics, ig_user_id)
+            if len(supported) < len(metrics):
+                print(f"   ⏭️ 未対応メトリクスをスキップ: {', '.join(metric for metric in metrics if metric not in supported)}")
+            if not supported:
+                return {"success": False, "error": "No supported metrics", "data": {}, "total_metrics": 0, "successful_metrics": 0}
             
-            print(f"🎬 {media_type}投稿のインサイト取得: {len(metrics)}メトリクス")
-            return self.get_media_insights(ig_media_id, access_token, metrics)
+            print(f"🎬 {media_type}投稿のインサイト取得: {len(supported)}メトリクス")
+            result = self.get_media_insights(ig_media_id, access_token, supported)
+            self._record_unsupported_metrics(media_type, product_type, result.get("data", {}), ig_user_id)
+            return result
             
         except Exception as e:
             print(f"❌ Type-specific insights取得例外: {str(e)}")
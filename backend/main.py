@@ -5,13 +5,26 @@ import uvicorn
 
 from api.accounts import router as accounts_router
 from api.analytics import router as analytics_router
+from api.export import router as export_router
 from api.media import router as media_router
 from api.setup import router as setup_router
 from middleware.auth.simple_auth import router as auth_router
+from core.config import settings
+from core.database import database
+from core.stats_archive import stats_archive
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("🚀 インスタグラムアナリティクスAPI Starting...")
+    if settings.DATABASE_BACKEND == "local":
+        # Open the local database (and its DuckDB aggregation engine) once before serving requests
+        database.client
+    if stats_archive.enabled:
+        # The archive job refuses to move rows into storage this API does not read
+        try:
+            stats_archive.register_reader()
+        except Exception as e:
+            print(f"⚠️  アーカイブに読み取り側の印を書き込めません ({e}) - アーカイブ処理は実行できません")
     yield
     print("📊 インスタグラムアナリティクスAPI Shutting down...")
 
@@ -31,12 +44,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 app.include_router(auth_router, prefix="/auth", tags=["認証"])
 app.include_router(accounts_router, prefix="/accounts", tags=["アカウント管理"])
 app.include_router(analytics_router, prefix="/analytics", tags=["分析データ"])
 app.include_router(media_router, prefix="/media", tags=["投稿データ"])
+app.include_router(export_router, prefix="/export", tags=["エクスポート"])
 app.include_router(setup_router, tags=["セットアップ"])
 
 @app.get("/")
@@ -2,16 +2,22 @@ from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel
 
+# Column projections (PostgREST select lists) used by the repository read paths.
+# Each read only carries the fields its callers use.
+
 class InstagramAccount(BaseModel):
-    """Instagram account data model"""
+    """Instagram account data model (access_token is only loaded for API collection)"""
     id: Optional[int] = None
     name: str
     ig_user_id: str
-    access_token: str
+    access_token: Optional[str] = None
     username: str
     profile_picture_url: Optional[str] = None
     created_at: Optional[datetime] = None
 
+ACCOUNT_COLUMNS = 'id, name, ig_user_id, username, profile_picture_url, created_at'
+ACCOUNT_TOKEN_COLUMNS = ACCOUNT_COLUMNS + ', access_token'
+
 class DailyAccountStats(BaseModel):
     """Daily account statistics model"""
     id: Optional[int] = None
@@ -23,6 +29,8 @@ class DailyAccountStats(BaseModel):
     profile_views: Optional[int] = None
     website_clicks: Optional[int] = None
 
+ACCOUNT_STATS_COLUMNS = 'date, ig_user_id, followers_count, follows_count, media_count, profile_views, website_clicks, new_followers'
+
 class MediaPost(BaseModel):
     """Media post data model"""
     id: Optional[int] = None
@@ -35,6 +43,10 @@ class MediaPost(BaseModel):
     thumbnail_url: Optional[str] = None
     permalink: str
 
+# Post cards (overview) do not show the caption
+MEDIA_POST_CARD_COLUMNS = 'ig_media_id, ig_user_id, timestamp, media_type, media_url, thumbnail_url, permalink'
+MEDIA_POST_COLUMNS = MEDIA_POST_CARD_COLUMNS + ', caption'
+
 class DailyMediaStats(BaseModel):
     """Daily media statistics model"""
     id: Optional[int] = None
@@ -47,6 +59,10 @@ class DailyMediaStats(BaseModel):
     shares: Optional[int] = None
     saved: Optional[int] = None
 
+MEDIA_STATS_COLUMNS = 'date, like_count, comments_count, reach, views, shares, saved, engagement_rate'
+# Stored stats runs (date..last_seen_date)
+MEDIA_STATS_RUN_COLUMNS = 'id, ig_media_id, last_seen_date, ' + MEDIA_STATS_COLUMNS
+
 # Request/Response models
 class TokenRefreshRequest(BaseModel):
     """Token refresh request model"""
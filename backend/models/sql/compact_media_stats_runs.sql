@@ -0,0 +1,46 @@
+-- 日次投稿統計の既存データの圧縮 (任意, migrations/001_schema_upgrade.sql の適用後に実行)
+-- 値が同じで日付が連続する同じ月の行を1行 (date〜last_seen_date) にまとめる
+-- 行の削除を伴うため、バックアップを取ってから実行する
+
+WITH marked AS (
+    SELECT
+        id,
+        ig_media_id,
+        date,
+        last_seen_date,
+        CASE WHEN (like_count, comments_count, reach, views, shares, saved)
+                  IS NOT DISTINCT FROM
+                  (LAG(like_count) OVER w, LAG(comments_count) OVER w, LAG(reach) OVER w,
+                   LAG(views) OVER w, LAG(shares) OVER w, LAG(saved) OVER w)
+                  -- 前の行の翌日から始まる行だけ (収集のない日の欠落は値が変わらなかった日として扱わない)
+                  AND date = LAG(COALESCE(last_seen_date, date)) OVER w + 1
+                  -- 同じ月の行だけ (月単位のパーティションをまたぐ行を作らない)
+                  AND date_trunc('month', date) = date_trunc('month', LAG(date) OVER w)
+             THEN 0 ELSE 1 END AS run_start
+    FROM daily_media_stats
+    WINDOW w AS (PARTITION BY ig_media_id ORDER BY date)
+),
+runs AS (
+    SELECT
+        id,
+        ig_media_id,
+        last_seen_date,
+        SUM(run_start) OVER (PARTITION BY ig_media_id ORDER BY date) AS run_id,
+        run_start
+    FROM marked
+),
+run_ends AS (
+    SELECT ig_media_id, run_id, MAX(last_seen_date) AS last_seen_date
+    FROM runs
+    GROUP BY ig_media_id, run_id
+),
+extended AS (
+    UPDATE daily_media_stats AS stats
+    SET last_seen_date = run_ends.last_seen_date
+    FROM runs
+    JOIN run_ends ON run_ends.ig_media_id = runs.ig_media_id AND run_ends.run_id = runs.run_id
+    WHERE stats.id = runs.id AND runs.run_start = 1
+    RETURNING stats.id
+)
+DELETE FROM daily_media_stats
+WHERE id IN (SELECT id FROM runs WHERE run_start = 0);
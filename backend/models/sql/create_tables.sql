@@ -1,5 +1,6 @@
 -- Instagram分析アプリ用テーブル作成 (PoC)
 -- 作成日: 2025-09-09
+-- 作成後に scripts/migrate_database.py で migrations/ を適用する (集計関数は 003_analytics_functions.sql)
 
 -- 1. ユーザー管理テーブル
 CREATE TABLE users (
@@ -30,7 +31,7 @@ CREATE TABLE daily_account_stats (
     media_count INTEGER NOT NULL,
     profile_views INTEGER,
     website_clicks INTEGER,
-    UNIQUE(date, ig_user_id),
+    new_followers INTEGER, -- followers_count minus the previous recorded day
     FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
 );
 
@@ -45,12 +46,14 @@ CREATE TABLE media_posts (
     media_url TEXT NOT NULL,
     thumbnail_url TEXT,
     permalink TEXT NOT NULL,
+    latest_engagement_rate NUMERIC(8,2) NOT NULL DEFAULT 0, -- 最新の統計のエンゲージメント率 (投稿分析の並べ替え用, リーチ未取得は0)
     FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
 );
 
--- 5. 日次投稿統計テーブル
+-- 5. 日次投稿統計テーブル (date の月単位でレンジパーティション化, migrations/002_partition_daily_media_stats.sql)
+-- 月パーティションは migrate_database.py の適用後、scripts/manage_partitions.py が先の月まで作成する
 CREATE TABLE daily_media_stats (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     date DATE NOT NULL,
     ig_media_id VARCHAR(50) NOT NULL,
     like_count INTEGER NOT NULL DEFAULT 0,
@@ -59,11 +62,97 @@ CREATE TABLE daily_media_stats (
     views INTEGER,
     shares INTEGER,
     saved INTEGER,
-    UNIQUE(date, ig_media_id),
+    engagement_rate NUMERIC(8,2), -- (like_count + comments_count + shares + saved) / reach * 100
+    last_seen_date DATE, -- 値が変わらない間は新しい行を作らずこの日付を延長 (date〜last_seen_date が同じ値, 月はまたがない)
+    PRIMARY KEY (id, date),
+    FOREIGN KEY (ig_media_id) REFERENCES media_posts(ig_media_id) ON DELETE CASCADE
+) PARTITION BY RANGE (date);
+
+-- 月パーティションがない日付の行の受け皿 (該当する月のパーティション作成時に移される)
+CREATE TABLE daily_media_stats_default PARTITION OF daily_media_stats DEFAULT;
+
+-- 6. アカウント別データバージョン（レスポンスキャッシュ無効化用）
+CREATE TABLE account_data_versions (
+    ig_user_id VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 7. 投稿メトリクス推移（投稿からの経過日数別の累計値を前日差分配列で保持）
+CREATE TABLE media_trajectories (
+    ig_media_id VARCHAR(50) PRIMARY KEY,
+    ig_user_id VARCHAR(50) NOT NULL,
+    published_date DATE NOT NULL,
+    first_day INTEGER NOT NULL DEFAULT 0, -- 配列の先頭要素の経過日数
+    reach_deltas INTEGER[] NOT NULL DEFAULT '{}',
+    like_deltas INTEGER[] NOT NULL DEFAULT '{}',
+    saved_deltas INTEGER[] NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ig_media_id) REFERENCES media_posts(ig_media_id) ON DELETE CASCADE,
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 8. 未対応メトリクス (ネガティブキャッシュ: 取得できないメトリクスを expires_at まで要求しない)
+CREATE TABLE unsupported_media_metrics (
+    media_type VARCHAR(20) NOT NULL,
+    product_type VARCHAR(20) NOT NULL DEFAULT '', -- FEED, REELS, STORY, AD
+    metric VARCHAR(50) NOT NULL,
+    ig_user_id VARCHAR(50) NOT NULL DEFAULT '', -- 空文字 = 全アカウント共通
+    error_message TEXT,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (media_type, product_type, metric, ig_user_id)
+);
+
+-- 9. アカウント統計のロールアップ (保持期間を過ぎた日次統計を週・月単位に集約, core/retention.py)
+CREATE TABLE account_stats_rollups (
+    id SERIAL PRIMARY KEY,
+    ig_user_id VARCHAR(50) NOT NULL,
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('week', 'month')),
+    period_start DATE NOT NULL, -- 週は月曜日か月初から (月をまたがない)
+    period_end DATE NOT NULL,
+    days INTEGER NOT NULL, -- 集約した日数
+    followers_total BIGINT NOT NULL, -- followers_count の合計 (平均 = followers_total / days)
+    followers_count INTEGER NOT NULL, -- 以下3列は期間最終日の値
+    follows_count INTEGER NOT NULL,
+    media_count INTEGER NOT NULL,
+    profile_views INTEGER, -- 以下3列は期間の合計
+    website_clicks INTEGER,
+    new_followers INTEGER,
+    UNIQUE(ig_user_id, granularity, period_start),
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 10. 投稿統計のロールアップ (期間内で最後に観測した値)
+CREATE TABLE media_stats_rollups (
+    id SERIAL PRIMARY KEY,
+    ig_media_id VARCHAR(50) NOT NULL,
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('week', 'month')),
+    period_start DATE NOT NULL,
+    date DATE NOT NULL, -- 値を観測した日
+    like_count INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0,
+    reach INTEGER,
+    views INTEGER,
+    shares INTEGER,
+    saved INTEGER,
+    engagement_rate NUMERIC(8,2),
+    UNIQUE(ig_media_id, granularity, period_start),
     FOREIGN KEY (ig_media_id) REFERENCES media_posts(ig_media_id) ON DELETE CASCADE
 );
 
 -- インデックス作成 (最小限)
 CREATE INDEX idx_daily_account_stats_date ON daily_account_stats(date);
-CREATE INDEX idx_daily_media_stats_date ON daily_media_stats(date);
-CREATE INDEX idx_media_posts_timestamp ON media_posts(timestamp);
\ No newline at end of file
+CREATE INDEX idx_media_posts_timestamp ON media_posts(timestamp);
+CREATE INDEX idx_media_trajectories_user ON media_trajectories(ig_user_id, published_date);
+CREATE INDEX idx_media_stats_rollups_date ON media_stats_rollups(date);
+
+-- リポジトリのクエリ用 (既存DBには migrations/001_schema_upgrade.sql で作成)
+-- 日次統計は (投稿/アカウント, 日付) が一意キー
+CREATE UNIQUE INDEX idx_daily_media_stats_media_date ON daily_media_stats(ig_media_id, date);
+CREATE UNIQUE INDEX idx_daily_account_stats_user_date ON daily_account_stats(ig_user_id, date);
+CREATE INDEX idx_media_posts_user_timestamp ON media_posts(ig_user_id, timestamp);
+-- 投稿分析のエンゲージメント率順
+CREATE INDEX idx_media_posts_user_engagement ON media_posts(ig_user_id, latest_engagement_rate);
+CREATE INDEX idx_unsupported_media_metrics_expires ON unsupported_media_metrics(expires_at);
\ No newline at end of file
@@ -0,0 +1,154 @@
+-- Instagram分析アプリ用テーブル作成 (ローカルSQLite版)
+-- create_tables.sql と同じテーブル・列構成 (SERIAL → INTEGER PRIMARY KEY, 配列 → JSON型の文字列)
+-- ローカルバックエンド (DATABASE_BACKEND=local, core/local_database.py) と合成データ生成で使用
+
+PRAGMA foreign_keys = ON;
+
+-- 1. ユーザー管理テーブル
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 2. Instagramアカウント管理テーブル
+CREATE TABLE IF NOT EXISTS instagram_accounts (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    ig_user_id VARCHAR(50) UNIQUE NOT NULL,
+    access_token TEXT NOT NULL,
+    username VARCHAR(100) NOT NULL,
+    profile_picture_url TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 3. 日次アカウント統計テーブル
+CREATE TABLE IF NOT EXISTS daily_account_stats (
+    id INTEGER PRIMARY KEY,
+    date DATE NOT NULL,
+    ig_user_id VARCHAR(50) NOT NULL,
+    followers_count INTEGER NOT NULL,
+    follows_count INTEGER NOT NULL,
+    media_count INTEGER NOT NULL,
+    profile_views INTEGER,
+    website_clicks INTEGER,
+    new_followers INTEGER,
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 4. 投稿データテーブル
+CREATE TABLE IF NOT EXISTS media_posts (
+    id INTEGER PRIMARY KEY,
+    ig_media_id VARCHAR(50) UNIQUE NOT NULL,
+    ig_user_id VARCHAR(50) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    media_type VARCHAR(20) NOT NULL CHECK (media_type IN ('IMAGE', 'VIDEO', 'CAROUSEL_ALBUM')),
+    caption TEXT,
+    media_url TEXT NOT NULL,
+    thumbnail_url TEXT,
+    permalink TEXT NOT NULL,
+    latest_engagement_rate NUMERIC(8,2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 5. 日次投稿統計テーブル (Postgresでは date の月単位でパーティション化, SQLiteは単一テーブル)
+CREATE TABLE IF NOT EXISTS daily_media_stats (
+    id INTEGER PRIMARY KEY,
+    date DATE NOT NULL,
+    ig_media_id VARCHAR(50) NOT NULL,
+    like_count INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0,
+    reach INTEGER,
+    views INTEGER,
+    shares INTEGER,
+    saved INTEGER,
+    engagement_rate NUMERIC(8,2),
+    last_seen_date DATE,
+    FOREIGN KEY (ig_media_id) REFERENCES media_posts(ig_media_id) ON DELETE CASCADE
+);
+
+-- 6. アカウント別データバージョン（レスポンスキャッシュ無効化用）
+CREATE TABLE IF NOT EXISTS account_data_versions (
+    ig_user_id VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 7. 投稿メトリクス推移（配列はJSON文字列で保持）
+CREATE TABLE IF NOT EXISTS media_trajectories (
+    ig_media_id VARCHAR(50) PRIMARY KEY,
+    ig_user_id VARCHAR(50) NOT NULL,
+    published_date DATE NOT NULL,
+    first_day INTEGER NOT NULL DEFAULT 0,
+    reach_deltas JSON NOT NULL DEFAULT '[]',
+    like_deltas JSON NOT NULL DEFAULT '[]',
+    saved_deltas JSON NOT NULL DEFAULT '[]',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ig_media_id) REFERENCES media_posts(ig_media_id) ON DELETE CASCADE,
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 8. 未対応メトリクス
+CREATE TABLE IF NOT EXISTS unsupported_media_metrics (
+    media_type VARCHAR(20) NOT NULL,
+    product_type VARCHAR(20) NOT NULL DEFAULT '',
+    metric VARCHAR(50) NOT NULL,
+    ig_user_id VARCHAR(50) NOT NULL DEFAULT '',
+    error_message TEXT,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (media_type, product_type, metric, ig_user_id)
+);
+
+-- 9. アカウント統計のロールアップ (保持期間を過ぎた日次統計を週・月単位に集約, core/retention.py)
+CREATE TABLE IF NOT EXISTS account_stats_rollups (
+    id INTEGER PRIMARY KEY,
+    ig_user_id VARCHAR(50) NOT NULL,
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('week', 'month')),
+    period_start DATE NOT NULL, -- 週は月曜日か月初から (月をまたがない)
+    period_end DATE NOT NULL,
+    days INTEGER NOT NULL, -- 集約した日数
+    followers_total BIGINT NOT NULL, -- followers_count の合計 (平均 = followers_total / days)
+    followers_count INTEGER NOT NULL, -- 以下3列は期間最終日の値
+    follows_count INTEGER NOT NULL,
+    media_count INTEGER NOT NULL,
+    profile_views INTEGER, -- 以下3列は期間の合計
+    website_clicks INTEGER,
+    new_followers INTEGER,
+    UNIQUE(ig_user_id, granularity, period_start),
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 10. 投稿統計のロールアップ (期間内で最後に観測した値)
+CREATE TABLE IF NOT EXISTS media_stats_rollups (
+    id INTEGER PRIMARY KEY,
+    ig_media_id VARCHAR(50) NOT NULL,
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('week', 'month')),
+    period_start DATE NOT NULL,
+    date DATE NOT NULL, -- 値を観測した日
+    like_count INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0,
+    reach INTEGER,
+    views INTEGER,
+    shares INTEGER,
+    saved INTEGER,
+    engagement_rate NUMERIC(8,2),
+    UNIQUE(ig_media_id, granularity, period_start),
+    FOREIGN KEY (ig_media_id) REFERENCES media_posts(ig_media_id) ON DELETE CASCADE
+);
+
+-- インデックス作成 (create_tables.sql と同じ)
+CREATE INDEX IF NOT EXISTS idx_daily_account_stats_date ON daily_account_stats(date);
+CREATE INDEX IF NOT EXISTS idx_daily_media_stats_date ON daily_media_stats(date);
+CREATE INDEX IF NOT EXISTS idx_media_posts_timestamp ON media_posts(timestamp);
+CREATE INDEX IF NOT EXISTS idx_media_trajectories_user ON media_trajectories(ig_user_id, published_date);
+CREATE INDEX IF NOT EXISTS idx_media_stats_rollups_date ON media_stats_rollups(date);
+
+-- リポジトリのクエリ用 (migrations/001_schema_upgrade.sql と同じ, 日次統計は (投稿/アカウント, 日付) が一意キー)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_media_stats_media_date ON daily_media_stats(ig_media_id, date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_account_stats_user_date ON daily_account_stats(ig_user_id, date);
+CREATE INDEX IF NOT EXISTS idx_media_posts_user_timestamp ON media_posts(ig_user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_media_posts_user_engagement ON media_posts(ig_user_id, latest_engagement_rate);
+CREATE INDEX IF NOT EXISTS idx_unsupported_media_metrics_expires ON unsupported_media_metrics(expires_at);
@@ -0,0 +1,148 @@
+-- 001: create_tables.sql の初版 (PoC) から作成した既存DBを現在のスキーマに揃える
+-- 追加した列 (バックフィル含む)・テーブル・リポジトリのクエリを支えるインデックス
+-- create_tables.sql から作成したDBには同じ列・テーブル・インデックスがあるため、再計算するバックフィル以外は何もしない
+-- scripts/check_query_plans.py で各クエリがシーケンシャルスキャンにならないことを確認する
+
+-- 1. 日次投稿統計のエンゲージメント率
+-- エンゲージメント率 = (いいね + コメント + シェア + 保存) / リーチ * 100
+ALTER TABLE daily_media_stats ADD COLUMN IF NOT EXISTS engagement_rate NUMERIC(8,2);
+
+-- 既存行のバックフィル (リーチ未取得の行はNULLのまま)
+UPDATE daily_media_stats
+SET engagement_rate = CASE
+    WHEN reach = 0 THEN 0
+    ELSE ROUND((like_count + comments_count + COALESCE(shares, 0) + COALESCE(saved, 0)) * 100.0 / reach, 2)
+END
+WHERE engagement_rate IS NULL AND reach IS NOT NULL;
+
+-- 投稿分析のエンゲージメント率順の並べ替え用に、最新の統計の値を投稿に保持 (以降は保存時に更新, リーチ未取得は0)
+ALTER TABLE media_posts ADD COLUMN IF NOT EXISTS latest_engagement_rate NUMERIC(8,2) NOT NULL DEFAULT 0;
+
+UPDATE media_posts AS posts
+SET latest_engagement_rate = COALESCE(latest.engagement_rate, 0)
+FROM (
+    SELECT DISTINCT ON (ig_media_id) ig_media_id, engagement_rate
+    FROM daily_media_stats
+    ORDER BY ig_media_id, date DESC
+) AS latest
+WHERE posts.ig_media_id = latest.ig_media_id;
+
+-- 2. 日次アカウント統計のフォロワー増減
+-- new_followers = 当日のフォロワー数 - 直前の記録日のフォロワー数 (以降は保存時に更新)
+ALTER TABLE daily_account_stats ADD COLUMN IF NOT EXISTS new_followers INTEGER;
+
+-- 既存行のバックフィル (アカウント毎の最初の記録日はNULLのまま)
+-- 前日のフォロワー数が0/NULLの行 (未取得のプレースホルダ) は増減不明としてNULLのまま
+UPDATE daily_account_stats AS stats
+SET new_followers = growth.new_followers
+FROM (
+    SELECT
+        id,
+        followers_count - NULLIF(LAG(followers_count) OVER (PARTITION BY ig_user_id ORDER BY date), 0) AS new_followers
+    FROM daily_account_stats
+) AS growth
+WHERE stats.id = growth.id AND growth.new_followers IS NOT NULL;
+
+-- 3. 日次投稿統計の未変更日を行の延長で表す
+-- 各行は date〜last_seen_date の期間同じ値だったことを表す (保存時に値が変わらなければ last_seen_date のみ更新)
+ALTER TABLE daily_media_stats ADD COLUMN IF NOT EXISTS last_seen_date DATE;
+
+-- 既存行のバックフィル (1行 = 1日)
+UPDATE daily_media_stats SET last_seen_date = date WHERE last_seen_date IS NULL;
+
+-- 既存データの圧縮 (連続する同じ値の行を1行にまとめる) は任意: ../compact_media_stats_runs.sql を別途実行
+
+-- 4. 追加したテーブル
+-- アカウント別データバージョン（レスポンスキャッシュ無効化用）
+CREATE TABLE IF NOT EXISTS account_data_versions (
+    ig_user_id VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 投稿メトリクス推移（投稿からの経過日数別の累計値を前日差分配列で保持）
+CREATE TABLE IF NOT EXISTS media_trajectories (
+    ig_media_id VARCHAR(50) PRIMARY KEY,
+    ig_user_id VARCHAR(50) NOT NULL,
+    published_date DATE NOT NULL,
+    first_day INTEGER NOT NULL DEFAULT 0, -- 配列の先頭要素の経過日数
+    reach_deltas INTEGER[] NOT NULL DEFAULT '{}',
+    like_deltas INTEGER[] NOT NULL DEFAULT '{}',
+    saved_deltas INTEGER[] NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ig_media_id) REFERENCES media_posts(ig_media_id) ON DELETE CASCADE,
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 未対応メトリクス (ネガティブキャッシュ: 取得できないメトリクスを expires_at まで要求しない)
+CREATE TABLE IF NOT EXISTS unsupported_media_metrics (
+    media_type VARCHAR(20) NOT NULL,
+    product_type VARCHAR(20) NOT NULL DEFAULT '', -- FEED, REELS, STORY, AD
+    metric VARCHAR(50) NOT NULL,
+    ig_user_id VARCHAR(50) NOT NULL DEFAULT '', -- 空文字 = 全アカウント共通
+    error_message TEXT,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (media_type, product_type, metric, ig_user_id)
+);
+
+-- アカウント統計のロールアップ (保持期間を過ぎた日次統計を週・月単位に集約, core/retention.py)
+CREATE TABLE IF NOT EXISTS account_stats_rollups (
+    id SERIAL PRIMARY KEY,
+    ig_user_id VARCHAR(50) NOT NULL,
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('week', 'month')),
+    period_start DATE NOT NULL, -- 週は月曜日か月初から (月をまたがない)
+    period_end DATE NOT NULL,
+    days INTEGER NOT NULL, -- 集約した日数
+    followers_total BIGINT NOT NULL, -- followers_count の合計 (平均 = followers_total / days)
+    followers_count INTEGER NOT NULL, -- 以下3列は期間最終日の値
+    follows_count INTEGER NOT NULL,
+    media_count INTEGER NOT NULL,
+    profile_views INTEGER, -- 以下3列は期間の合計
+    website_clicks INTEGER,
+    new_followers INTEGER,
+    UNIQUE(ig_user_id, granularity, period_start),
+    FOREIGN KEY (ig_user_id) REFERENCES instagram_accounts(ig_user_id) ON DELETE CASCADE
+);
+
+-- 投稿統計のロールアップ (期間内で最後に観測した値)
+CREATE TABLE IF NOT EXISTS media_stats_rollups (
+    id SERIAL PRIMARY KEY,
+    ig_media_id VARCHAR(50) NOT NULL,
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('week', 'month')),
+    period_start DATE NOT NULL,
+    date DATE NOT NULL, -- 値を観測した日
+    like_count INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0,
+    reach INTEGER,
+    views INTEGER,
+    shares INTEGER,
+    saved INTEGER,
+    engagement_rate NUMERIC(8,2),
+    UNIQUE(ig_media_id, granularity, period_start),
+    FOREIGN KEY (ig_media_id) REFERENCES media_posts(ig_media_id) ON DELETE CASCADE
+);
+
+-- 5. リポジトリのクエリを支える複合インデックス・一意キー
+-- 日次統計の一意キー (投稿/アカウント + 日付)
+-- 投稿・アカウント単位の参照 (最新の行・期間指定) と一括upsert (on_conflict) の両方に使う
+-- 同じ列の旧 UNIQUE(date, ...) は先頭列が date で参照に使えないため置き換える
+CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_media_stats_media_date ON daily_media_stats(ig_media_id, date);
+ALTER TABLE daily_media_stats DROP CONSTRAINT IF EXISTS daily_media_stats_date_ig_media_id_key;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_account_stats_user_date ON daily_account_stats(ig_user_id, date);
+ALTER TABLE daily_account_stats DROP CONSTRAINT IF EXISTS daily_account_stats_date_ig_user_id_key;
+
+-- アカウントの投稿一覧・期間絞り込み・投稿数 (ig_user_id + timestamp)
+CREATE INDEX IF NOT EXISTS idx_media_posts_user_timestamp ON media_posts(ig_user_id, timestamp);
+
+-- 投稿分析のエンゲージメント率順
+CREATE INDEX IF NOT EXISTS idx_media_posts_user_engagement ON media_posts(ig_user_id, latest_engagement_rate);
+
+-- 投稿推移の一覧・ロールアップの期間指定
+CREATE INDEX IF NOT EXISTS idx_media_trajectories_user ON media_trajectories(ig_user_id, published_date);
+CREATE INDEX IF NOT EXISTS idx_media_stats_rollups_date ON media_stats_rollups(date);
+
+-- 有効期限内の未対応メトリクスの読み込み
+CREATE INDEX IF NOT EXISTS idx_unsupported_media_metrics_expires ON unsupported_media_metrics(expires_at);
@@ -0,0 +1,161 @@
+-- 002: daily_media_stats を date の月単位でレンジパーティション化 (既存DB向け)
+-- - 主キーは (id, date) (パーティションキーを含む必要がある)。id は既存のシーケンスを引き継ぐ
+-- - 月をまたぐ統計の行 (date〜last_seen_date) は月ごとの行に分割する (以降は保存時に月初で新しい行を始める)
+--   期間指定の参照は「開始月の月初 <= date <= 終了日」で該当する月のパーティションだけを読む
+-- - 月パーティションの事前作成・空になった古いパーティションの削除は scripts/manage_partitions.py (下の関数をRPCで呼ぶ)
+-- create_tables.sql から作成したDB (パーティション化済み) では関数と月パーティションの作成のみ行う
+-- 既存の行をすべてコピーするため、行数の多いDBではメンテナンス時間帯に実行する
+
+-- 1. 月パーティションの作成 (既定パーティションに入っていた同じ月の行は移してから ATTACH)
+CREATE OR REPLACE FUNCTION create_daily_media_stats_partition(p_month DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::date;
+    v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    v_name TEXT := 'daily_media_stats_' || to_char(p_month, 'YYYYMM');
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE daily_media_stats INCLUDING DEFAULTS)', v_name);
+    IF to_regclass('daily_media_stats_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM daily_media_stats_default WHERE date >= %L AND date < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+            v_start, v_end, v_name
+        );
+    END IF;
+    -- Indexes and the foreign key of the parent are created on attach
+    EXECUTE format('ALTER TABLE daily_media_stats ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', v_name, v_start, v_end);
+    RETURN v_name;
+END;
+$$;
+
+-- 2. p_from の月から p_months か月分のパーティションを作成 (作成したものを返す)
+CREATE OR REPLACE FUNCTION ensure_daily_media_stats_partitions(p_from DATE, p_months INTEGER)
+RETURNS TABLE (partition_name TEXT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    FOR i IN 0..p_months - 1 LOOP
+        partition_name := create_daily_media_stats_partition((date_trunc('month', p_from) + make_interval(months => i))::date);
+        IF partition_name IS NOT NULL THEN
+            RETURN NEXT;
+        END IF;
+    END LOOP;
+END;
+$$;
+
+-- 3. p_before より前に終わる月パーティションのうち、空のもの (アーカイブ・ダウンサンプリング済み) を切り離して削除
+--    行が残っているパーティション (収集されなくなった投稿の最新の行など) は dropped = false で返す
+CREATE OR REPLACE FUNCTION drop_empty_daily_media_stats_partitions(p_before DATE)
+RETURNS TABLE (partition_name TEXT, dropped BOOLEAN)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_has_rows BOOLEAN;
+BEGIN
+    FOR partition_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'daily_media_stats'::regclass
+          AND c.relname ~ '^daily_media_stats_[0-9]{6}$'
+          AND to_date(right(c.relname, 6), 'YYYYMM') + INTERVAL '1 month' <= p_before
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I)', partition_name) INTO v_has_rows;
+        dropped := NOT v_has_rows;
+        IF dropped THEN
+            EXECUTE format('ALTER TABLE daily_media_stats DETACH PARTITION %I', partition_name);
+            EXECUTE format('DROP TABLE %I', partition_name);
+        END IF;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$;
+
+-- DDLを実行する関数はサービスロール (バックエンド・収集ジョブ) からのみ呼べるようにする
+REVOKE EXECUTE ON FUNCTION create_daily_media_stats_partition(DATE) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION ensure_daily_media_stats_partitions(DATE, INTEGER) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION drop_empty_daily_media_stats_partitions(DATE) FROM PUBLIC;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        REVOKE EXECUTE ON FUNCTION create_daily_media_stats_partition(DATE) FROM anon, authenticated;
+        REVOKE EXECUTE ON FUNCTION ensure_daily_media_stats_partitions(DATE, INTEGER) FROM anon, authenticated;
+        REVOKE EXECUTE ON FUNCTION drop_empty_daily_media_stats_partitions(DATE) FROM anon, authenticated;
+    END IF;
+END;
+$$;
+
+-- 4. 既存テーブルの変換
+DO $$
+DECLARE
+    v_first DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'daily_media_stats'::regclass) THEN
+        RETURN;
+    END IF;
+
+    -- The sequence, constraint and index names move to the partitioned table
+    ALTER SEQUENCE daily_media_stats_id_seq OWNED BY NONE;
+    ALTER TABLE daily_media_stats RENAME TO daily_media_stats_legacy;
+    ALTER TABLE daily_media_stats_legacy RENAME CONSTRAINT daily_media_stats_pkey TO daily_media_stats_legacy_pkey;
+    DROP INDEX IF EXISTS idx_daily_media_stats_media_date;
+    DROP INDEX IF EXISTS idx_daily_media_stats_date;
+
+    CREATE TABLE daily_media_stats (
+        id INTEGER NOT NULL DEFAULT nextval('daily_media_stats_id_seq'),
+        date DATE NOT NULL,
+        ig_media_id VARCHAR(50) NOT NULL,
+        like_count INTEGER NOT NULL DEFAULT 0,
+        comments_count INTEGER NOT NULL DEFAULT 0,
+        reach INTEGER,
+        views INTEGER,
+        shares INTEGER,
+        saved INTEGER,
+        engagement_rate NUMERIC(8,2),
+        last_seen_date DATE,
+        PRIMARY KEY (id, date),
+        FOREIGN KEY (ig_media_id) REFERENCES media_posts(ig_media_id) ON DELETE CASCADE
+    ) PARTITION BY RANGE (date);
+    CREATE UNIQUE INDEX idx_daily_media_stats_media_date ON daily_media_stats(ig_media_id, date);
+    CREATE TABLE daily_media_stats_default PARTITION OF daily_media_stats DEFAULT;
+
+    SELECT MIN(date) INTO v_first FROM daily_media_stats_legacy;
+    v_first := COALESCE(v_first, CURRENT_DATE);
+    PERFORM * FROM ensure_daily_media_stats_partitions(
+        v_first,
+        ((date_part('year', CURRENT_DATE) - date_part('year', v_first)) * 12 + date_part('month', CURRENT_DATE) - date_part('month', v_first))::integer + 1
+    );
+
+    -- Runs crossing a month boundary become one row per month (the first keeps its id)
+    INSERT INTO daily_media_stats (id, date, ig_media_id, like_count, comments_count, reach, views, shares, saved, engagement_rate, last_seen_date)
+    SELECT
+        CASE WHEN m.month = date_trunc('month', l.date) THEN l.id ELSE nextval('daily_media_stats_id_seq') END,
+        GREATEST(l.date, m.month::date),
+        l.ig_media_id, l.like_count, l.comments_count, l.reach, l.views, l.shares, l.saved, l.engagement_rate,
+        LEAST(COALESCE(l.last_seen_date, l.date), (m.month + INTERVAL '1 month - 1 day')::date)
+    FROM daily_media_stats_legacy l
+    CROSS JOIN LATERAL generate_series(
+        date_trunc('month', l.date),
+        date_trunc('month', COALESCE(l.last_seen_date, l.date)),
+        INTERVAL '1 month'
+    ) AS m(month);
+
+    DROP TABLE daily_media_stats_legacy;
+    ALTER SEQUENCE daily_media_stats_id_seq OWNED BY daily_media_stats.id;
+END;
+$$;
+
+-- 5. 当月から3か月先までのパーティション
+SELECT * FROM ensure_daily_media_stats_partitions(CURRENT_DATE, 4);
@@ -0,0 +1,179 @@
+-- 003: 分析用集計関数 (Supabase RPC)
+-- CREATE OR REPLACE のため再実行可能。関数を変更するときは新しい番号のマイグレーションで置き換える
+-- generate_series のカレンダーに集計結果を LEFT JOIN し、データのない期間も0埋めした連続系列を返す
+-- p_interval: 'day' | 'week' | 'month' (週は月曜始まり)
+-- 保持期間を過ぎて週・月単位に集約された期間は account_stats_rollups から読む
+-- 系列の1期間より粗い集約済みの期間 (日単位の系列の週・月など) に含まれる期間は、
+-- 流量 (new_followers, profile_views, website_clicks) を NULL、フォロワー数を集約期間の平均とする
+-- データのない期間のフォロワー数は直前の期間の値を引き継ぐ (範囲の先頭は0)
+-- 投稿統計の系列は投稿 (集約しない) と各投稿の最新の行 (主テーブルに残る) だけを読むため集約の影響を受けない
+
+-- 1. アカウント統計の期間別系列
+CREATE OR REPLACE FUNCTION account_stats_series(
+    p_ig_user_id VARCHAR,
+    p_start_date DATE,
+    p_end_date DATE,
+    p_interval TEXT DEFAULT 'day'
+)
+RETURNS TABLE (
+    period DATE,
+    followers_count INTEGER,
+    new_followers INTEGER,
+    profile_views INTEGER,
+    website_clicks INTEGER
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH calendar AS (
+        SELECT generate_series(
+            date_trunc(p_interval, p_start_date::timestamp),
+            p_end_date::timestamp,
+            ('1 ' || p_interval)::interval
+        )::date AS period
+    ),
+    rollups AS (
+        -- 範囲と重なる集約済みの期間と、系列の1期間に収まるか
+        SELECT r.period_start, r.period_end, r.followers_total, r.days,
+               r.new_followers, r.profile_views, r.website_clicks,
+               date_trunc(p_interval, r.period_start::timestamp) = date_trunc(p_interval, r.period_end::timestamp) AS contained
+        FROM account_stats_rollups r
+        WHERE r.ig_user_id = p_ig_user_id
+          AND r.period_start <= p_end_date
+          AND r.period_end >= p_start_date
+    ),
+    samples AS (
+        -- 日次の行 (1日分) と系列の1期間に収まる集約済みの行 (期間開始日に days 日分)
+        SELECT s.date AS day, s.followers_count::bigint AS followers_total, 1 AS days,
+               s.new_followers, s.profile_views, s.website_clicks
+        FROM daily_account_stats s
+        WHERE s.ig_user_id = p_ig_user_id
+          AND s.date BETWEEN p_start_date AND p_end_date
+        UNION ALL
+        SELECT r.period_start, r.followers_total, r.days,
+               r.new_followers, r.profile_views, r.website_clicks
+        FROM rollups r
+        WHERE r.contained
+    ),
+    stats AS (
+        SELECT
+            date_trunc(p_interval, s.day::timestamp)::date AS period,
+            FLOOR(SUM(s.followers_total)::numeric / SUM(s.days))::integer AS followers_count,
+            SUM(s.new_followers)::integer AS new_followers,
+            SUM(s.profile_views)::integer AS profile_views,
+            SUM(s.website_clicks)::integer AS website_clicks
+        FROM samples s
+        GROUP BY 1
+    ),
+    covered AS (
+        -- 系列の期間を含む、より粗い集約済みの期間 (フォロワー数はその平均)
+        SELECT c.period, FLOOR(SUM(r.followers_total)::numeric / SUM(r.days))::integer AS followers_count
+        FROM calendar c
+        JOIN rollups r ON NOT r.contained
+         AND r.period_start < c.period + ('1 ' || p_interval)::interval
+         AND r.period_end >= c.period
+        GROUP BY c.period
+    ),
+    series AS (
+        SELECT
+            c.period,
+            COALESCE(s.followers_count, v.followers_count) AS followers_count,
+            CASE WHEN v.period IS NULL THEN COALESCE(s.new_followers, 0) END AS new_followers,
+            CASE WHEN v.period IS NULL THEN COALESCE(s.profile_views, 0) END AS profile_views,
+            CASE WHEN v.period IS NULL THEN COALESCE(s.website_clicks, 0) END AS website_clicks,
+            -- フォロワー数が分かっている期間の数 (引き継ぎのグループ)
+            COUNT(COALESCE(s.followers_count, v.followers_count)) OVER (ORDER BY c.period) AS known
+        FROM calendar c
+        LEFT JOIN stats s ON s.period = c.period
+        LEFT JOIN covered v ON v.period = c.period
+    )
+    SELECT
+        period,
+        COALESCE(MAX(followers_count) OVER (PARTITION BY known), 0),
+        new_followers,
+        profile_views,
+        website_clicks
+    FROM series
+    ORDER BY period;
+$$;
+
+-- 2. 投稿統計の期間別系列 (投稿日で集計、各投稿の最新統計を使用)
+CREATE OR REPLACE FUNCTION media_stats_series(
+    p_ig_user_id VARCHAR,
+    p_start_date DATE,
+    p_end_date DATE,
+    p_interval TEXT DEFAULT 'day'
+)
+RETURNS TABLE (
+    period DATE,
+    posts_count INTEGER,
+    total_likes INTEGER,
+    total_comments INTEGER,
+    total_shares INTEGER,
+    total_saved INTEGER,
+    total_reach INTEGER,
+    avg_engagement_rate NUMERIC
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH calendar AS (
+        SELECT generate_series(
+            date_trunc(p_interval, p_start_date::timestamp),
+            p_end_date::timestamp,
+            ('1 ' || p_interval)::interval
+        )::date AS period
+    ),
+    posts AS (
+        SELECT p.ig_media_id, date_trunc(p_interval, p.timestamp)::date AS period
+        FROM media_posts p
+        WHERE p.ig_user_id = p_ig_user_id
+          AND p.timestamp >= p_start_date
+          AND p.timestamp < p_end_date + 1
+    ),
+    latest AS (
+        SELECT DISTINCT ON (s.ig_media_id)
+            s.ig_media_id,
+            s.like_count,
+            s.comments_count,
+            COALESCE(s.shares, 0) AS shares,
+            COALESCE(s.saved, 0) AS saved,
+            COALESCE(s.reach, 0) AS reach,
+            -- 保存済みのエンゲージメント率 (未保存の行は再計算)
+            COALESCE(
+                s.engagement_rate,
+                (s.like_count + s.comments_count + COALESCE(s.shares, 0) + COALESCE(s.saved, 0)) * 100.0 / NULLIF(s.reach, 0),
+                0
+            ) AS engagement_rate
+        FROM daily_media_stats s
+        JOIN posts ON posts.ig_media_id = s.ig_media_id
+        -- 統計は投稿日以降に始まる: 範囲より前の月パーティションを読まない (タイムゾーン差の1日は含める)
+        WHERE s.date >= p_start_date - 1
+        ORDER BY s.ig_media_id, s.date DESC
+    ),
+    totals AS (
+        SELECT
+            posts.period,
+            COUNT(*)::integer AS posts_count,
+            COALESCE(SUM(l.like_count), 0)::integer AS total_likes,
+            COALESCE(SUM(l.comments_count), 0)::integer AS total_comments,
+            COALESCE(SUM(l.shares), 0)::integer AS total_shares,
+            COALESCE(SUM(l.saved), 0)::integer AS total_saved,
+            COALESCE(SUM(l.reach), 0)::integer AS total_reach,
+            -- リーチ加重平均
+            SUM(l.engagement_rate * l.reach) / NULLIF(SUM(l.reach), 0) AS avg_engagement_rate
+        FROM posts
+        LEFT JOIN latest l ON l.ig_media_id = posts.ig_media_id
+        GROUP BY posts.period
+    )
+    SELECT
+        c.period,
+        COALESCE(t.posts_count, 0),
+        COALESCE(t.total_likes, 0),
+        COALESCE(t.total_comments, 0),
+        COALESCE(t.total_shares, 0),
+        COALESCE(t.total_saved, 0),
+        COALESCE(t.total_reach, 0),
+        ROUND(COALESCE(t.avg_engagement_rate, 0), 2)
+    FROM calendar c
+    LEFT JOIN totals t ON t.period = c.period
+    ORDER BY c.period;
+$$;
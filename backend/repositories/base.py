@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import TypeVar, Generic, Optional, List
 from core.database import database
@@ -9,7 +10,31 @@ class BaseRepository(Generic[T], ABC):
     
     def __init__(self, table_name: str):
         self.table_name = table_name
-        self.client = database.client
+    
+    @property
+    def client(self):
+        """Database client of the configured backend (resolved on first use, not at import)"""
+        return database.client
+    
+    async def _execute(self, query):
+        """Execute a PostgREST query in a worker thread so the event loop is not blocked"""
+        return await asyncio.to_thread(query.execute)
+    
+    async def _execute_all(self, query, page_size: int = 1000) -> List[dict]:
+        """Execute a select query page by page (PostgREST caps rows per response)
+        
+        The query needs a total order (ending in a unique column) so offset pages neither skip nor repeat rows.
+        """
+        base_params = query.params
+        rows = []
+        offset = 0
+        while True:
+            query.params = base_params.set('offset', offset).set('limit', page_size)
+            result = await self._execute(query)
+            rows.extend(result.data)
+            if len(result.data) < page_size:
+                return rows
+            offset += page_size
     
     @abstractmethod
     async def create(self, entity: T) -> Optional[T]:
@@ -1,9 +1,33 @@
-from typing import Optional, List, Dict
-from datetime import datetime
-from models.instagram import InstagramAccount, MediaPost
+import asyncio
+import time
+from typing import Optional, List, Dict, AsyncIterator
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from models.instagram import (
+    InstagramAccount, MediaPost, ACCOUNT_COLUMNS, ACCOUNT_TOKEN_COLUMNS, ACCOUNT_STATS_COLUMNS,
+    MEDIA_POST_CARD_COLUMNS, MEDIA_POST_COLUMNS, MEDIA_STATS_COLUMNS, MEDIA_STATS_RUN_COLUMNS
+)
 from repositories.base import BaseRepository
+from core.analytics_engine import calculate_engagement_rate
+from core.trajectory import add_observation, build_trajectory
+from core.cache import response_cache
+from core.stats_archive import ARCHIVE_COLUMNS, merge_stats_rows, stats_archive
+from core.retention import ACCOUNT_LAST_FIELDS, ACCOUNT_SUM_FIELDS, MEDIA_ROLLUP_FIELDS, account_rollup, group_by_period, media_rollups
 from core.exceptions import DatabaseConnectionError
 
+# Values compared to decide whether a post's daily stats moved
+MEDIA_STATS_FIELDS = ['like_count', 'comments_count', 'reach', 'views', 'shares', 'saved']
+# Insight values kept from the latest row when a save only carries counts
+MEDIA_INSIGHT_FIELDS = ['reach', 'views', 'shares', 'saved']
+# Rollup rows re-read by compaction (merged into coarser periods)
+ACCOUNT_ROLLUP_COLUMNS = 'id, period_start, days, followers_total, ' + ', '.join(ACCOUNT_LAST_FIELDS + ACCOUNT_SUM_FIELDS)
+MEDIA_ROLLUP_COLUMNS = 'id, ig_media_id, period_start, date, ' + ', '.join(MEDIA_ROLLUP_FIELDS)
+# Ids per in_() filter (PostgREST sends filters in the URL)
+IN_FILTER_CHUNK_SIZE = 100
+# Attempts to write the data version after a save (seconds waited grow with each retry)
+DATA_VERSION_BUMP_ATTEMPTS = 3
+DATA_VERSION_BUMP_RETRY_SECONDS = 0.5
+
 class InstagramAccountRepository(BaseRepository[InstagramAccount]):
     """Instagram account data access repository"""
     
@@ -13,31 +37,33 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
     async def create(self, account: InstagramAccount) -> Optional[InstagramAccount]:
         """Create a new Instagram account"""
         try:
-            result = self.client.table(self.table_name).insert({
+            result = await self._execute(self.client.table(self.table_name).insert({
                 'name': account.name,
                 'ig_user_id': account.ig_user_id,
                 'access_token': account.access_token,
                 'username': account.username,
                 'profile_picture_url': account.profile_picture_url
-            }).execute()
+            }))
             return InstagramAccount(**result.data[0]) if result.data else None
         except Exception as e:
             self._log_database_error("create", e)
             return None
     
-    async def get_by_id(self, ig_user_id: str) -> Optional[InstagramAccount]:
-        """Get Instagram account by ig_user_id"""
+    async def get_by_id(self, ig_user_id: str, with_token: bool = False) -> Optional[InstagramAccount]:
+        """Get Instagram account by ig_user_id (access_token only when with_token)"""
         try:
-            result = self.client.table(self.table_name).select('*').eq('ig_user_id', ig_user_id).execute()
+            columns = ACCOUNT_TOKEN_COLUMNS if with_token else ACCOUNT_COLUMNS
+            result = await self._execute(self.client.table(self.table_name).select(columns).eq('ig_user_id', ig_user_id))
             return InstagramAccount(**result.data[0]) if result.data else None
         except Exception as e:
             self._log_database_error("get_by_id", e)
             return None
     
-    async def get_all(self) -> List[InstagramAccount]:
-        """Get all Instagram accounts"""
+    async def get_all(self, with_token: bool = False) -> List[InstagramAccount]:
+        """Get all Instagram accounts (access_token only when with_token)"""
         try:
-            result = self.client.table(self.table_name).select('*').execute()
+            columns = ACCOUNT_TOKEN_COLUMNS if with_token else ACCOUNT_COLUMNS
+            result = await self._execute(self.client.table(self.table_name).select(columns))
             return [InstagramAccount(**account) for account in result.data]
         except Exception as e:
             self._log_database_error("get_all", e)
@@ -46,7 +72,7 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
     async def update(self, ig_user_id: str, update_data: dict) -> Optional[InstagramAccount]:
         """Update Instagram account by ig_user_id"""
         try:
-            result = self.client.table(self.table_name).update(update_data).eq('ig_user_id', ig_user_id).execute()
+            result = await self._execute(self.client.table(self.table_name).update(update_data).eq('ig_user_id', ig_user_id))
             return InstagramAccount(**result.data[0]) if result.data else None
         except Exception as e:
             self._log_database_error("update", e)
@@ -74,9 +100,9 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
     async def update_token(self, ig_user_id: str, access_token: str) -> bool:
         """Update access token for Instagram account"""
         try:
-            result = self.client.table(self.table_name).update({
+            result = await self._execute(self.client.table(self.table_name).update({
                 'access_token': access_token
-            }).eq('ig_user_id', ig_user_id).execute()
+            }).eq('ig_user_id', ig_user_id))
             return len(result.data) > 0
         except Exception as e:
             print(f"Error updating Instagram account token: {e}")
@@ -85,7 +111,8 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
     async def delete(self, ig_user_id: str) -> bool:
         """Delete Instagram account by ig_user_id"""
         try:
-            result = self.client.table(self.table_name).delete().eq('ig_user_id', ig_user_id).execute()
+            result = await self._execute(self.client.table(self.table_name).delete().eq('ig_user_id', ig_user_id))
+            response_cache.invalidate(ig_user_id)
             return len(result.data) > 0
         except Exception as e:
             print(f"Error deleting Instagram account: {e}")
@@ -126,7 +153,7 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
             saved_count = 0
             for media_data in media_posts:
                 # Check if media already exists
-                existing = self.client.table('media_posts').select('id').eq('ig_media_id', media_data['id']).execute()
+                existing = await self._execute(self.client.table('media_posts').select('id').eq('ig_media_id', media_data['id']))
                 
                 post_data = {
                     'ig_media_id': media_data['id'],
@@ -141,13 +168,14 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
                 
                 if existing.data:
                     # Update existing post
-                    self.client.table('media_posts').update(post_data).eq('ig_media_id', media_data['id']).execute()
+                    await self._execute(self.client.table('media_posts').update(post_data).eq('ig_media_id', media_data['id']))
                 else:
                     # Insert new post
-                    self.client.table('media_posts').insert(post_data).execute()
+                    await self._execute(self.client.table('media_posts').insert(post_data))
                 
                 saved_count += 1
             
+            await self.bump_data_version({media_data.get('ig_user_id') for media_data in media_posts})
             return saved_count
         except Exception as e:
             print(f"Error saving media posts: {e}")
@@ -156,115 +184,566 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
     async def get_media_posts(self, ig_user_id: str, limit: int = 25) -> List[Dict]:
         """Get media posts from database"""
         try:
-            result = self.client.table('media_posts').select('*').eq('ig_user_id', ig_user_id).order('timestamp', desc=True).limit(limit).execute()
+            result = await self._execute(self.client.table('media_posts').select(MEDIA_POST_COLUMNS).eq('ig_user_id', ig_user_id).order('timestamp', desc=True).limit(limit))
             return result.data
         except Exception as e:
             print(f"Error getting media posts: {e}")
             return []
     
-    async def get_media_posts_with_stats(self, ig_user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, media_type: Optional[str] = None, limit: int = 25) -> List[Dict]:
-        """Get media posts with latest stats for posts analysis page"""
+    async def get_media_post_ids(self, ig_user_id: str) -> List[str]:
+        """Get ids of all known media posts of an account (newest first)"""
+        try:
+            rows = await self._execute_all(self.client.table('media_posts').select('ig_media_id').eq('ig_user_id', ig_user_id).order('timestamp', desc=True).order('ig_media_id'))
+            return [row['ig_media_id'] for row in rows]
+        except Exception as e:
+            print(f"Error getting media post ids: {e}")
+            return []
+    
+    async def get_known_media_posts(self, ig_user_id: str) -> List[Dict]:
+        """Get id, timestamp and media type of all known media posts of an account (newest first)"""
         try:
-            query = self.client.table('media_posts').select('''
-                *,
-                daily_media_stats(date, like_count, comments_count, reach, views, shares, saved)
-            ''').eq('ig_user_id', ig_user_id)
+            return await self._execute_all(
+                self.client.table('media_posts').select('ig_media_id, timestamp, media_type').eq('ig_user_id', ig_user_id).order('timestamp', desc=True).order('ig_media_id')
+            )
+        except Exception as e:
+            print(f"Error getting known media posts: {e}")
+            return []
+    
+    async def get_media_posts_with_stats(self, ig_user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, media_type: Optional[str] = None, limit: int = 25, sort_by: str = 'timestamp', descending: bool = True) -> List[Dict]:
+        """Get media posts with latest stats for posts analysis page
+        
+        sort_by 'engagement_rate' orders by the latest stored rate (media_posts.latest_engagement_rate)
+        before the limit is applied; otherwise the newest posts come first.
+        Read errors propagate (the analytics endpoints answer 500 and cache nothing).
+        """
+        query = self.client.table('media_posts').select(f'{MEDIA_POST_COLUMNS}, daily_media_stats({MEDIA_STATS_COLUMNS})').eq('ig_user_id', ig_user_id)
+        
+        if media_type:
+            query = query.eq('media_type', media_type)
+        if start_date:
+            query = query.gte('timestamp', start_date.isoformat())
+        if end_date:
+            query = query.lte('timestamp', end_date.isoformat())
             
-            if media_type:
-                query = query.eq('media_type', media_type)
-            if start_date:
-                query = query.gte('timestamp', start_date.isoformat())
-            if end_date:
-                query = query.lte('timestamp', end_date.isoformat())
-                
-            result = query.order('timestamp', desc=True).limit(limit).execute()
-            
-            # Process data to get latest stats for each post
-            processed_data = []
-            for post in result.data:
-                # Get latest stats if available
-                latest_stats = None
-                if post.get('daily_media_stats'):
-                    # Sort by date and get latest
-                    stats_sorted = sorted(post['daily_media_stats'], key=lambda x: x['date'], reverse=True)
-                    if stats_sorted:
-                        latest_stats = stats_sorted[0]
-                
-                post_with_stats = {
-                    **post,
-                    'like_count': latest_stats['like_count'] if latest_stats else 0,
-                    'comments_count': latest_stats['comments_count'] if latest_stats else 0,
-                    'reach': latest_stats.get('reach') if latest_stats else None,
-                    'views': latest_stats.get('views') if latest_stats else None,
-                    'shares': latest_stats.get('shares') if latest_stats else None,
-                    'saved': latest_stats.get('saved') if latest_stats else None
-                }
-                del post_with_stats['daily_media_stats']  # Clean up
-                processed_data.append(post_with_stats)
+        if sort_by == 'engagement_rate':
+            query = query.order('latest_engagement_rate', desc=descending)
+        result = await self._execute(query.order('timestamp', desc=True).order('ig_media_id').limit(limit))
+        
+        # Process data to get latest stats for each post
+        return [self._merge_latest_stats(post) for post in result.data]
+    
+    async def get_recent_media_posts_with_stats(self, ig_user_ids: List[str], start_date: datetime) -> Dict[str, List[Dict]]:
+        """Get posts published since start_date with latest stats, grouped by account (single set-based query)"""
+        try:
+            query = self.client.table('media_posts').select(f'{MEDIA_POST_CARD_COLUMNS}, daily_media_stats({MEDIA_STATS_COLUMNS})').in_('ig_user_id', ig_user_ids).gte('timestamp', start_date.isoformat()).order('timestamp', desc=True).order('ig_media_id')
             
-            return processed_data
+            posts_by_account = {ig_user_id: [] for ig_user_id in ig_user_ids}
+            for post in await self._execute_all(query):
+                posts_by_account[post['ig_user_id']].append(self._merge_latest_stats(post))
             
+            return posts_by_account
         except Exception as e:
-            print(f"Error getting media posts with stats: {e}")
-            return []
+            print(f"Error getting recent media posts with stats: {e}")
+            return {}
+    
+    def _merge_latest_stats(self, post: Dict) -> Dict:
+        """Flatten embedded daily_media_stats into the post using the latest row"""
+        # Get latest stats if available
+        latest_stats = None
+        if post.get('daily_media_stats'):
+            latest_stats = max(post['daily_media_stats'], key=lambda x: x['date'])
+        
+        post_with_stats = {
+            **post,
+            'like_count': latest_stats['like_count'] if latest_stats else 0,
+            'comments_count': latest_stats['comments_count'] if latest_stats else 0,
+            'reach': latest_stats.get('reach') if latest_stats else None,
+            'views': latest_stats.get('views') if latest_stats else None,
+            'shares': latest_stats.get('shares') if latest_stats else None,
+            'saved': latest_stats.get('saved') if latest_stats else None,
+            'engagement_rate': latest_stats.get('engagement_rate') if latest_stats else None
+        }
+        post_with_stats.pop('daily_media_stats', None)  # Clean up
+        return post_with_stats
     
     async def save_daily_media_stats(self, media_stats: List[Dict]) -> int:
-        """Save daily media statistics to database (UPSERT)"""
+        """Save daily media statistics to database (UPSERT)
+        
+        Rows are runs of identical values: when nothing moved since the latest row,
+        its last_seen_date is extended instead of writing a new row.
+        Runs never cross a month boundary (the table is partitioned by month on date),
+        so the first save of a month starts a new run.
+        Insight fields missing from the input (count-only refresh) keep the latest values.
+        Only saves carrying insights are added to the trajectories, whose last day is the
+        insight refresh date the refresh policy schedules from.
+        """
         try:
             saved_count = 0
+            insight_records = []
             today = datetime.now().date().isoformat()
             
             for stats_data in media_stats:
-                # Check if stats already exist for today
-                existing = self.client.table('daily_media_stats').select('id').eq('ig_media_id', stats_data['ig_media_id']).eq('date', today).execute()
+                # Current snapshot (latest run) of the post
+                latest_result = await self._execute(
+                    self.client.table('daily_media_stats').select('id, date, last_seen_date, ' + ', '.join(MEDIA_STATS_FIELDS))
+                    .eq('ig_media_id', stats_data['ig_media_id']).lte('date', today).order('date', desc=True).limit(1)
+                )
+                latest = latest_result.data[0] if latest_result.data else None
                 
                 stats_record = {
                     'date': today,
+                    'last_seen_date': today,
                     'ig_media_id': stats_data['ig_media_id'],
                     'like_count': stats_data.get('like_count', 0),
                     'comments_count': stats_data.get('comments_count', 0),
-                    'reach': stats_data.get('reach'),
-                    'views': stats_data.get('views'),
-                    'shares': stats_data.get('shares'),
-                    'saved': stats_data.get('saved')
+                    **{field: stats_data.get(field, (latest or {}).get(field)) for field in MEDIA_INSIGHT_FIELDS}
                 }
+                # Store engagement rate with the counts so reads and rollups don't recompute it
+                stats_record['engagement_rate'] = calculate_engagement_rate(
+                    like_count=stats_record['like_count'],
+                    comments_count=stats_record['comments_count'],
+                    shares=stats_record['shares'],
+                    saved=stats_record['saved'],
+                    reach=stats_record['reach']
+                )
                 
-                if existing.data:
-                    # Update existing stats
-                    self.client.table('daily_media_stats').update(stats_record).eq('ig_media_id', stats_data['ig_media_id']).eq('date', today).execute()
+                # Updates filter on date too so only the run's month partition is touched
+                if latest and latest['date'][:7] == today[:7] and all(latest.get(field) == stats_record[field] for field in MEDIA_STATS_FIELDS):
+                    # Unchanged: extend the current run (no write if it already covers today)
+                    if (latest.get('last_seen_date') or latest['date']) < today:
+                        await self._execute(self.client.table('daily_media_stats').update({'last_seen_date': today}).eq('id', latest['id']).eq('date', latest['date']))
+                elif latest and latest['date'] == today:
+                    # Update today's run
+                    await self._execute(self.client.table('daily_media_stats').update(stats_record).eq('id', latest['id']).eq('date', latest['date']))
+                    await self._update_latest_engagement_rate(stats_record)
                 else:
+                    if latest and (latest.get('last_seen_date') or latest['date']) >= today:
+                        # Values moved after the run was extended to today: close it yesterday
+                        yesterday = (date.fromisoformat(today) - timedelta(days=1)).isoformat()
+                        await self._execute(self.client.table('daily_media_stats').update({'last_seen_date': yesterday}).eq('id', latest['id']).eq('date', latest['date']))
                     # Insert new stats
-                    self.client.table('daily_media_stats').insert(stats_record).execute()
+                    await self._execute(self.client.table('daily_media_stats').insert(stats_record))
+                    await self._update_latest_engagement_rate(stats_record)
                 
                 saved_count += 1
+                if any(field in stats_data for field in MEDIA_INSIGHT_FIELDS):
+                    insight_records.append(stats_record)
             
+            if insight_records:
+                await self._update_media_trajectories(insight_records, today)
+            await self.bump_data_version(await self._get_media_owners(media_stats))
             return saved_count
         except Exception as e:
             print(f"Error saving daily media stats: {e}")
             return 0
     
+    async def _update_latest_engagement_rate(self, stats_record: Dict):
+        """Keep the post's latest engagement rate (sort key of the posts analysis page, 0 without reach)"""
+        await self._execute(
+            self.client.table('media_posts').update({'latest_engagement_rate': stats_record['engagement_rate'] or 0})
+            .eq('ig_media_id', stats_record['ig_media_id'])
+        )
+    
+    async def _update_media_trajectories(self, stats_records: List[Dict], today: str):
+        """Add the day's stats to each post's trajectory (indexed by days since publish)"""
+        try:
+            media_ids = [record['ig_media_id'] for record in stats_records]
+            posts, trajectories = {}, {}
+            for start in range(0, len(media_ids), IN_FILTER_CHUNK_SIZE):
+                chunk = media_ids[start:start + IN_FILTER_CHUNK_SIZE]
+                posts_result = await self._execute(self.client.table('media_posts').select('ig_media_id, ig_user_id, timestamp').in_('ig_media_id', chunk))
+                existing_result = await self._execute(self.client.table('media_trajectories').select('ig_media_id, first_day, reach_deltas, like_deltas, saved_deltas').in_('ig_media_id', chunk))
+                posts.update((post['ig_media_id'], post) for post in posts_result.data)
+                trajectories.update((row['ig_media_id'], row) for row in existing_result.data)
+            
+            records = []
+            for record in stats_records:
+                post = posts.get(record['ig_media_id'])
+                if not post:
+                    continue
+                day = (date.fromisoformat(today) - date.fromisoformat(post['timestamp'][:10])).days
+                if day < 0:
+                    continue
+                trajectory = add_observation(trajectories.get(record['ig_media_id']), day, record)
+                records.append(self._trajectory_record(post, trajectory))
+            
+            if records:
+                await self._execute(self.client.table('media_trajectories').upsert(records, on_conflict='ig_media_id'))
+        except Exception as e:
+            print(f"Error updating media trajectories: {e}")
+    
+    def _trajectory_record(self, post: Dict, trajectory: Dict) -> Dict:
+        """Build a media_trajectories row"""
+        return {
+            'ig_media_id': post['ig_media_id'],
+            'ig_user_id': post['ig_user_id'],
+            'published_date': post['timestamp'][:10],
+            **trajectory,
+            'updated_at': datetime.now().isoformat()
+        }
+    
+    async def rebuild_media_trajectories(self, ig_user_id: str, batch_size: int = 500) -> int:
+        """Rebuild all post trajectories of an account from daily_media_stats history"""
+        try:
+            posts = await self._execute_all(self.client.table('media_posts').select('ig_media_id, ig_user_id, timestamp').eq('ig_user_id', ig_user_id).order('ig_media_id'))
+            stats_rows = await self._execute_all(
+                self.client.table('daily_media_stats').select('id, date, last_seen_date, ig_media_id, reach, like_count, saved, media_posts!inner(ig_user_id)')
+                .eq('media_posts.ig_user_id', ig_user_id).order('id')
+            )
+            stats_rows = merge_stats_rows(await self._get_archived_media_stats(ig_user_id), stats_rows)
+            stats_rows += await self._get_media_stats_rollups(ig_user_id=ig_user_id)
+            
+            # Group history by post as (days since publish, stats row); a run is observed at both ends
+            published = {post['ig_media_id']: date.fromisoformat(post['timestamp'][:10]) for post in posts}
+            history = {}
+            for row in stats_rows:
+                for observed in {row['date'], row.get('last_seen_date') or row['date']}:
+                    day = (date.fromisoformat(observed) - published[row['ig_media_id']]).days
+                    if day >= 0:
+                        history.setdefault(row['ig_media_id'], []).append((day, row))
+            
+            records = []
+            for post in posts:
+                observations = history.get(post['ig_media_id'])
+                if observations:
+                    days, rows = zip(*observations)
+                    records.append(self._trajectory_record(post, build_trajectory(list(days), list(rows))))
+            
+            for start in range(0, len(records), batch_size):
+                await self._execute(self.client.table('media_trajectories').upsert(records[start:start + batch_size], on_conflict='ig_media_id'))
+            
+            await self.bump_data_version([ig_user_id])
+            return len(records)
+        except Exception as e:
+            print(f"Error rebuilding media trajectories: {e}")
+            return 0
+    
+    async def get_media_trajectories(self, ig_user_id: str, published_since: Optional[date] = None) -> List[Dict]:
+        """Get delta-encoded post trajectories of an account (newest posts first, raises on read errors)"""
+        query = self.client.table('media_trajectories').select(
+            'ig_media_id, published_date, first_day, reach_deltas, like_deltas, saved_deltas'
+        ).eq('ig_user_id', ig_user_id)
+        
+        if published_since:
+            query = query.gte('published_date', published_since.isoformat())
+        
+        return await self._execute_all(query.order('published_date', desc=True).order('ig_media_id'))
+    
     async def get_media_stats(self, ig_media_id: str, date_range: Optional[tuple] = None) -> List[Dict]:
-        """Get media statistics from database"""
+        """Get media statistics from database (one row per day, newest first)"""
         try:
-            query = self.client.table('daily_media_stats').select('*').eq('ig_media_id', ig_media_id)
+            query = self.client.table('daily_media_stats').select(MEDIA_STATS_RUN_COLUMNS).eq('ig_media_id', ig_media_id)
             
+            start_date = end_date = None
             if date_range:
                 start_date, end_date = date_range
-                query = query.gte('date', start_date.isoformat()).lte('date', end_date.isoformat())
+                # Runs that overlap the range (runs start within their month: earlier month partitions are pruned)
+                query = query.gte('last_seen_date', start_date.isoformat()).gte('date', self._month_start(start_date)).lte('date', end_date.isoformat())
             
-            result = query.order('date', desc=True).execute()
-            return result.data
+            result = await self._execute(query.order('date'))
+            rows = result.data
+            
+            if stats_archive.enabled:
+                archived = []
+                for ig_user_id in await self._get_media_owners([{'ig_media_id': ig_media_id}]):
+                    archived += await self._get_archived_media_stats(ig_user_id, start_date, end_date, ig_media_id)
+                rows = merge_stats_rows(archived, rows)
+            
+            # Downsampled history (one row per week or month)
+            rows += await self._get_media_stats_rollups(ig_media_id=ig_media_id, start_date=start_date, end_date=end_date)
+            rows.sort(key=lambda row: row['date'])
+            
+            return self._expand_stats_runs(rows, start_date, end_date)[::-1]
         except Exception as e:
             print(f"Error getting media stats: {e}")
             return []
     
+    async def iter_media_stats_export(self, ig_user_id: str, start_date=None, end_date=None, page_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Yield daily media stats joined with post metadata page by page (keyset pagination on id, then archived and downsampled history)"""
+        last_id = 0
+        while True:
+            try:
+                query = self.client.table('daily_media_stats').select(
+                    'id, date, last_seen_date, ig_media_id, like_count, comments_count, reach, views, shares, saved, engagement_rate, '
+                    'media_posts!inner(ig_user_id, timestamp, media_type, permalink, caption)'
+                ).eq('media_posts.ig_user_id', ig_user_id).gt('id', last_id)
+                
+                if start_date:
+                    query = query.gte('last_seen_date', start_date.isoformat()).gte('date', self._month_start(start_date))
+                if end_date:
+                    query = query.lte('date', end_date.isoformat())
+                
+                result = await self._execute(query.order('id').limit(page_size))
+            except Exception as e:
+                print(f"Error exporting media stats: {e}")
+                raise
+            
+            rows = []
+            for row in result.data:
+                post = row.pop('media_posts') or {}
+                rows.append({**row, **post})
+            
+            if rows:
+                last_id = rows[-1]['id']
+                yield self._expand_stats_runs(rows, start_date, end_date)
+            if len(rows) < page_size:
+                break
+        
+        async for rows in self._iter_archived_media_stats(ig_user_id, start_date, end_date, page_size):
+            yield self._expand_stats_runs(await self._with_post_metadata(rows), start_date, end_date)
+        
+        last_id = 0
+        while True:
+            query = self._media_stats_rollups_query(ig_user_id=ig_user_id, start_date=start_date, end_date=end_date).gt('id', last_id)
+            rows = (await self._execute(query.order('id').limit(page_size))).data
+            if rows:
+                last_id = rows[-1]['id']
+                yield self._expand_stats_runs(await self._with_post_metadata(self._rollup_runs(rows)), start_date, end_date)
+            if len(rows) < page_size:
+                break
+    
+    async def _iter_archived_media_stats(self, ig_user_id: str, start_date, end_date, page_size: int) -> AsyncIterator[List[Dict]]:
+        """Yield archived stats runs one month partition at a time, without rows an interrupted archive run left in the table"""
+        if not stats_archive.enabled:
+            return
+        for year, month in await asyncio.to_thread(stats_archive.archived_months, ig_user_id):
+            if (start_date and (year, month) < (start_date.year, start_date.month)) or (end_date and (year, month) > (end_date.year, end_date.month)):
+                continue
+            rows = await asyncio.to_thread(stats_archive.read_month_media_stats, ig_user_id, year, month, start_date, end_date)
+            if not rows:
+                continue
+            
+            # Runs never cross months, so only the table rows of the same month can duplicate archived ones (the table wins)
+            hot = await self._execute_all(
+                self.client.table('daily_media_stats').select('id, media_posts!inner(ig_user_id)').eq('media_posts.ig_user_id', ig_user_id)
+                .gte('date', date(year, month, 1).isoformat()).lte('date', date(year, month, monthrange(year, month)[1]).isoformat()).order('id')
+            )
+            hot_ids = {row['id'] for row in hot}
+            rows = [row for row in rows if row['id'] not in hot_ids]
+            for start in range(0, len(rows), page_size):
+                yield rows[start:start + page_size]
+    
+    async def _with_post_metadata(self, rows: List[Dict]) -> List[Dict]:
+        """Stats rows joined with the metadata of their posts, looked up for the page only"""
+        media_ids = sorted({row['ig_media_id'] for row in rows})
+        posts = {}
+        for start in range(0, len(media_ids), IN_FILTER_CHUNK_SIZE):
+            for post in await self._execute_all(
+                self.client.table('media_posts').select('ig_media_id, ig_user_id, timestamp, media_type, permalink, caption')
+                .in_('ig_media_id', media_ids[start:start + IN_FILTER_CHUNK_SIZE]).order('ig_media_id')
+            ):
+                posts[post.pop('ig_media_id')] = post
+        return [{**row, **posts.get(row['ig_media_id'], {})} for row in rows]
+    
+    async def _get_archived_media_stats(self, ig_user_id: str, start_date=None, end_date=None, ig_media_id: Optional[str] = None) -> List[Dict]:
+        """Stats runs moved to the Parquet archive (empty when the archive is disabled)"""
+        if not stats_archive.enabled:
+            return []
+        return await asyncio.to_thread(stats_archive.read_media_stats, ig_user_id, start_date, end_date, ig_media_id)
+    
+    async def get_closed_media_stats(self, ig_user_id: str, before: date) -> List[Dict]:
+        """Stats runs of an account that ended before the date, except the latest run of each post"""
+        try:
+            rows = await self._execute_all(
+                self.client.table('daily_media_stats').select(', '.join(ARCHIVE_COLUMNS) + ', media_posts!inner(ig_user_id)')
+                .eq('media_posts.ig_user_id', ig_user_id).lt('date', before.isoformat()).lt('last_seen_date', before.isoformat()).order('id')
+            )
+            # Posts with a run still open at the cutoff: every earlier run is superseded
+            open_runs = await self._execute_all(
+                self.client.table('daily_media_stats').select('ig_media_id, media_posts!inner(ig_user_id)')
+                .eq('media_posts.ig_user_id', ig_user_id).gte('last_seen_date', before.isoformat()).order('id')
+            )
+            superseded = {row['ig_media_id'] for row in open_runs}
+            
+            # The latest run stays in the table for saves and latest-value reads
+            latest = {}
+            for row in rows:
+                row.pop('media_posts', None)
+                if row['ig_media_id'] not in superseded and row['date'] > latest.get(row['ig_media_id'], {'date': ''})['date']:
+                    latest[row['ig_media_id']] = row
+            latest_ids = {row['id'] for row in latest.values()}
+            return [row for row in rows if row['id'] not in latest_ids]
+        except Exception as e:
+            print(f"Error getting closed media stats: {e}")
+            return []
+    
+    async def delete_media_stats(self, ids: List[int], batch_size: int = 500) -> int:
+        """Delete daily_media_stats rows by id in bounded batches"""
+        deleted = 0
+        try:
+            for start in range(0, len(ids), batch_size):
+                result = await self._execute(self.client.table('daily_media_stats').delete().in_('id', ids[start:start + batch_size]))
+                deleted += len(result.data)
+            return deleted
+        except Exception as e:
+            print(f"Error deleting media stats: {e}")
+            return deleted
+    
+    async def ensure_media_stats_partitions(self, start: date, months: int) -> List[str]:
+        """Create missing monthly daily_media_stats partitions from the month of start (Postgres only)"""
+        try:
+            result = await self._execute(self.client.rpc('ensure_daily_media_stats_partitions', {
+                'p_from': start.isoformat(),
+                'p_months': months
+            }))
+            return [row['partition_name'] for row in result.data]
+        except Exception as e:
+            print(f"Error ensuring media stats partitions: {e}")
+            return []
+    
+    async def drop_empty_media_stats_partitions(self, before: date) -> List[Dict]:
+        """Detach and drop monthly partitions ending before the date once archiving/compaction emptied them (Postgres only)"""
+        try:
+            result = await self._execute(self.client.rpc('drop_empty_daily_media_stats_partitions', {'p_before': before.isoformat()}))
+            return result.data
+        except Exception as e:
+            print(f"Error dropping media stats partitions: {e}")
+            return []
+    
+    async def _get_media_stats_rollups(self, ig_user_id: Optional[str] = None, ig_media_id: Optional[str] = None, start_date=None, end_date=None) -> List[Dict]:
+        """Downsampled post stats as one-day runs on their observation date"""
+        query = self._media_stats_rollups_query(ig_user_id, ig_media_id, start_date, end_date)
+        return self._rollup_runs(await self._execute_all(query.order('date').order('id')))
+    
+    def _media_stats_rollups_query(self, ig_user_id: Optional[str] = None, ig_media_id: Optional[str] = None, start_date=None, end_date=None):
+        """Query for the downsampled post stats of an account or post within the range"""
+        columns = 'id, date, ig_media_id, ' + ', '.join(MEDIA_ROLLUP_FIELDS)
+        query = self.client.table('media_stats_rollups').select(columns + (', media_posts!inner(ig_user_id)' if ig_user_id else ''))
+        if ig_user_id:
+            query = query.eq('media_posts.ig_user_id', ig_user_id)
+        if ig_media_id:
+            query = query.eq('ig_media_id', ig_media_id)
+        if start_date:
+            query = query.gte('date', start_date.isoformat())
+        if end_date:
+            query = query.lte('date', end_date.isoformat())
+        return query
+    
+    def _rollup_runs(self, rows: List[Dict]) -> List[Dict]:
+        """Rollup rows as one-day stats runs"""
+        for row in rows:
+            row.pop('media_posts', None)
+            row.pop('id')
+            row['last_seen_date'] = row['date']
+        return rows
+    
+    async def _delete_periods(self, table: str, id_groups: List[List[int]], batch_size: int) -> int:
+        """Delete rows by id in batches of whole groups, so a rolled-up period is never half deleted"""
+        deleted, batch = 0, []
+        for ids in id_groups:
+            if batch and len(batch) + len(ids) > batch_size:
+                deleted += len((await self._execute(self.client.table(table).delete().in_('id', batch))).data)
+                batch = []
+            batch += ids
+        if batch:
+            deleted += len((await self._execute(self.client.table(table).delete().in_('id', batch))).data)
+        return deleted
+    
+    async def _save_media_rollups(self, rows: List[Dict], granularity: str, batch_size: int) -> int:
+        """Upsert the latest observation per post and period, merged with the stored rollups of those periods"""
+        touched = {(rollup['ig_media_id'], rollup['period_start']) for rollup in media_rollups(rows, granularity)}
+        media_ids = sorted({ig_media_id for ig_media_id, _ in touched})
+        
+        existing = []
+        for start in range(0, len(media_ids), IN_FILTER_CHUNK_SIZE):
+            stored = await self._execute_all(
+                self.client.table('media_stats_rollups').select(MEDIA_ROLLUP_COLUMNS).eq('granularity', granularity).in_('ig_media_id', media_ids[start:start + IN_FILTER_CHUNK_SIZE]).order('id')
+            )
+            existing += [row for row in stored if (row['ig_media_id'], row['period_start']) in touched]
+        
+        rollups = media_rollups(existing + rows, granularity)
+        for start in range(0, len(rollups), batch_size):
+            await self._execute(self.client.table('media_stats_rollups').upsert(rollups[start:start + batch_size], on_conflict='ig_media_id,granularity,period_start'))
+        return len(rollups)
+    
+    async def compact_account_stats(self, ig_user_id: str, daily_before: date, weekly_before: date, batch_size: int = 500) -> Dict[str, int]:
+        """Downsample daily account stats before daily_before to weeks and weeks before weekly_before to months
+        
+        Periods are complete when compacted (cutoffs are period boundaries), so a re-run after an
+        interruption rewrites the same rollups from the rows that are still there.
+        """
+        result = {'rollups': 0, 'deleted': 0}
+        try:
+            daily_rows = await self._execute_all(
+                self.client.table('daily_account_stats').select('id, ' + ACCOUNT_STATS_COLUMNS).eq('ig_user_id', ig_user_id).lt('date', daily_before.isoformat()).order('date')
+            )
+            weeks = group_by_period(daily_rows, 'week', lambda row: row['date'])
+            if weeks:
+                rollups = [account_rollup(ig_user_id, start, 'week', rows) for start, rows in weeks.items()]
+                await self._execute(self.client.table('account_stats_rollups').upsert(rollups, on_conflict='ig_user_id,granularity,period_start'))
+                result['rollups'] += len(rollups)
+                result['deleted'] += await self._delete_periods('daily_account_stats', [[row['id'] for row in rows] for rows in weeks.values()], batch_size)
+            
+            weekly_rows = await self._execute_all(
+                self.client.table('account_stats_rollups').select(ACCOUNT_ROLLUP_COLUMNS).eq('ig_user_id', ig_user_id).eq('granularity', 'week')
+                .lt('period_start', weekly_before.isoformat()).order('period_start')
+            )
+            months = group_by_period(weekly_rows, 'month', lambda row: row['period_start'])
+            if months:
+                rollups = [account_rollup(ig_user_id, start, 'month', rows) for start, rows in months.items()]
+                await self._execute(self.client.table('account_stats_rollups').upsert(rollups, on_conflict='ig_user_id,granularity,period_start'))
+                result['rollups'] += len(rollups)
+                result['deleted'] += await self._delete_periods('account_stats_rollups', [[row['id'] for row in rows] for rows in months.values()], batch_size)
+            
+            return result
+        except Exception as e:
+            print(f"Error compacting account stats: {e}")
+            return result
+    
+    async def compact_media_stats(self, ig_user_id: str, daily_before: date, weekly_before: date, batch_size: int = 500) -> Dict[str, int]:
+        """Downsample closed post stats runs before daily_before to weeks and weeks before weekly_before to months
+        
+        The latest run of each post stays. Rollups keep the latest observation per period and are
+        merged with the existing ones, so re-runs are idempotent.
+        """
+        result = {'rollups': 0, 'deleted': 0}
+        try:
+            runs = await self.get_closed_media_stats(ig_user_id, daily_before)
+            if runs:
+                result['rollups'] += await self._save_media_rollups(runs, 'week', batch_size)
+                # All runs of a post are deleted together
+                by_post = {}
+                for run in runs:
+                    by_post.setdefault(run['ig_media_id'], []).append(run['id'])
+                result['deleted'] += await self._delete_periods('daily_media_stats', list(by_post.values()), batch_size)
+            
+            old_weeks = await self._execute_all(
+                self.client.table('media_stats_rollups').select(MEDIA_ROLLUP_COLUMNS + ', media_posts!inner(ig_user_id)')
+                .eq('media_posts.ig_user_id', ig_user_id).eq('granularity', 'week').lt('period_start', weekly_before.isoformat()).order('id')
+            )
+            if old_weeks:
+                result['rollups'] += await self._save_media_rollups(old_weeks, 'month', batch_size)
+                by_post = {}
+                for row in old_weeks:
+                    by_post.setdefault(row['ig_media_id'], []).append(row['id'])
+                result['deleted'] += await self._delete_periods('media_stats_rollups', list(by_post.values()), batch_size)
+            
+            return result
+        except Exception as e:
+            print(f"Error compacting media stats: {e}")
+            return result
+    
+    def _expand_stats_runs(self, rows: List[Dict], start_date=None, end_date=None) -> List[Dict]:
+        """Expand stats runs (date..last_seen_date) to one row per day within the optional range"""
+        expanded = []
+        for row in rows:
+            first = date.fromisoformat(row['date'])
+            last = date.fromisoformat(row.pop('last_seen_date', None) or row['date'])
+            if start_date:
+                first = max(first, start_date)
+            if end_date:
+                last = min(last, end_date)
+            for offset in range((last - first).days + 1):
+                expanded.append({**row, 'date': (first + timedelta(days=offset)).isoformat()})
+        return expanded
+    
     async def get_latest_media_stats(self, ig_media_ids: List[str]) -> Dict[str, Dict]:
         """Get latest stats for multiple media posts"""
         try:
             latest_stats = {}
             
             for ig_media_id in ig_media_ids:
-                result = self.client.table('daily_media_stats').select('*').eq('ig_media_id', ig_media_id).order('date', desc=True).limit(1).execute()
+                result = await self._execute(self.client.table('daily_media_stats').select(MEDIA_STATS_RUN_COLUMNS).eq('ig_media_id', ig_media_id).order('date', desc=True).limit(1))
                 
                 if result.data:
                     latest_stats[ig_media_id] = result.data[0]
@@ -276,7 +755,8 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
                         'reach': None,
                         'views': None,
                         'shares': None,
-                        'saved': None
+                        'saved': None,
+                        'engagement_rate': None
                     }
             
             return latest_stats
@@ -294,7 +774,7 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
                 ig_user_id = insights_data['ig_user_id']
                 
                 # Check if account stats already exist for today
-                existing = self.client.table('daily_account_stats').select('id').eq('ig_user_id', ig_user_id).eq('date', today).execute()
+                existing = await self._execute(self.client.table('daily_account_stats').select('id').eq('ig_user_id', ig_user_id).eq('date', today))
                 
                 # Prepare account stats record with default values for required fields
                 stats_record = {
@@ -307,149 +787,175 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
                     'website_clicks': insights_data.get('website_clicks')
                 }
                 
+                # Follower growth since the previous recorded day is maintained at write time
+                if insights_data.get('followers_count') is not None:
+                    stats_record['new_followers'] = await self._get_new_followers(ig_user_id, today, insights_data['followers_count'])
+                
                 if existing.data:
                     # Update existing account stats (only update provided fields)
                     update_data = {}
-                    if 'profile_views' in insights_data:
-                        update_data['profile_views'] = insights_data['profile_views']
-                    if 'website_clicks' in insights_data:
-                        update_data['website_clicks'] = insights_data['website_clicks']
+                    for field in ['profile_views', 'website_clicks']:
+                        if field in insights_data:
+                            update_data[field] = insights_data[field]
+                    # Counts are NOT NULL, so only collected values overwrite them
+                    for field in ['followers_count', 'follows_count', 'media_count']:
+                        if insights_data.get(field) is not None:
+                            update_data[field] = insights_data[field]
+                    if 'new_followers' in stats_record:
+                        update_data['new_followers'] = stats_record['new_followers']
                     
                     if update_data:  # Only update if there's data to update
-                        self.client.table('daily_account_stats').update(update_data).eq('ig_user_id', ig_user_id).eq('date', today).execute()
+                        await self._execute(self.client.table('daily_account_stats').update(update_data).eq('ig_user_id', ig_user_id).eq('date', today))
                 else:
                     # Insert new account stats
-                    self.client.table('daily_account_stats').insert(stats_record).execute()
+                    await self._execute(self.client.table('daily_account_stats').insert(stats_record))
                 
                 saved_count += 1
             
+            await self.bump_data_version({insights_data['ig_user_id'] for insights_data in account_insights})
             return saved_count
         except Exception as e:
             print(f"Error saving daily account insights: {e}")
             return 0
     
-    async def get_monthly_account_stats(self, ig_user_id: str, year: Optional[int] = None) -> List[Dict]:
-        """Get monthly aggregated account statistics"""
+    async def _get_new_followers(self, ig_user_id: str, before_date: str, followers_count: int) -> Optional[int]:
+        """Followers gained since the latest recorded day before the given date
+        
+        None when there is no earlier day or its count is unknown: baseline rows stored 0 as a placeholder,
+        which would otherwise report the whole follower count as one day's growth.
+        """
+        result = await self._execute(
+            self.client.table('daily_account_stats').select('followers_count')
+            .eq('ig_user_id', ig_user_id).lt('date', before_date).order('date', desc=True).limit(1)
+        )
+        if not result.data or not result.data[0]['followers_count']:
+            return None
+        return followers_count - result.data[0]['followers_count']
+    
+    async def get_unsupported_metrics(self) -> List[Dict]:
+        """Get unexpired unsupported metric entries (negative cache)"""
         try:
-            # Use Supabase table query with date operations
-            query = self.client.table('daily_account_stats').select('*').eq('ig_user_id', ig_user_id)
-            
-            if year:
-                start_date = f"{year}-01-01"
-                end_date = f"{year}-12-31"
-                query = query.gte('date', start_date).lte('date', end_date)
-            
-            result = query.execute()
-            
-            # Group by month manually
-            monthly_data = {}
-            for row in result.data:
-                date_str = row['date']
-                month = date_str[:7]  # "2023-04"
-                
-                if month not in monthly_data:
-                    monthly_data[month] = {
-                        'month': month,
-                        'followers_count': 0,
-                        'profile_views': 0,
-                        'website_clicks': 0,
-                        '_count': 0
-                    }
-                
-                monthly_data[month]['followers_count'] += row.get('followers_count', 0)
-                monthly_data[month]['profile_views'] += row.get('profile_views', 0)
-                monthly_data[month]['website_clicks'] += row.get('website_clicks', 0)
-                monthly_data[month]['_count'] += 1
-            
-            # Calculate averages for followers_count
-            result_data = []
-            for month_data in sorted(monthly_data.values(), key=lambda x: x['month']):
-                if month_data['_count'] > 0:
-                    month_data['followers_count'] = month_data['followers_count'] // month_data['_count']
-                del month_data['_count']
-                result_data.append(month_data)
-            
-            return result_data
-            
+            return await self._execute_all(
+                self.client.table('unsupported_media_metrics').select('media_type, product_type, metric, ig_user_id, expires_at').gt('expires_at', datetime.now().isoformat())
+                .order('expires_at').order('media_type').order('product_type').order('metric').order('ig_user_id')
+            )
         except Exception as e:
-            print(f"Error getting monthly account stats: {e}")
+            print(f"Error getting unsupported metrics: {e}")
             return []
     
-    async def get_monthly_media_aggregation(self, ig_user_id: str, year: Optional[int] = None) -> List[Dict]:
-        """Get monthly aggregated media statistics"""
+    async def save_unsupported_metrics(self, entries: List[Dict]) -> int:
+        """Save unsupported metric entries (UPSERT, extends expiry of existing entries)"""
         try:
-            # Get media posts first
-            posts_query = self.client.table('media_posts').select('*').eq('ig_user_id', ig_user_id)
-            
-            if year:
-                start_date = f"{year}-01-01T00:00:00Z"
-                end_date = f"{year}-12-31T23:59:59Z"
-                posts_query = posts_query.gte('timestamp', start_date).lte('timestamp', end_date)
-            
-            posts_result = posts_query.execute()
-            
-            # Get all media stats
-            stats_result = self.client.table('daily_media_stats').select('*').execute()
-            
-            # Create lookup for stats
-            stats_lookup = {}
-            for stat in stats_result.data:
-                media_id = stat['ig_media_id']
-                if media_id not in stats_lookup:
-                    stats_lookup[media_id] = stat
-                # Use latest stats if multiple entries
-                elif stat['date'] > stats_lookup[media_id]['date']:
-                    stats_lookup[media_id] = stat
-            
-            # Group by month
-            monthly_data = {}
-            for post in posts_result.data:
-                timestamp = post['timestamp']
-                month = timestamp[:7]  # "2023-04"
-                
-                if month not in monthly_data:
-                    monthly_data[month] = {
-                        'month': month,
-                        'media_count': 0,
-                        'total_likes': 0,
-                        'total_comments': 0,
-                        'total_shares': 0,
-                        'total_saved': 0
-                    }
-                
-                monthly_data[month]['media_count'] += 1
-                
-                # Add stats if available
-                media_id = post['ig_media_id']
-                if media_id in stats_lookup:
-                    stats = stats_lookup[media_id]
-                    monthly_data[month]['total_likes'] += stats.get('like_count', 0)
-                    monthly_data[month]['total_comments'] += stats.get('comments_count', 0)
-                    monthly_data[month]['total_shares'] += stats.get('shares', 0)
-                    monthly_data[month]['total_saved'] += stats.get('saved', 0)
-            
-            return sorted(monthly_data.values(), key=lambda x: x['month'])
-            
+            if not entries:
+                return 0
+            await self._execute(self.client.table('unsupported_media_metrics').upsert(entries, on_conflict='media_type,product_type,metric,ig_user_id'))
+            return len(entries)
         except Exception as e:
-            print(f"Error getting monthly media aggregation: {e}")
-            return []
+            print(f"Error saving unsupported metrics: {e}")
+            return 0
     
-    async def get_total_posts_count(self, ig_user_id: str, year: Optional[int] = None) -> int:
-        """Get total posts count for the account"""
+    async def get_data_version(self, ig_user_id: str, refresh: bool = False) -> Optional[str]:
+        """Get per-account data version used to key cached responses (None if unavailable)
+        
+        refresh re-reads the version from the database instead of the recently known one.
+        """
+        version = None if refresh else response_cache.get_known_version(ig_user_id)
+        if version is not None:
+            return version
         try:
-            query = self.client.table('media_posts').select('ig_media_id', count='exact').eq('ig_user_id', ig_user_id)
-            
-            if year:
-                start_date = f"{year}-01-01T00:00:00Z"
-                end_date = f"{year}-12-31T23:59:59Z"
-                query = query.gte('timestamp', start_date).lte('timestamp', end_date)
-            
-            result = query.execute()
-            return result.count if result.count else 0
-            
+            result = await self._execute(self.client.table('account_data_versions').select('version').eq('ig_user_id', ig_user_id))
+            version = str(result.data[0]['version']) if result.data else '0'
+            response_cache.set_version(ig_user_id, version)
+            return version
         except Exception as e:
-            print(f"Error getting total posts count: {e}")
-            return 0
+            print(f"Error getting data version: {e}")
+            return None
+    
+    async def bump_data_version(self, ig_user_ids) -> bool:
+        """Mark account data as changed so cached responses are no longer served
+        
+        The upsert is retried; if it still fails the error is raised so the save reports failure
+        (the unchanged version would otherwise keep answering 304 with the old data).
+        """
+        ig_user_ids = [ig_user_id for ig_user_id in ig_user_ids if ig_user_id]
+        if not ig_user_ids:
+            return False
+        for attempt in range(1, DATA_VERSION_BUMP_ATTEMPTS + 1):
+            try:
+                version = time.time_ns()
+                updated_at = datetime.now().isoformat()
+                await self._execute(self.client.table('account_data_versions').upsert([
+                    {'ig_user_id': ig_user_id, 'version': version, 'updated_at': updated_at}
+                    for ig_user_id in ig_user_ids
+                ], on_conflict='ig_user_id'))
+                for ig_user_id in ig_user_ids:
+                    response_cache.set_version(ig_user_id, str(version))
+                return True
+            except Exception as e:
+                # Local entries must not outlive the write even if the version row failed
+                for ig_user_id in ig_user_ids:
+                    response_cache.invalidate(ig_user_id)
+                if attempt == DATA_VERSION_BUMP_ATTEMPTS:
+                    raise
+                print(f"Error bumping data version (attempt {attempt}/{DATA_VERSION_BUMP_ATTEMPTS}): {e}")
+                await asyncio.sleep(DATA_VERSION_BUMP_RETRY_SECONDS * attempt)
+    
+    async def _get_media_owners(self, media_stats: List[Dict]) -> set:
+        """Resolve ig_user_id for media stats records (looked up from media_posts when not given)"""
+        owners = {stats_data['ig_user_id'] for stats_data in media_stats if stats_data.get('ig_user_id')}
+        unresolved = [stats_data['ig_media_id'] for stats_data in media_stats if not stats_data.get('ig_user_id')]
+        for start in range(0, len(unresolved), IN_FILTER_CHUNK_SIZE):
+            result = await self._execute(self.client.table('media_posts').select('ig_user_id').in_('ig_media_id', unresolved[start:start + IN_FILTER_CHUNK_SIZE]))
+            owners.update(row['ig_user_id'] for row in result.data)
+        return owners
+    
+    async def get_account_stats_series(self, ig_user_id: str, start_date: date, end_date: date, interval: str = 'day') -> List[Dict]:
+        """Get account stats per day/week/month, zero-filled by the database for periods without data
+        
+        Read errors propagate to the caller, so an empty series is never cached in place of a failed one.
+        """
+        return await self._execute_all(self.client.rpc('account_stats_series', {
+            'p_ig_user_id': ig_user_id,
+            'p_start_date': start_date.isoformat(),
+            'p_end_date': end_date.isoformat(),
+            'p_interval': interval
+        }))
+    
+    async def get_media_stats_series(self, ig_user_id: str, start_date: date, end_date: date, interval: str = 'day') -> List[Dict]:
+        """Get posts per day/week/month of publication with their latest stats, zero-filled by the database (raises on read errors)"""
+        return await self._execute_all(self.client.rpc('media_stats_series', {
+            'p_ig_user_id': ig_user_id,
+            'p_start_date': start_date.isoformat(),
+            'p_end_date': end_date.isoformat(),
+            'p_interval': interval
+        }))
+    
+    async def get_monthly_account_stats(self, ig_user_id: str, year: Optional[int] = None) -> List[Dict]:
+        """Get monthly aggregated account statistics for every month of the year"""
+        year = year or datetime.now().year
+        series = await self.get_account_stats_series(ig_user_id, date(year, 1, 1), date(year, 12, 31), 'month')
+        return [{'month': row['period'][:7], **self._without_period(row)} for row in series]
+    
+    async def get_monthly_media_aggregation(self, ig_user_id: str, year: Optional[int] = None) -> List[Dict]:
+        """Get monthly aggregated media statistics for every month of the year"""
+        year = year or datetime.now().year
+        series = await self.get_media_stats_series(ig_user_id, date(year, 1, 1), date(year, 12, 31), 'month')
+        return [
+            {'month': row['period'][:7], 'media_count': row['posts_count'], **self._without_period(row)}
+            for row in series
+        ]
+    
+    async def get_total_posts_count(self, ig_user_id: str, year: Optional[int] = None) -> int:
+        """Get total posts count for the account (raises on read errors)"""
+        query = self.client.table('media_posts').select('ig_media_id', count='exact').eq('ig_user_id', ig_user_id)
+        
+        if year:
+            start_date = f"{year}-01-01T00:00:00Z"
+            end_date = f"{year}-12-31T23:59:59Z"
+            query = query.gte('timestamp', start_date).lte('timestamp', end_date)
+        
+        result = await self._execute(query)
+        return result.count if result.count else 0
     
     async def get_latest_account_insights(self, ig_user_ids: List[str]) -> Dict[str, Dict]:
         """Get latest account insights for multiple accounts"""
@@ -457,7 +963,7 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
             latest_insights = {}
             
             for ig_user_id in ig_user_ids:
-                result = self.client.table('daily_account_stats').select('*').eq('ig_user_id', ig_user_id).order('date', desc=True).limit(1).execute()
+                result = await self._execute(self.client.table('daily_account_stats').select(ACCOUNT_STATS_COLUMNS).eq('ig_user_id', ig_user_id).order('date', desc=True).limit(1))
                 
                 if result.data:
                     latest_insights[ig_user_id] = result.data[0]
@@ -468,7 +974,8 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
                         'website_clicks': None,
                         'followers_count': None,
                         'follows_count': None,
-                        'media_count': None
+                        'media_count': None,
+                        'new_followers': None
                     }
             
             return latest_insights
@@ -476,138 +983,47 @@ class InstagramAccountRepository(BaseRepository[InstagramAccount]):
             print(f"Error getting latest account insights: {e}")
             return {}
     
-    async def get_daily_account_stats(self, ig_user_id: str, year: int, month: int) -> List[Dict]:
-        """Get daily account statistics for a specific month"""
+    async def get_recent_account_stats(self, ig_user_ids: List[str], start_date: datetime) -> Dict[str, List[Dict]]:
+        """Get daily account stats since start_date for multiple accounts, grouped by account and sorted by date"""
         try:
-            from calendar import monthrange
-            
-            # Calculate date range for the month
-            start_date = f"{year}-{month:02d}-01"
-            days_in_month = monthrange(year, month)[1]
-            end_date = f"{year}-{month:02d}-{days_in_month:02d}"
-            
-            # Get daily account stats for the month
-            query = self.client.table('daily_account_stats').select('*')
-            query = query.eq('ig_user_id', ig_user_id)
-            query = query.gte('date', start_date).lte('date', end_date)
-            result = query.order('date').execute()
+            query = self.client.table('daily_account_stats').select(ACCOUNT_STATS_COLUMNS)
+            query = query.in_('ig_user_id', ig_user_ids).gte('date', start_date.date().isoformat()).order('date').order('ig_user_id').order('id')
             
-            # Fill missing days with zero data
-            return self._fill_missing_account_days(result.data, year, month)
+            stats_by_account = {ig_user_id: [] for ig_user_id in ig_user_ids}
+            for row in await self._execute_all(query):
+                stats_by_account[row['ig_user_id']].append(row)
             
+            return stats_by_account
         except Exception as e:
-            print(f"Error getting daily account stats: {e}")
-            return []
+            print(f"Error getting recent account stats: {e}")
+            return {}
+    
+    async def get_daily_account_stats(self, ig_user_id: str, year: int, month: int) -> List[Dict]:
+        """Get daily account statistics for every day of a month"""
+        start_date, end_date = self._month_range(year, month)
+        series = await self.get_account_stats_series(ig_user_id, start_date, end_date)
+        return [{'date': row['period'], **self._without_period(row)} for row in series]
     
     async def get_daily_media_stats_aggregation(self, ig_user_id: str, year: int, month: int) -> List[Dict]:
-        """Get daily media statistics aggregation for a specific month"""
-        try:
-            from calendar import monthrange
-            
-            # Calculate date range for the month
-            start_date = f"{year}-{month:02d}-01T00:00:00Z"
-            days_in_month = monthrange(year, month)[1]
-            end_date = f"{year}-{month:02d}-{days_in_month:02d}T23:59:59Z"
-            
-            # Get media posts for the month
-            posts_query = self.client.table('media_posts').select('*').eq('ig_user_id', ig_user_id)
-            posts_query = posts_query.gte('timestamp', start_date).lte('timestamp', end_date)
-            posts_result = posts_query.execute()
-            
-            # Get all media stats
-            stats_result = self.client.table('daily_media_stats').select('*').execute()
-            
-            # Create lookup for stats
-            stats_lookup = {}
-            for stat in stats_result.data:
-                media_id = stat['ig_media_id']
-                if media_id not in stats_lookup:
-                    stats_lookup[media_id] = stat
-                elif stat['date'] > stats_lookup[media_id]['date']:
-                    stats_lookup[media_id] = stat
-            
-            # Group posts by day and calculate daily totals
-            daily_data = {}
-            for post in posts_result.data:
-                timestamp = post['timestamp']
-                date = timestamp[:10]  # "2025-03-01"
-                
-                if date not in daily_data:
-                    daily_data[date] = {
-                        'date': date,
-                        'posts_count': 0,
-                        'reach': 0
-                    }
-                
-                daily_data[date]['posts_count'] += 1
-                
-                # Add stats if available
-                media_id = post['ig_media_id']
-                if media_id in stats_lookup:
-                    stats = stats_lookup[media_id]
-                    daily_data[date]['reach'] += stats.get('reach', 0)
-            
-            # Fill missing days and sort
-            return self._fill_missing_media_days(list(daily_data.values()), year, month)
-            
-        except Exception as e:
-            print(f"Error getting daily media stats aggregation: {e}")
-            return []
+        """Get daily media statistics aggregation for every day of a month"""
+        start_date, end_date = self._month_range(year, month)
+        series = await self.get_media_stats_series(ig_user_id, start_date, end_date)
+        return [
+            {'date': row['period'], 'posts_count': row['posts_count'], 'reach': row['total_reach']}
+            for row in series
+        ]
     
-    def _fill_missing_account_days(self, data: List[Dict], year: int, month: int) -> List[Dict]:
-        """Fill missing days with zero data for account stats"""
-        from calendar import monthrange
-        
-        days_in_month = monthrange(year, month)[1]
-        filled_data = []
-        
-        # Create lookup for existing data
-        data_lookup = {d['date']: d for d in data}
-        
-        for day in range(1, days_in_month + 1):
-            date_str = f"{year}-{month:02d}-{day:02d}"
-            
-            if date_str in data_lookup:
-                # Use existing data
-                filled_data.append(data_lookup[date_str])
-            else:
-                # Zero-fill missing data
-                filled_data.append({
-                    'date': date_str,
-                    'posts_count': 0,
-                    'new_followers': 0,
-                    'reach': 0,
-                    'profile_views': 0,
-                    'website_clicks': 0
-                })
-        
-        return filled_data
+    def _month_range(self, year: int, month: int) -> tuple:
+        """First and last day of a month"""
+        return date(year, month, 1), date(year, month, monthrange(year, month)[1])
     
-    def _fill_missing_media_days(self, data: List[Dict], year: int, month: int) -> List[Dict]:
-        """Fill missing days with zero data for media stats"""
-        from calendar import monthrange
-        
-        days_in_month = monthrange(year, month)[1]
-        filled_data = []
-        
-        # Create lookup for existing data
-        data_lookup = {d['date']: d for d in data}
-        
-        for day in range(1, days_in_month + 1):
-            date_str = f"{year}-{month:02d}-{day:02d}"
-            
-            if date_str in data_lookup:
-                # Use existing data
-                filled_data.append(data_lookup[date_str])
-            else:
-                # Zero-fill missing data
-                filled_data.append({
-                    'date': date_str,
-                    'posts_count': 0,
-                    'reach': 0
-                })
-        
-        return filled_data
+    def _month_start(self, day) -> str:
+        """First day of the day's month (lower bound on date that prunes earlier stats partitions)"""
+        return date(day.year, day.month, 1).isoformat()
+    
+    def _without_period(self, row: Dict) -> Dict:
+        """Series row without its period column"""
+        return {key: value for key, value in row.items() if key != 'period'}
 
 # Repository instance
 instagram_repository = InstagramAccountRepository()
\ No newline at end of file
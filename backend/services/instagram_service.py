@@ -1,4 +1,9 @@
-from typing import Dict, Any, List
+import asyncio
+from datetime import date
+from typing import Dict, Any, List, Optional
+from core.config import settings
+from core.metric_cache import unsupported_metric_cache
+from core.refresh_policy import plan_refresh
 from models.instagram import TokenRefreshResponse
 from repositories.instagram_repository import InstagramAccountRepository
 from external.instagram_client import InstagramAPIClient
@@ -79,14 +84,17 @@ class InstagramService:
             errors=[str(error) for error in all_errors]
         )
     
-    async def collect_media_posts(self, ig_user_id: str, access_token: str, limit: int = 25) -> Dict[str, Any]:
-        """Collect media posts from Instagram API and save to database"""
+    async def collect_media_posts(self, ig_user_id: str, access_token: str, limit: int = 25, with_insights: bool = False) -> Dict[str, Any]:
+        """Collect media posts from Instagram API and save to database (with_insights: include insights_data per post)"""
         try:
             print(f"🚀 Media Posts Collection開始: {ig_user_id}")
             
-            # Get media posts from Instagram API
+            # Get media posts from Instagram API (blocking HTTP runs in a worker thread)
             client = InstagramAPIClient()
-            api_result = client.get_user_media(ig_user_id, access_token, limit)
+            if with_insights:
+                api_result = await asyncio.to_thread(client.get_user_media_with_insights, ig_user_id, access_token, limit)
+            else:
+                api_result = await asyncio.to_thread(client.get_user_media, ig_user_id, access_token, limit)
             
             if not api_result.get("success", True) or "data" not in api_result:
                 return {
@@ -126,14 +134,24 @@ class InstagramService:
                 "collected_posts": 0
             }
     
-    async def collect_media_insights(self, ig_media_id: str, media_type: str, access_token: str, like_count: int = 0, comments_count: int = 0) -> Dict[str, Any]:
-        """Collect media insights from Instagram API and save to database"""
+    async def collect_media_insights(self, ig_media_id: str, media_type: str, access_token: str, like_count: int = 0, comments_count: int = 0, ig_user_id: str = None, insights_data: Optional[Dict] = None, product_type: Optional[str] = None) -> Dict[str, Any]:
+        """Collect media insights from Instagram API and save to database (insights_data: already fetched insights)"""
         try:
             print(f"🚀 Media Insights Collection開始: {ig_media_id[:15]}...")
             
-            # Get insights from Instagram API
-            client = InstagramAPIClient()
-            api_result = client.get_media_insights_with_type(ig_media_id, media_type, access_token)
+            if insights_data is not None:
+                # Insights fetched together with the media list
+                successful_metrics = sum(1 for result in insights_data.values() if result.get("success"))
+                api_result = {
+                    "success": successful_metrics > 0,
+                    "data": insights_data,
+                    "total_metrics": len(insights_data),
+                    "successful_metrics": successful_metrics
+                }
+            else:
+                # Get insights from Instagram API
+                client = InstagramAPIClient()
+                api_result = await asyncio.to_thread(client.get_media_insights_with_type, ig_media_id, media_type, access_token, product_type, ig_user_id)
             
             if not api_result.get("success"):
                 return {
@@ -150,6 +168,8 @@ class InstagramService:
                 'like_count': like_count,
                 'comments_count': comments_count
             }
+            if ig_user_id:
+                stats_data['ig_user_id'] = ig_user_id
             
             # Add insights metrics
             for metric, result in insights_data.items():
@@ -187,13 +207,36 @@ class InstagramService:
                 "collected_metrics": 0
             }
     
-    async def collect_all_media_insights(self, ig_user_id: str, access_token: str, limit: int = 25) -> Dict[str, Any]:
-        """Collect insights for all media posts of an account"""
+    async def collect_all_media_insights(self, ig_user_id: str, access_token: str, limit: int = 25, full_refresh: bool = False, fetch_mode: Optional[str] = None) -> Dict[str, Any]:
+        """Collect insights for media posts of an account that are due for refresh (all posts with full_refresh)
+        
+        fetch_mode (default settings.MEDIA_INSIGHTS_FETCH_MODE) applies to the newest limit posts of the listing:
+        - "nested": insights come with the media list; only those of posts due for refresh are saved
+        - "per_metric": insights are requested per post and metric for posts due for refresh
+        Older known posts outside the listing that are due are fetched with multi-id lookups.
+        """
         try:
             print(f"🚀 All Media Insights Collection開始: {ig_user_id}")
+            fetch_mode = fetch_mode or settings.MEDIA_INSIGHTS_FETCH_MODE
+            
+            # Metrics known to be unsupported are skipped by the API client
+            if self.repository:
+                unsupported_metric_cache.load(await self.repository.get_unsupported_metrics())
+            else:
+                # Fallback to direct repository access
+                from repositories.instagram_repository import instagram_repository
+                unsupported_metric_cache.load(await instagram_repository.get_unsupported_metrics())
             
             # Get media posts first
-            media_result = await self.collect_media_posts(ig_user_id, access_token, limit)
+            media_result = {}
+            if fetch_mode == 'nested':
+                media_result = await self.collect_media_posts(ig_user_id, access_token, limit, with_insights=True)
+                if not media_result.get("success"):
+                    # Fallback: the media list request failed (rejected expansions are retried without them by the client)
+                    print(f"   ⚠️ insights展開取得に失敗したため投稿毎の取得に切り替え: {media_result.get('error', 'Unknown error')}")
+                    fetch_mode = 'per_metric'
+            if fetch_mode != 'nested':
+                media_result = await self.collect_media_posts(ig_user_id, access_token, limit)
             
             if not media_result.get("success"):
                 return {
@@ -204,9 +247,27 @@ class InstagramService:
             
             media_list = media_result.get("data", [])
             
+            # Refresh state per post (latest recorded stats and reach growth)
+            trajectories = {}
+            if not full_refresh:
+                try:
+                    if self.repository:
+                        trajectory_rows = await self.repository.get_media_trajectories(ig_user_id)
+                    else:
+                        # Fallback to direct repository access
+                        from repositories.instagram_repository import instagram_repository
+                        trajectory_rows = await instagram_repository.get_media_trajectories(ig_user_id)
+                    trajectories = {row['ig_media_id']: row for row in trajectory_rows}
+                except Exception as e:
+                    # Without refresh state every post is refreshed
+                    print(f"   ⚠️ 更新状態の取得に失敗したため全投稿を更新: {e}")
+            
             # Collect insights for each media
             insights_results = []
             successful_media = 0
+            skipped_media = 0
+            refresh_reasons = {}
+            today = date.today()
             
             for media in media_list:
                 media_id = media.get("id")
@@ -214,8 +275,21 @@ class InstagramService:
                 like_count = media.get("like_count", 0)
                 comments_count = media.get("comments_count", 0)
                 
+                # Skip posts whose insights are not due today (age / velocity based policy, listed insights included)
+                if full_refresh:
+                    refresh, reason = True, 'full_refresh'
+                else:
+                    published_date = date.fromisoformat(media.get("timestamp", today.isoformat())[:10])
+                    refresh, reason = plan_refresh(published_date, trajectories.get(media_id), today)
+                refresh_reasons[reason] = refresh_reasons.get(reason, 0) + 1
+                if not refresh:
+                    skipped_media += 1
+                    continue
+                
                 insights_result = await self.collect_media_insights(
-                    media_id, media_type, access_token, like_count, comments_count
+                    media_id, media_type, access_token, like_count, comments_count, ig_user_id,
+                    insights_data=media.get("insights_data"),
+                    product_type=media.get("media_product_type")
                 )
                 
                 if insights_result.get("success"):
@@ -227,12 +301,74 @@ class InstagramService:
                     "result": insights_result
                 })
             
-            print(f"✅ All Media Insights Collection完了: {successful_media}/{len(media_list)} メディア成功")
+            processed_media = len(media_list) - skipped_media
+            
+            # Known posts outside the listing (weekly / monthly tiers) with the same policy
+            listed_ids = {media.get("id") for media in media_list}
+            if self.repository:
+                known_posts = await self.repository.get_known_media_posts(ig_user_id)
+            else:
+                # Fallback to direct repository access
+                from repositories.instagram_repository import instagram_repository
+                known_posts = await instagram_repository.get_known_media_posts(ig_user_id)
+            
+            due_posts = []
+            for post in known_posts:
+                if post['ig_media_id'] in listed_ids:
+                    continue
+                if full_refresh:
+                    refresh, reason = True, 'full_refresh'
+                else:
+                    refresh, reason = plan_refresh(date.fromisoformat(post['timestamp'][:10]), trajectories.get(post['ig_media_id']), today)
+                refresh_reasons[reason] = refresh_reasons.get(reason, 0) + 1
+                if refresh:
+                    due_posts.append({'id': post['ig_media_id'], 'media_type': post['media_type']})
+                else:
+                    skipped_media += 1
+            
+            if due_posts:
+                client = InstagramAPIClient()
+                known_result = await asyncio.to_thread(client.get_known_media_insights, due_posts, access_token, ig_user_id)
+                for media in known_result.get("data", []):
+                    insights_result = await self.collect_media_insights(
+                        media['id'], media['media_type'], access_token, media['like_count'], media['comments_count'], ig_user_id,
+                        insights_data=media['insights_data']
+                    )
+                    if insights_result.get("success"):
+                        successful_media += 1
+                    insights_results.append({
+                        "media_id": media['id'],
+                        "media_type": media['media_type'],
+                        "result": insights_result
+                    })
+                if known_result.get("errors"):
+                    print(f"   ⚠️ 一覧外の投稿のインサイト取得失敗: {sum(len(error['ig_media_ids']) for error in known_result['errors'])}件")
+            
+            processed_media += len(due_posts)
+            print(f"✅ All Media Insights Collection完了: {successful_media}/{processed_media} メディア成功, {skipped_media}件スキップ (更新不要)")
+            
+            # Counts of skipped and older known posts (no insight calls)
+            refreshed_ids = {result["media_id"] for result in insights_results}
+            counts_result = await self.refresh_media_counts(ig_user_id, access_token, media_list, refreshed_ids)
+            
+            # Persist newly found unsupported metrics
+            unsupported_entries = unsupported_metric_cache.pop_new_entries()
+            if unsupported_entries:
+                if self.repository:
+                    await self.repository.save_unsupported_metrics(unsupported_entries)
+                else:
+                    # Fallback to direct repository access
+                    from repositories.instagram_repository import instagram_repository
+                    await instagram_repository.save_unsupported_metrics(unsupported_entries)
             
             return {
                 "success": True,
-                "processed_media": len(media_list),
+                "processed_media": processed_media,
                 "successful_media": successful_media,
+                "skipped_media": skipped_media,
+                "counts_refreshed": counts_result.get("refreshed_media", 0),
+                "fetch_mode": fetch_mode,
+                "refresh_reasons": refresh_reasons,
                 "insights_results": insights_results
             }
             
@@ -244,6 +380,77 @@ class InstagramService:
                 "processed_media": 0
             }
     
+    async def refresh_media_counts(self, ig_user_id: str, access_token: str, media_list: List[Dict] = None, refreshed_ids: set = None) -> Dict[str, Any]:
+        """Refresh like/comment counts of known posts without fetching insights
+        
+        Posts in media_list (already returned by the media listing) reuse the listed counts;
+        other known posts are looked up with multi-id requests. Posts in refreshed_ids are left out.
+        """
+        try:
+            media_list = media_list or []
+            refreshed_ids = refreshed_ids or set()
+            
+            stats_list = [
+                {
+                    'ig_media_id': media['id'],
+                    'ig_user_id': ig_user_id,
+                    'like_count': media.get('like_count', 0),
+                    'comments_count': media.get('comments_count', 0)
+                }
+                for media in media_list if media.get('id') not in refreshed_ids
+            ]
+            
+            if self.repository:
+                known_ids = await self.repository.get_media_post_ids(ig_user_id)
+            else:
+                # Fallback to direct repository access
+                from repositories.instagram_repository import instagram_repository
+                known_ids = await instagram_repository.get_media_post_ids(ig_user_id)
+            
+            listed_ids = {media.get('id') for media in media_list} | refreshed_ids
+            lookup_ids = [ig_media_id for ig_media_id in known_ids if ig_media_id not in listed_ids]
+            
+            listed_count = len(stats_list)
+            lookup_errors = []
+            if lookup_ids:
+                client = InstagramAPIClient()
+                counts_result = await asyncio.to_thread(client.get_media_counts, lookup_ids, access_token)
+                lookup_errors = counts_result.get("errors", [])
+                for ig_media_id, counts in counts_result.get("data", {}).items():
+                    stats_list.append({
+                        'ig_media_id': ig_media_id,
+                        'ig_user_id': ig_user_id,
+                        'like_count': counts.get('like_count', 0),
+                        'comments_count': counts.get('comments_count', 0)
+                    })
+            
+            if not stats_list:
+                return {"success": True, "refreshed_media": 0, "lookup_errors": lookup_errors}
+            
+            # Insight values are kept from the latest stats row
+            if self.repository:
+                saved_count = await self.repository.save_daily_media_stats(stats_list)
+            else:
+                # Fallback to direct repository access
+                from repositories.instagram_repository import instagram_repository
+                saved_count = await instagram_repository.save_daily_media_stats(stats_list)
+            
+            print(f"✅ Media Counts Refresh完了: {saved_count}件保存 (一覧 {listed_count}件, 一括取得 {len(stats_list) - listed_count}/{len(lookup_ids)}件)")
+            
+            return {
+                "success": not lookup_errors,
+                "refreshed_media": saved_count,
+                "lookup_errors": lookup_errors
+            }
+        
+        except Exception as e:
+            self._log_service_error("refresh_media_counts", e, {"ig_user_id": ig_user_id})
+            return {
+                "success": False,
+                "error": str(e),
+                "refreshed_media": 0
+            }
+    
     async def collect_account_insights(self, ig_user_id: str, access_token: str) -> Dict[str, Any]:
         """Collect account insights from Instagram API and save to database"""
         try:
@@ -251,7 +458,7 @@ class InstagramService:
             
             # Get account insights from Instagram API
             client = InstagramAPIClient()
-            api_result = client.get_account_insights(ig_user_id, access_token)
+            api_result = await asyncio.to_thread(client.get_account_insights, ig_user_id, access_token)
             
             if not api_result.get("success"):
                 return {
@@ -274,6 +481,12 @@ class InstagramService:
                 else:
                     account_data[metric] = None
             
+            # Add current counts (followers_count drives daily follower growth)
+            account_info = await asyncio.to_thread(client.get_instagram_account_info, ig_user_id, access_token)
+            for field in ['followers_count', 'follows_count', 'media_count']:
+                if account_info.get(field) is not None:
+                    account_data[field] = account_info[field]
+            
             # Save to database
             if self.repository:
                 saved_count = await self.repository.save_daily_account_insights([account_data])
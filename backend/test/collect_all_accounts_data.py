@@ -23,7 +23,7 @@ async def collect_all_accounts_data():
     
     # Get all accounts
     try:
-        accounts = await instagram_repository.get_all()
+        accounts = await instagram_repository.get_all(with_token=True)
         if not accounts:
             print("❌ アカウントが見つかりません")
             return False
@@ -26,7 +26,7 @@ async def debug_insights_api():
     
     # Get test account (use 有限会社カネタケ - known to work in verification)
     try:
-        accounts = await instagram_repository.get_all()
+        accounts = await instagram_repository.get_all(with_token=True)
         kanetake_account = None
         
         for account in accounts:
@@ -26,7 +26,7 @@ async def test_b0203_implementation():
     # Get test data from Supabase
     print("🔍 Supabaseからテストアカウントを取得中...")
     try:
-        accounts = await instagram_repository.get_all()
+        accounts = await instagram_repository.get_all(with_token=True)
         if not accounts:
             print("❌ Supabaseにアカウントデータが見つかりません")
             print("   🔧 先にセットアップページでアカウントを登録してください")
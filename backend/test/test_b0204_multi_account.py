@@ -25,7 +25,7 @@ async def test_b0204_multi_account():
     # Get all accounts from Supabase
     print("🔍 Supabaseから全アカウントを取得中...")
     try:
-        accounts = await instagram_repository.get_all()
+        accounts = await instagram_repository.get_all(with_token=True)
         if not accounts:
             print("❌ Supabaseにアカウントデータが見つかりません")
             return False
@@ -30,7 +30,7 @@ async def test_b0205_account_insights():
     try:
         # 1. Get all Instagram accounts from database
         print("📋 Step 1: Supabaseからアカウント一覧取得...")
-        accounts = await instagram_repository.get_all()
+        accounts = await instagram_repository.get_all(with_token=True)
         
         if not accounts:
             print("❌ エラー: Supabaseにアカウントが見つかりません")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the local database query builder
+
+ローカルバックエンド (LocalDatabase) が Supabase/PostgREST クライアントと同じ結果を返すことを確認する
+- フィルタ (eq/neq/gt/gte/lt/lte/in_)・並び順・limit/offset・件数 (count='exact')
+- 埋め込みリソース (一対多のリスト, !inner 結合と埋め込み側のフィルタ)
+- insert/upsert/update/delete の戻り値, JSON・TIMESTAMP 列の変換, 未知の列のエラー
+一時SQLiteファイルで実行するため Supabase は不要
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.exceptions import LocalQueryError
+from core.local_database import LocalDatabase
+from repositories.instagram_repository import InstagramAccountRepository
+
+ACCOUNT_IDS = ["test_local_a", "test_local_b"]
+
+def create_database() -> LocalDatabase:
+    """Local database with two accounts, two posts each and a stats row per post"""
+    client = LocalDatabase(os.path.join(tempfile.mkdtemp(), 'local_database.db'), 'sqlite')
+    for ig_user_id in ACCOUNT_IDS:
+        client.table('instagram_accounts').insert({
+            'name': ig_user_id, 'ig_user_id': ig_user_id, 'access_token': 'token', 'username': ig_user_id
+        }).execute()
+        for number in range(2):
+            ig_media_id = f"{ig_user_id}_media_{number}"
+            client.table('media_posts').insert({
+                'ig_media_id': ig_media_id, 'ig_user_id': ig_user_id, 'timestamp': f"2025-06-0{number + 1}T09:00:00Z",
+                'media_type': 'IMAGE', 'media_url': 'https://example.com/media.jpg', 'permalink': f"https://www.instagram.com/p/{ig_media_id}/"
+            }).execute()
+            client.table('daily_media_stats').insert({
+                'date': '2025-06-10', 'ig_media_id': ig_media_id, 'like_count': 10 * (number + 1), 'comments_count': number
+            }).execute()
+    return client
+
+def test_filters_order_and_paging():
+    """Filters, ordering, limit/offset and exact counts behave like PostgREST"""
+    print("🧪 Testing local query filters and paging")
+    
+    client = create_database()
+    
+    def media_ids(query) -> list:
+        return [row['ig_media_id'] for row in query.execute().data]
+    
+    assert media_ids(client.table('media_posts').select('ig_media_id').eq('ig_user_id', ACCOUNT_IDS[0]).order('ig_media_id')) == ['test_local_a_media_0', 'test_local_a_media_1']
+    assert media_ids(client.table('media_posts').select('ig_media_id').neq('ig_user_id', ACCOUNT_IDS[0]).order('ig_media_id', desc=True)) == ['test_local_b_media_1', 'test_local_b_media_0']
+    assert len(client.table('media_posts').select('ig_media_id').gte('timestamp', '2025-06-02T00:00:00').execute().data) == 2
+    assert len(client.table('daily_media_stats').select('id').gt('like_count', 10).lte('like_count', 20).execute().data) == 2
+    assert media_ids(client.table('media_posts').select('ig_media_id').in_('ig_media_id', ['test_local_a_media_1', 'unknown'])) == ['test_local_a_media_1']
+    # Empty in_() matches nothing (PostgREST sends in.())
+    assert client.table('media_posts').select('ig_media_id').in_('ig_media_id', []).execute().data == []
+    
+    counted = client.table('media_posts').select('ig_media_id', count='exact').lt('timestamp', '2025-06-02T00:00:00').limit(1).execute()
+    assert (len(counted.data), counted.count) == (1, 2)
+    
+    # _execute_all pages with offset/limit params like the PostgREST builder
+    repository = InstagramAccountRepository()
+    query = client.table('media_posts').select('ig_media_id').order('ig_media_id')
+    assert len(asyncio.run(repository._execute_all(query, page_size=3))) == 4
+    print("   ✅ Filters and paging match PostgREST")
+
+def test_embedded_resources():
+    """List embeds attach child rows; !inner embeds filter the parent rows"""
+    print("🧪 Testing local embedded resources")
+    
+    client = create_database()
+    posts = client.table('media_posts').select('ig_media_id, daily_media_stats(like_count)').eq('ig_user_id', ACCOUNT_IDS[0]).order('ig_media_id').execute().data
+    assert [post['daily_media_stats'] for post in posts] == [[{'like_count': 10}], [{'like_count': 20}]]
+    
+    stats = client.table('daily_media_stats').select('ig_media_id, media_posts!inner(ig_user_id)').eq('media_posts.ig_user_id', ACCOUNT_IDS[1]).order('ig_media_id').execute().data
+    assert stats == [
+        {'ig_media_id': 'test_local_b_media_0', 'media_posts': {'ig_user_id': ACCOUNT_IDS[1]}},
+        {'ig_media_id': 'test_local_b_media_1', 'media_posts': {'ig_user_id': ACCOUNT_IDS[1]}}
+    ]
+    print("   ✅ Embedded resources match PostgREST")
+
+def test_writes_and_conversions():
+    """Writes return the affected rows; JSON and TIMESTAMP values round-trip; unknown columns fail"""
+    print("🧪 Testing local writes and value conversion")
+    
+    client = create_database()
+    trajectory = {
+        'ig_media_id': 'test_local_a_media_0', 'ig_user_id': ACCOUNT_IDS[0], 'published_date': '2025-06-01',
+        'first_day': 9, 'reach_deltas': [100, 20], 'like_deltas': [10, 0], 'saved_deltas': [1, 1]
+    }
+    inserted = client.table('media_trajectories').upsert(trajectory, on_conflict='ig_media_id').execute().data
+    assert inserted[0]['reach_deltas'] == [100, 20]
+    updated = client.table('media_trajectories').upsert({**trajectory, 'reach_deltas': [100, 30]}, on_conflict='ig_media_id').execute().data
+    assert updated[0]['reach_deltas'] == [100, 30]
+    assert len(client.table('media_trajectories').select('ig_media_id').execute().data) == 1
+    
+    # Timestamps are stored without time zone, like a Postgres TIMESTAMP column
+    post = client.table('media_posts').select('timestamp').eq('ig_media_id', 'test_local_a_media_0').execute().data[0]
+    assert post['timestamp'] == '2025-06-01T09:00:00'
+    
+    changed = client.table('daily_media_stats').update({'reach': 500}).eq('ig_media_id', 'test_local_a_media_0').execute().data
+    assert [(row['ig_media_id'], row['reach']) for row in changed] == [('test_local_a_media_0', 500)]
+    deleted = client.table('daily_media_stats').delete().in_('ig_media_id', ['test_local_a_media_0', 'test_local_a_media_1']).execute().data
+    assert len(deleted) == 2
+    
+    for query in (
+        client.table('media_posts').select('missing_column'),
+        client.table('media_posts').select('ig_media_id').eq('media_posts_missing.ig_user_id', 'x')
+    ):
+        try:
+            query.execute()
+        except LocalQueryError:
+            continue
+        raise AssertionError("Unknown columns and resources must be rejected")
+    print("   ✅ Writes and conversions match PostgREST")
+
+if __name__ == "__main__":
+    test_filters_order_and_paging()
+    test_embedded_resources()
+    test_writes_and_conversions()
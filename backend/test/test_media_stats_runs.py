@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for daily media stats runs
+
+値が変わらない日は行を追加せず last_seen_date を延ばす保存 (save_daily_media_stats) と、
+読み出し時の日次展開 (_expand_stats_runs) を確認する
+- 変化なし: 現在のランを延長 / 月初の保存: 新しいラン
+- 当日の再保存: 当日の行を更新 / 延長後に値が変化: 前日でランを閉じて新しいラン
+- 件数のみの保存: インサイトは直前の値を引き継ぐ
+ローカルバックエンド (一時SQLiteファイル) で実行するため Supabase は不要
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import database
+from core.local_database import LocalDatabase
+from repositories.instagram_repository import InstagramAccountRepository
+from test_refresh_schedule import fixed_datetime
+
+TEST_ACCOUNT_ID = "test_runs_account"
+TEST_MEDIA_ID = "test_runs_media"
+PUBLISHED = date(2025, 6, 20)
+INSIGHTS = {'reach': 1000, 'views': 0, 'shares': 5, 'saved': 8}
+
+# (day, saved stats) in order; days repeat when a post is saved twice on the same night
+SAVES = [
+    (date(2025, 6, 28), {'like_count': 100, 'comments_count': 10, **INSIGHTS}),
+    (date(2025, 6, 29), {'like_count': 100, 'comments_count': 10}),  # unchanged: extends the run
+    (date(2025, 6, 30), {'like_count': 120, 'comments_count': 10}),  # moved after the extension: closes at 6/29
+    (date(2025, 6, 30), {'like_count': 130, 'comments_count': 11}),  # same night again: updates today's row
+    (date(2025, 7, 1), {'like_count': 130, 'comments_count': 11}),   # unchanged but a new month: new run
+    (date(2025, 7, 2), {'like_count': 130, 'comments_count': 11})    # unchanged: extends the July run
+]
+
+def use_local_database(name: str):
+    """Swap the database client for an empty local database; returns the previous client"""
+    previous_client = database._client
+    database._client = LocalDatabase(os.path.join(tempfile.mkdtemp(), name), 'sqlite')
+    database.client.table('instagram_accounts').insert({
+        'name': 'Runs Test', 'ig_user_id': TEST_ACCOUNT_ID, 'access_token': 'token', 'username': 'runs_test'
+    }).execute()
+    database.client.table('media_posts').insert({
+        'ig_media_id': TEST_MEDIA_ID, 'ig_user_id': TEST_ACCOUNT_ID, 'timestamp': f"{PUBLISHED.isoformat()}T09:00:00",
+        'media_type': 'IMAGE', 'media_url': 'https://example.com/media.jpg', 'permalink': 'https://www.instagram.com/p/runs/'
+    }).execute()
+    return previous_client
+
+async def save_all(repository: InstagramAccountRepository) -> list:
+    """Apply SAVES; returns the stored runs after each save as (date, last_seen_date, like_count, reach)"""
+    snapshots = []
+    for day, stats in SAVES:
+        with mock.patch('repositories.instagram_repository.datetime', fixed_datetime(day)):
+            assert await repository.save_daily_media_stats([{'ig_media_id': TEST_MEDIA_ID, 'ig_user_id': TEST_ACCOUNT_ID, **stats}]) == 1
+        rows = database.client.table('daily_media_stats').select('date, last_seen_date, like_count, reach').order('date').execute().data
+        snapshots.append([(row['date'], row['last_seen_date'], row['like_count'], row['reach']) for row in rows])
+    return snapshots
+
+def test_save_daily_media_stats_runs():
+    """Unchanged days extend a run; changes, same-day saves and month starts write as documented"""
+    print("🧪 Testing daily media stats run writes")
+    
+    previous_client = use_local_database('media_stats_runs.db')
+    try:
+        repository = InstagramAccountRepository()
+        snapshots = asyncio.run(save_all(repository))
+        for (day, _), runs in zip(SAVES, snapshots):
+            print(f"   {day}: {runs}")
+        
+        assert snapshots[0] == [('2025-06-28', '2025-06-28', 100, 1000)]
+        # Extended, not a second row
+        assert snapshots[1] == [('2025-06-28', '2025-06-29', 100, 1000)]
+        # Closed at yesterday; the count-only save carries the reach over
+        assert snapshots[2] == [('2025-06-28', '2025-06-29', 100, 1000), ('2025-06-30', '2025-06-30', 120, 1000)]
+        # Today's row updated in place
+        assert snapshots[3] == [('2025-06-28', '2025-06-29', 100, 1000), ('2025-06-30', '2025-06-30', 130, 1000)]
+        # First save of July starts a run even though nothing moved, which is then extended
+        assert snapshots[4][-1] == ('2025-07-01', '2025-07-01', 130, 1000)
+        assert snapshots[5] == snapshots[3] + [('2025-07-01', '2025-07-02', 130, 1000)]
+        
+        latest = database.client.table('daily_media_stats').select('shares, saved, engagement_rate').order('date', desc=True).limit(1).execute().data[0]
+        assert (latest['shares'], latest['saved'], latest['engagement_rate']) == (5, 8, 15.4)
+        print("   ✅ Runs are extended, updated, closed and split by month as expected")
+    finally:
+        database._client = previous_client
+
+def test_expand_stats_runs():
+    """Runs read back as one row per day, newest first, clipped to the requested range"""
+    print("🧪 Testing stats run expansion")
+    
+    previous_client = use_local_database('media_stats_expand.db')
+    try:
+        repository = InstagramAccountRepository()
+        asyncio.run(save_all(repository))
+        
+        daily = asyncio.run(repository.get_media_stats(TEST_MEDIA_ID))
+        assert [row['date'] for row in daily] == [(date(2025, 7, 2) - timedelta(days=offset)).isoformat() for offset in range(5)]
+        assert [row['like_count'] for row in daily] == [130, 130, 130, 100, 100]
+        assert all('last_seen_date' not in row for row in daily)
+        
+        ranged = asyncio.run(repository.get_media_stats(TEST_MEDIA_ID, (date(2025, 6, 29), date(2025, 7, 1))))
+        assert [row['date'] for row in ranged] == ['2025-07-01', '2025-06-30', '2025-06-29']
+        
+        # Rows without last_seen_date are one-day runs
+        expanded = repository._expand_stats_runs(
+            [{'date': '2025-06-01', 'last_seen_date': '2025-06-03', 'like_count': 1}, {'date': '2025-06-05', 'like_count': 2}],
+            start_date=date(2025, 6, 2)
+        )
+        assert expanded == [
+            {'date': '2025-06-02', 'like_count': 1},
+            {'date': '2025-06-03', 'like_count': 1},
+            {'date': '2025-06-05', 'like_count': 2}
+        ]
+        print("   ✅ Runs expand to daily rows within the range")
+    finally:
+        database._client = previous_client
+
+if __name__ == "__main__":
+    test_save_daily_media_stats_runs()
+    test_expand_stats_runs()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for insight refresh scheduling with nightly count-only saves
+
+投稿のインサイト取得後、件数のみの保存 (refresh_media_counts) を毎晩続けても
+更新ポリシーの週1回・月1回の再取得 ('scheduled') が止まらないことを確認する
+ローカルバックエンド (一時SQLiteファイル) で実行するため Supabase は不要
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import database
+from core.local_database import LocalDatabase
+from core.refresh_policy import WEEKLY_REFRESH_INTERVAL_DAYS, plan_refresh
+from repositories.instagram_repository import InstagramAccountRepository
+
+TEST_ACCOUNT_ID = "test_refresh_account"
+TEST_MEDIA_ID = "test_refresh_media"
+# Old enough for weekly refreshes (INSIGHT_REFRESH_DAILY_UNTIL_DAYS < age <= INSIGHT_REFRESH_WEEKLY_UNTIL_DAYS)
+POST_AGE_DAYS = 40
+
+def fixed_datetime(day: date):
+    """datetime class whose now() is noon of the given day"""
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls.combine(day, datetime.min.time()) + timedelta(hours=12)
+    return FixedDatetime
+
+async def run_nights(repository: InstagramAccountRepository, published: date, first_night: date) -> list:
+    """Insight save on the first night, then count-only saves; returns the refresh plan of each later night"""
+    plans = []
+    for night in range(WEEKLY_REFRESH_INTERVAL_DAYS + 1):
+        today = first_night + timedelta(days=night)
+        with mock.patch('repositories.instagram_repository.datetime', fixed_datetime(today)):
+            if night > 0:
+                trajectories = await repository.get_media_trajectories(TEST_ACCOUNT_ID)
+                trajectory = next((row for row in trajectories if row['ig_media_id'] == TEST_MEDIA_ID), None)
+                plans.append(plan_refresh(published, trajectory, today))
+            
+            stats = {'ig_media_id': TEST_MEDIA_ID, 'ig_user_id': TEST_ACCOUNT_ID, 'like_count': 100 + night, 'comments_count': 10}
+            if night == 0:
+                stats.update({'reach': 1000, 'views': 0, 'shares': 5, 'saved': 8})
+            await repository.save_daily_media_stats([stats])
+    return plans
+
+def test_count_only_saves_keep_insight_schedule():
+    """A post refreshed once and then only count-refreshed becomes 'scheduled' after the weekly interval"""
+    print("🧪 Testing insight refresh schedule with count-only saves")
+    
+    directory = tempfile.mkdtemp()
+    previous_client = database._client
+    database._client = LocalDatabase(os.path.join(directory, 'refresh_schedule.db'), 'sqlite')
+    try:
+        repository = InstagramAccountRepository()
+        first_night = date(2025, 6, 10)
+        published = first_night - timedelta(days=POST_AGE_DAYS)
+        
+        database.client.table('instagram_accounts').insert({
+            'name': 'Refresh Test', 'ig_user_id': TEST_ACCOUNT_ID, 'access_token': 'token', 'username': 'refresh_test'
+        }).execute()
+        database.client.table('media_posts').insert({
+            'ig_media_id': TEST_MEDIA_ID, 'ig_user_id': TEST_ACCOUNT_ID, 'timestamp': f"{published.isoformat()}T09:00:00",
+            'media_type': 'IMAGE', 'media_url': 'https://example.com/media.jpg', 'permalink': 'https://www.instagram.com/p/test/'
+        }).execute()
+        
+        plans = asyncio.run(run_nights(repository, published, first_night))
+        for night, (refresh, reason) in enumerate(plans, start=1):
+            print(f"   Night {night}: {reason}")
+        
+        assert [reason for _, reason in plans[:-1]] == ['skipped'] * (WEEKLY_REFRESH_INTERVAL_DAYS - 1)
+        assert plans[-1] == (True, 'scheduled')
+        print("   ✅ Weekly refresh is scheduled after count-only nights")
+    finally:
+        database._client = previous_client
+
+if __name__ == "__main__":
+    test_count_only_saves_keep_insight_schedule()
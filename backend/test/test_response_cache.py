@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for response caching and conditional requests
+
+分析APIのレスポンスキャッシュと ETag / 304 応答を確認する
+- ResponseCache: LRU による削除, データバージョン変更時の無効化, 既知バージョンの有効期限
+- If-None-Match: 一致すれば 304, データ保存 (バージョン更新) 後は新しい ETag で 200
+- 読み出しに失敗した応答 (500) はキャッシュしない
+- バージョン更新に失敗した保存は失敗 (0件) として返り、ローカルのキャッシュも破棄する
+ローカルバックエンド (一時SQLiteファイル) で実行するため Supabase は不要
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import date
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+
+import main
+import repositories.instagram_repository as repository_module
+from api.conditional import etag_matches
+from core.cache import ResponseCache, response_cache
+from core.database import database
+from core.local_database import LocalDatabase
+from middleware.auth.simple_auth import get_current_user
+from repositories.instagram_repository import instagram_repository
+from test_refresh_schedule import fixed_datetime
+
+TEST_ACCOUNT_ID = "test_cache_account"
+SERIES_PATH = f"/analytics/series/{TEST_ACCOUNT_ID}?start_date=2025-06-01&end_date=2025-06-07"
+
+def test_response_cache_entries_and_versions():
+    """Least recently used entries are evicted and a new data version drops the account's entries"""
+    print("🧪 Testing response cache entries and versions")
+    
+    cache = ResponseCache(max_entries=2, version_check_seconds=10)
+    first, second, third = (cache.make_key('series', TEST_ACCOUNT_ID, '1', {'page': page}) for page in range(3))
+    cache.set(first, 'first')
+    cache.set(second, 'second')
+    assert cache.get(first) == 'first'
+    cache.set(third, 'third')
+    assert (cache.get(first), cache.get(second), cache.get(third)) == ('first', None, 'third')
+    
+    with mock.patch('core.cache.time.monotonic', return_value=100.0):
+        cache.set_version(TEST_ACCOUNT_ID, '1')
+        assert cache.get(first) == 'first'
+        cache.set_version(TEST_ACCOUNT_ID, '2')
+        assert cache.get(first) is None and cache.get(third) is None
+        assert cache.get_known_version(TEST_ACCOUNT_ID) == '2'
+    with mock.patch('core.cache.time.monotonic', return_value=111.0):
+        assert cache.get_known_version(TEST_ACCOUNT_ID) is None
+    
+    etag = cache.make_etag(first)
+    assert etag_matches(etag, etag) and etag_matches(f'"other", W/{etag}', etag) and etag_matches('*', etag)
+    assert not etag_matches('"other"', etag) and not etag_matches(None, etag)
+    print("   ✅ Entries are evicted and invalidated by version")
+
+def test_conditional_requests_and_failures():
+    """304 until the data changes; failed reads and failed version bumps never leave stale responses"""
+    print("🧪 Testing conditional requests on the analytics API")
+    
+    previous_client = database._client
+    database._client = LocalDatabase(os.path.join(tempfile.mkdtemp(), 'response_cache.db'), 'sqlite')
+    main.app.dependency_overrides[get_current_user] = lambda: None
+    response_cache.clear()
+    try:
+        database.client.table('instagram_accounts').insert({
+            'name': 'Cache Test', 'ig_user_id': TEST_ACCOUNT_ID, 'access_token': 'token', 'username': 'cache_test'
+        }).execute()
+        client = TestClient(main.app)
+        
+        def save_followers(day: date, followers_count: int) -> int:
+            with mock.patch('repositories.instagram_repository.datetime', fixed_datetime(day)):
+                return asyncio.run(instagram_repository.save_daily_account_insights([{
+                    'ig_user_id': TEST_ACCOUNT_ID, 'followers_count': followers_count, 'follows_count': 10, 'media_count': 1
+                }]))
+        
+        assert save_followers(date(2025, 6, 1), 100) == 1
+        first = client.get(SERIES_PATH)
+        etag = first.headers['etag']
+        assert first.status_code == 200 and len(response_cache._entries) == 1
+        assert client.get(SERIES_PATH, headers={'If-None-Match': etag}).status_code == 304
+        
+        # A save bumps the data version: the old ETag no longer matches
+        assert save_followers(date(2025, 6, 2), 110) == 1
+        changed = client.get(SERIES_PATH, headers={'If-None-Match': etag})
+        assert changed.status_code == 200 and changed.headers['etag'] != etag
+        assert [point['followers_count'] for point in changed.json()['series']][:2] == [100, 110]
+        
+        # Failed reads answer 500 without an ETag and nothing is cached for them
+        async def failing_read(*args, **kwargs):
+            raise RuntimeError("read failed")
+        assert save_followers(date(2025, 6, 3), 120) == 1
+        with mock.patch.object(instagram_repository, '_execute_all', failing_read):
+            failed = client.get(SERIES_PATH)
+        assert failed.status_code == 500 and 'etag' not in failed.headers
+        assert len(response_cache._entries) == 0
+        assert client.get(SERIES_PATH).json()['series'][2]['followers_count'] == 120
+        
+        # A version bump that keeps failing fails the save and drops the local entries
+        execute = instagram_repository._execute
+        async def failing_version_write(query):
+            if getattr(query, 'table', None) == 'account_data_versions':
+                raise RuntimeError("version write failed")
+            return await execute(query)
+        with mock.patch.object(instagram_repository, '_execute', failing_version_write), \
+                mock.patch.object(repository_module, 'DATA_VERSION_BUMP_RETRY_SECONDS', 0):
+            assert save_followers(date(2025, 6, 4), 130) == 0
+        assert len(response_cache._entries) == 0
+        print("   ✅ 304 only while the data is unchanged; failures are not cached")
+    finally:
+        response_cache.clear()
+        main.app.dependency_overrides.pop(get_current_user, None)
+        database._client = previous_client
+
+if __name__ == "__main__":
+    test_response_cache_entries_and_versions()
+    test_conditional_requests_and_failures()
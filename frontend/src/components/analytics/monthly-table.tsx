@@ -42,7 +42,7 @@ export function MonthlyTable({ data }: MonthlyTableProps) {
                   {stat.posts_count}
                 </TableCell>
                 <TableCell className="text-right py-1">
-                  {stat.new_followers > 0 ? '+' : ''}{formatNumber(stat.new_followers)}
+                  {stat.new_followers === null ? '-' : `${stat.new_followers > 0 ? '+' : ''}${formatNumber(stat.new_followers)}`}
                 </TableCell>
                 <TableCell className="text-right py-1">
                   {formatNumber(stat.reach)}
@@ -65,10 +65,11 @@ export interface YearlyAnalytics {
 export interface DailyStats {
   date: string
   posts_count: number
-  new_followers: number
+  // 週・月単位に集約された期間の日は null
+  new_followers: number | null
   reach: number
-  profile_views: number
-  website_clicks: number
+  profile_views: number | null
+  website_clicks: number | null
 }
 
 export interface MonthlyAnalytics {
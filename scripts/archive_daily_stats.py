@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Daily Stats Archive Script
+
+締め済みの月の daily_media_stats をParquetアーカイブ (STATS_ARCHIVE_PATH) へ移すスクリプト
+- 直近 STATS_ARCHIVE_HOT_MONTHS か月 (当月を含む) より前に終わった統計の行が対象
+- 各投稿の最新の行は保存・最新値の参照のため主テーブルに残す
+- アカウント/年/月ごとにParquetを書き込み、読み戻せた行だけ主テーブルからバッチ削除
+  (中断後の再実行では書き込み済みの行は削除のみ行う)
+- アーカイブはAPIと共有するストレージであること (APIが起動時に置く印がなければ中止)
+アーカイブ済みの行はリポジトリ (投稿統計の履歴・エクスポート・推移の再構築) がDuckDB経由で読み取る。
+
+使い方:
+    python scripts/archive_daily_stats.py --archive-path /data/stats_archive
+    python scripts/archive_daily_stats.py 17841400000000000 --hot-months 6 --dry-run
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+# Backend path setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from core.config import settings
+from core.stats_archive import stats_archive
+from repositories.instagram_repository import instagram_repository
+
+def archive_cutoff(today: date, hot_months: int) -> date:
+    """First day of the oldest month kept in the primary table"""
+    months = today.year * 12 + today.month - 1 - (max(hot_months, 1) - 1)
+    return date(months // 12, months % 12 + 1, 1)
+
+async def archive_account(ig_user_id: str, cutoff: date, batch_size: int, dry_run: bool) -> Dict[str, int]:
+    """Move the closed stats runs of one account into its month partitions"""
+    rows = await instagram_repository.get_closed_media_stats(ig_user_id, cutoff)
+    
+    by_month: Dict[tuple, List[Dict]] = {}
+    for row in rows:
+        by_month.setdefault((int(row['date'][:4]), int(row['date'][5:7])), []).append(row)
+    
+    result = {"months": len(by_month), "archived": 0, "deleted": 0, "unverified": 0}
+    if dry_run:
+        result["archived"] = len(rows)
+        return result
+    
+    for (year, month), month_rows in sorted(by_month.items()):
+        archived_ids = await asyncio.to_thread(stats_archive.archived_ids, ig_user_id, year, month)
+        new_rows = [row for row in month_rows if row['id'] not in archived_ids]
+        if new_rows:
+            await asyncio.to_thread(stats_archive.write_partition, ig_user_id, year, month, new_rows)
+            result["archived"] += len(new_rows)
+        # Rows are only deleted once they can be read back from a Parquet part
+        readable_ids = await asyncio.to_thread(stats_archive.archived_ids, ig_user_id, year, month)
+        verified = [row['id'] for row in month_rows if row['id'] in readable_ids]
+        result["unverified"] += len(month_rows) - len(verified)
+        result["deleted"] += await instagram_repository.delete_media_stats(verified, batch_size)
+    
+    return result
+
+async def archive_daily_stats(ig_user_ids: Optional[List[str]] = None, hot_months: int = 3, batch_size: int = 500, dry_run: bool = False) -> Dict[str, Any]:
+    """Archive closed months of daily_media_stats for the given accounts (all accounts when omitted)"""
+    
+    print("🚀 Daily Stats Archive 開始")
+    
+    if not stats_archive.enabled:
+        print("❌ STATS_ARCHIVE_PATH が設定されていません (--archive-path で指定できます)")
+        sys.exit(1)
+    
+    if not dry_run and not stats_archive.has_reader():
+        # A job running elsewhere (e.g. CI) would delete rows the API can no longer read
+        print(f"❌ {stats_archive.root} はAPIが読み取るアーカイブではありません (APIと共有するストレージを指定し、APIを起動してください)")
+        sys.exit(1)
+    
+    if not ig_user_ids:
+        accounts = await instagram_repository.get_all()
+        ig_user_ids = [account.ig_user_id for account in accounts]
+    
+    cutoff = archive_cutoff(date.today(), hot_months)
+    print(f"   🗄️  {cutoff} より前に終わった統計を {stats_archive.root} へ移動{' (dry run)' if dry_run else ''}")
+    
+    results = {
+        "accounts": len(ig_user_ids),
+        "cutoff": cutoff.isoformat(),
+        "archived": 0,
+        "deleted": 0,
+        "unverified": 0
+    }
+    
+    for ig_user_id in ig_user_ids:
+        account_result = await archive_account(ig_user_id, cutoff, batch_size, dry_run)
+        results["archived"] += account_result["archived"]
+        results["deleted"] += account_result["deleted"]
+        results["unverified"] += account_result["unverified"]
+        print(f"   📦 {ig_user_id}: {account_result['months']}か月, {account_result['archived']}行をアーカイブ, {account_result['deleted']}行を削除")
+        if account_result["unverified"]:
+            print(f"   ⚠️  {ig_user_id}: {account_result['unverified']}行はアーカイブから読み戻せないため主テーブルに残しました")
+    
+    print(f"🏁 Daily Stats Archive 完了: {results['accounts']}アカウント, {results['archived']}行")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move closed months of daily_media_stats into the Parquet archive")
+    parser.add_argument("ig_user_ids", nargs="*", help="Target account ids (default: all accounts)")
+    parser.add_argument("--archive-path", help="Archive directory (default: STATS_ARCHIVE_PATH)")
+    parser.add_argument("--hot-months", type=int, default=settings.STATS_ARCHIVE_HOT_MONTHS, help="Recent months kept in the table, current month included")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per delete request")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the rows to archive")
+    args = parser.parse_args()
+    
+    if args.archive_path:
+        stats_archive.root = args.archive_path
+    
+    asyncio.run(archive_daily_stats(args.ig_user_ids, args.hot_months, args.batch_size, args.dry_run))
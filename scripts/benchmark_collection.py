@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Collection Pipeline Benchmark
+
+ローカルのGraph APIモック (mock_graph_api.py) とローカルDBに対して collect_all_instagram_data を実行し、
+実行モード毎に以下を計測して並べて比較するスクリプト
+- 実行時間 (wall clock)
+- Graph API呼び出し数 (アカウント毎・エンドポイント別)
+- DBラウンドトリップ数
+- ピークRSS
+- 呼び出し毎のレイテンシ p50/p95 (Graph API / DB)
+結果はJSONで保存し、デプロイ前に日次収集の改善・劣化を確認する。
+
+モード: {sequential, concurrent} x {per_metric, nested}
+ピークRSSをモード毎に測るため、各モードは別プロセスで実行する。
+各モードは全投稿のインサイトを取得する (--full-refresh 相当) ため、実行順に依存しない。
+
+DBは Settings の接続先 (ローカルSupabase: `supabase start` の http://127.0.0.1:54321 等) に書き込む。
+ローカル以外の接続先は --allow-remote-db を指定しない限り拒否する。
+
+使い方:
+    python scripts/benchmark_collection.py --accounts 5 --posts 100 --latency-ms 40
+    python scripts/benchmark_collection.py --modes sequential-per_metric concurrent-nested --output results.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List
+from urllib.parse import urlsplit
+
+import numpy as np
+import requests
+
+# Backend path setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+MODES = {
+    "sequential-per_metric": {"concurrency": 1, "fetch_mode": "per_metric"},
+    "sequential-nested": {"concurrency": 1, "fetch_mode": "nested"},
+    "concurrent-per_metric": {"concurrency": None, "fetch_mode": "per_metric"},
+    "concurrent-nested": {"concurrency": None, "fetch_mode": "nested"}
+}
+DEFAULT_CONCURRENCY = 4
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "0.0.0.0"}
+
+def percentiles(durations: List[float]) -> Dict[str, Any]:
+    """p50/p95 in milliseconds"""
+    if not durations:
+        return {"count": 0, "p50_ms": None, "p95_ms": None}
+    p50, p95 = np.percentile(np.asarray(durations) * 1000, [50, 95])
+    return {"count": len(durations), "p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2)}
+
+def is_local_database() -> bool:
+    """Whether the configured database is on this machine"""
+    from core.config import settings
+    if settings.DATABASE_BACKEND == "local":
+        return True
+    return (urlsplit(settings.SUPABASE_URL).hostname or "") in LOCAL_HOSTS
+
+def instrument() -> Dict[str, List[float]]:
+    """Record the duration of every Graph API request and database round trip"""
+    from external.instagram_client import InstagramAPIClient
+    from repositories.base import BaseRepository
+    
+    durations = {"graph": [], "db": []}
+    make_request = InstagramAPIClient.make_request
+    execute = BaseRepository._execute
+    
+    def timed_make_request(self, url, params):
+        started = time.perf_counter()
+        try:
+            return make_request(self, url, params)
+        finally:
+            durations["graph"].append(time.perf_counter() - started)
+    
+    async def timed_execute(self, query):
+        started = time.perf_counter()
+        try:
+            return await execute(self, query)
+        finally:
+            durations["db"].append(time.perf_counter() - started)
+    
+    InstagramAPIClient.make_request = timed_make_request
+    BaseRepository._execute = timed_execute
+    return durations
+
+def run_mode(mode: str, concurrency: int, verbose: bool = False) -> Dict[str, Any]:
+    """Run the collection pipeline once in this process and measure it"""
+    from daily_data_collection import collect_all_instagram_data
+    
+    settings = MODES[mode]
+    durations = instrument()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    
+    started = time.perf_counter()
+    with output:
+        results = asyncio.run(collect_all_instagram_data(
+            full_refresh=True,
+            fetch_mode=settings["fetch_mode"],
+            concurrency=settings["concurrency"] or concurrency
+        ))
+    wall_seconds = time.perf_counter() - started
+    
+    return {
+        "mode": mode,
+        "fetch_mode": settings["fetch_mode"],
+        "concurrency": settings["concurrency"] or concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "success": results.get("success", False),
+        "accounts": results.get("accounts_processed", 0),
+        "insights_collected": results.get("insights_collected", 0),
+        "errors": results.get("errors", []),
+        "graph_latency": percentiles(durations["graph"]),
+        "db_round_trips": len(durations["db"]),
+        "db_latency": percentiles(durations["db"]),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+def start_mock_server(args) -> str:
+    """Start the mock Graph API in a background thread; returns its base URL"""
+    import uvicorn
+    from mock_graph_api import MockGraphConfig, create_app
+    
+    config = MockGraphConfig(
+        seed=args.seed,
+        accounts=args.accounts,
+        posts_per_account=args.posts,
+        base_date=args.base_date,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate
+    )
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host="127.0.0.1", port=args.port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{args.port}"
+
+async def seed_accounts() -> int:
+    """Register the mock accounts through the token refresh flow"""
+    from services.instagram_service import InstagramService
+    from repositories.instagram_repository import instagram_repository
+    
+    service = InstagramService(repository=instagram_repository)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await service.refresh_all_tokens({
+            "app_id": "benchmark",
+            "app_secret": "benchmark",
+            "access_token": "benchmark"
+        })
+    return result.updated_accounts
+
+def run_in_subprocess(mode: str, args, graph_api_url: str) -> Dict[str, Any]:
+    """Run one mode in a fresh interpreter (separate peak RSS)"""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as handle:
+        result_path = handle.name
+    
+    env = {**os.environ, "INSTAGRAM_GRAPH_API_URL": graph_api_url}
+    # Dashboard cache warmup is not part of the collection benchmark
+    for name in ("CACHE_WARMUP_API_URL", "CACHE_WARMUP_USERNAME", "CACHE_WARMUP_PASSWORD"):
+        env.pop(name, None)
+    
+    command = [sys.executable, __file__, "--run-mode", mode, "--concurrency", str(args.concurrency), "--result-file", result_path]
+    if args.verbose:
+        command.append("--verbose")
+    subprocess.run(command, env=env, check=True)
+    
+    with open(result_path, encoding="utf-8") as handle:
+        result = json.load(handle)
+    os.unlink(result_path)
+    return result
+
+def print_comparison(runs: List[Dict[str, Any]]):
+    """Print modes side by side"""
+    rows = [
+        ("wall time (s)", lambda run: run["wall_seconds"]),
+        ("graph calls", lambda run: run["graph_calls"]),
+        ("graph calls / account", lambda run: run["graph_calls_per_account"]),
+        ("graph p50 (ms)", lambda run: run["graph_latency"]["p50_ms"]),
+        ("graph p95 (ms)", lambda run: run["graph_latency"]["p95_ms"]),
+        ("db round trips", lambda run: run["db_round_trips"]),
+        ("db p50 (ms)", lambda run: run["db_latency"]["p50_ms"]),
+        ("db p95 (ms)", lambda run: run["db_latency"]["p95_ms"]),
+        ("peak RSS (MB)", lambda run: run["peak_rss_mb"]),
+        ("errors", lambda run: len(run["errors"]))
+    ]
+    width = max(len(run["mode"]) for run in runs) + 2
+    print("".ljust(24) + "".join(run["mode"].rjust(width) for run in runs))
+    for label, value in rows:
+        print(label.ljust(24) + "".join(str(value(run)).rjust(width) for run in runs))
+
+def main(args) -> Dict[str, Any]:
+    if not is_local_database() and not args.allow_remote_db:
+        print("❌ DB接続先がローカルではありません (--allow-remote-db で許可)")
+        sys.exit(1)
+    
+    from mock_graph_api import DEFAULT_API_VERSION
+    
+    graph_url = start_mock_server(args)
+    graph_api_url = f"{graph_url}/{DEFAULT_API_VERSION}"
+    os.environ["INSTAGRAM_GRAPH_API_URL"] = graph_api_url
+    
+    print("🚀 Collection Benchmark 開始")
+    print(f"   🧪 Mock Graph API: {graph_api_url} ({args.accounts}アカウント x {args.posts}投稿, latency {args.latency_ms}ms)")
+    seeded = asyncio.run(seed_accounts())
+    print(f"   📱 アカウント登録: {seeded}件")
+    
+    runs = []
+    for mode in args.modes:
+        requests.post(f"{graph_url}/__reset")
+        run = run_in_subprocess(mode, args, graph_api_url)
+        stats = requests.get(f"{graph_url}/__stats").json()
+        run["graph_calls"] = stats["total"]
+        run["graph_calls_per_account"] = round(stats["total"] / max(run["accounts"], 1), 1)
+        run["graph_calls_by_endpoint"] = stats["by_endpoint"]
+        runs.append(run)
+        print(f"   ✅ {mode}: {run['wall_seconds']}s, Graph {run['graph_calls']}回, DB {run['db_round_trips']}回")
+    
+    report = {
+        "executed_at": datetime.now().isoformat(),
+        "config": {
+            "accounts": args.accounts,
+            "posts_per_account": args.posts,
+            "seed": args.seed,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "concurrency": args.concurrency,
+            "note": "DB accounts other than the mock accounts are collected too"
+        },
+        "runs": runs
+    }
+    
+    print()
+    print_comparison(runs)
+    
+    output = args.output or os.path.join(os.path.dirname(__file__), f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, ensure_ascii=False)
+    print(f"\n📄 結果を保存: {output}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the daily collection pipeline against the mock Graph API")
+    parser.add_argument("--accounts", type=int, default=3)
+    parser.add_argument("--posts", type=int, default=50, help="Posts per account")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Mock Graph API latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8810)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Accounts at a time in concurrent modes")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--output", help="Result JSON path (default: scripts/benchmark_results_<timestamp>.json)")
+    parser.add_argument("--allow-remote-db", action="store_true", help="Allow writing benchmark data to a non-local database")
+    parser.add_argument("--verbose", action="store_true", help="Show collection logs")
+    # Internal: run a single mode in this process
+    parser.add_argument("--run-mode", choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.run_mode:
+        with open(args.result_file, "w", encoding="utf-8") as handle:
+            json.dump(run_mode(args.run_mode, args.concurrency, args.verbose), handle)
+    else:
+        main(args)
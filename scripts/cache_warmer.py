@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Dashboard Cache Warmer
+
+日次データ収集直後にダッシュボード用レスポンスを事前計算するスクリプト
+- 当年の年間分析
+- 当月・前月の月間分析
+- 投稿分析のデフォルトページ
+
+レスポンスキャッシュはAPIサーバーのプロセス内にあるため、
+デプロイ済みAPIへリクエストを送ってキャッシュを温める。
+リクエストには Cache-Control: no-cache を付け、APIにデータバージョンを
+データベースから読み直させる（収集直後の新しいバージョンで計算される）。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+
+DEFAULT_CONCURRENCY = 4
+REQUEST_TIMEOUT_SECONDS = 60
+
+def build_warmup_paths(ig_user_id: str, now: Optional[datetime] = None) -> List[str]:
+    """Build dashboard paths to precompute for an account"""
+    now = now or datetime.now()
+    previous_year, previous_month = (now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12)
+
+    return [
+        f"/analytics/yearly/{ig_user_id}?year={now.year}",
+        f"/analytics/monthly/{ig_user_id}?year={now.year}&month={now.month}",
+        f"/analytics/monthly/{ig_user_id}?year={previous_year}&month={previous_month}",
+        f"/analytics/posts/{ig_user_id}?"
+    ]
+
+def login(api_url: str, username: str, password: str) -> str:
+    """Get access token from the API"""
+    response = requests.post(
+        f"{api_url}/auth/login",
+        json={"username": username, "password": password},
+        timeout=REQUEST_TIMEOUT_SECONDS
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+async def warm_dashboard_cache(
+    api_url: str,
+    username: str,
+    password: str,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> Dict[str, Any]:
+    """Request every dashboard view once so the API stores them in its response cache"""
+
+    print("🔥 Dashboard Cache Warmup 開始")
+    print(f"   🔗 API: {api_url}")
+    print(f"   🔀 同時実行数: {concurrency}")
+
+    results = {
+        "success": True,
+        "accounts": 0,
+        "warmed": 0,
+        "failed": 0,
+        "duration_seconds": 0.0,
+        "errors": []
+    }
+    started_at = time.perf_counter()
+
+    try:
+        token = await asyncio.to_thread(login, api_url, username, password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        accounts_response = await asyncio.to_thread(
+            requests.get, f"{api_url}/accounts/", headers=headers, timeout=REQUEST_TIMEOUT_SECONDS
+        )
+        accounts_response.raise_for_status()
+        accounts = accounts_response.json()
+        results["accounts"] = len(accounts)
+        print(f"   📋 対象アカウント: {len(accounts)}件")
+    except Exception as e:
+        error_msg = f"Cache warmup setup failed: {str(e)}"
+        results["errors"].append(error_msg)
+        results["success"] = False
+        print(f"❌ {error_msg}")
+        return results
+
+    # Make the API re-read the data version instead of the one it saw before collection
+    warmup_headers = {**headers, "Cache-Control": "no-cache"}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm(path: str):
+        async with semaphore:
+            try:
+                response = await asyncio.to_thread(
+                    requests.get, f"{api_url}{path}", headers=warmup_headers, timeout=REQUEST_TIMEOUT_SECONDS
+                )
+                response.raise_for_status()
+                results["warmed"] += 1
+            except Exception as e:
+                results["failed"] += 1
+                results["errors"].append(f"{path}: {str(e)}")
+                print(f"   ❌ {path}: {str(e)}")
+
+    paths = [path for account in accounts for path in build_warmup_paths(account["ig_user_id"])]
+    await asyncio.gather(*(warm(path) for path in paths))
+
+    results["duration_seconds"] = round(time.perf_counter() - started_at, 2)
+    results["success"] = results["failed"] == 0
+
+    print(f"🏁 Dashboard Cache Warmup 完了: {results['warmed']}/{len(paths)} 成功 ({results['duration_seconds']}秒)")
+    return results
+
+def warmup_settings_from_env() -> Optional[Dict[str, Any]]:
+    """Read warmup settings from environment (None when warmup is not configured)"""
+    api_url = os.getenv('CACHE_WARMUP_API_URL')
+    username = os.getenv('CACHE_WARMUP_USERNAME')
+    password = os.getenv('CACHE_WARMUP_PASSWORD')
+
+    if not api_url or not username or not password:
+        return None
+
+    return {
+        "api_url": api_url.rstrip('/'),
+        "username": username,
+        "password": password,
+        "concurrency": int(os.getenv('CACHE_WARMUP_CONCURRENCY', DEFAULT_CONCURRENCY))
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute dashboard responses in the API cache")
+    parser.add_argument("--api-url", default=os.getenv('CACHE_WARMUP_API_URL'))
+    parser.add_argument("--username", default=os.getenv('CACHE_WARMUP_USERNAME'))
+    parser.add_argument("--password", default=os.getenv('CACHE_WARMUP_PASSWORD'))
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv('CACHE_WARMUP_CONCURRENCY', DEFAULT_CONCURRENCY)))
+    args = parser.parse_args()
+
+    if not args.api_url or not args.username or not args.password:
+        print("❌ --api-url, --username, --password (または CACHE_WARMUP_* 環境変数) が必要です")
+        sys.exit(1)
+
+    results = asyncio.run(warm_dashboard_cache(
+        args.api_url.rstrip('/'), args.username, args.password, args.concurrency
+    ))
+    sys.exit(0 if results["success"] else 1)
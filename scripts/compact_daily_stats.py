@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Daily Stats Compaction Script
+
+保持ポリシー (core/retention.py) に従い、古い日次統計を週・月単位のロールアップに集約するスクリプト
+- STATS_RETENTION_DAILY_DAYS 日より前の daily_account_stats / daily_media_stats → 週単位
+- STATS_RETENTION_WEEKLY_DAYS 日より前の週単位のロールアップ → 月単位
+- 集約後に元の行をバッチ削除 (各投稿の最新の統計の行は残す)
+分析API (期間別系列)・投稿統計の履歴・エクスポートは古い期間をロールアップから読み取る。
+media_trajectories は日単位のまま残る (rebuild_media_trajectories.py で再構築すると週・月単位の観測値から補間される)。
+
+使い方:
+    python scripts/compact_daily_stats.py
+    python scripts/compact_daily_stats.py 17841400000000000 --daily-days 90 --weekly-days 365
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+# Backend path setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from core.config import settings
+from core.retention import retention_cutoffs
+from repositories.instagram_repository import instagram_repository
+
+async def compact_daily_stats(ig_user_ids: Optional[List[str]] = None, daily_days: int = 180, weekly_days: int = 730, batch_size: int = 500) -> Dict[str, Any]:
+    """Downsample old daily stats for the given accounts (all accounts when omitted)"""
+    
+    print("🚀 Daily Stats Compaction 開始")
+    
+    if not ig_user_ids:
+        accounts = await instagram_repository.get_all()
+        ig_user_ids = [account.ig_user_id for account in accounts]
+    
+    daily_before, weekly_before = retention_cutoffs(date.today(), daily_days, weekly_days)
+    print(f"   🗜️  {daily_before} より前: 週単位, {weekly_before} より前: 月単位")
+    
+    results = {
+        "accounts": len(ig_user_ids),
+        "daily_before": daily_before.isoformat(),
+        "weekly_before": weekly_before.isoformat(),
+        "rollups": 0,
+        "deleted": 0
+    }
+    
+    for ig_user_id in ig_user_ids:
+        account_result = await instagram_repository.compact_account_stats(ig_user_id, daily_before, weekly_before, batch_size)
+        media_result = await instagram_repository.compact_media_stats(ig_user_id, daily_before, weekly_before, batch_size)
+        rollups = account_result["rollups"] + media_result["rollups"]
+        deleted = account_result["deleted"] + media_result["deleted"]
+        if deleted:
+            await instagram_repository.bump_data_version([ig_user_id])
+        
+        results["rollups"] += rollups
+        results["deleted"] += deleted
+        print(f"   📉 {ig_user_id}: ロールアップ {rollups}行, 削除 {deleted}行")
+    
+    print(f"🏁 Daily Stats Compaction 完了: {results['accounts']}アカウント, 削除 {results['deleted']}行")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Downsample old daily stats into weekly/monthly rollups")
+    parser.add_argument("ig_user_ids", nargs="*", help="Target account ids (default: all accounts)")
+    parser.add_argument("--daily-days", type=int, default=settings.STATS_RETENTION_DAILY_DAYS, help="Days kept at daily granularity")
+    parser.add_argument("--weekly-days", type=int, default=settings.STATS_RETENTION_WEEKLY_DAYS, help="Days kept at weekly granularity")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per write/delete request")
+    args = parser.parse_args()
+    
+    asyncio.run(compact_daily_stats(args.ig_user_ids, args.daily_days, args.weekly_days, args.batch_size))
@@ -7,13 +7,16 @@ GitHub Actions用の統合データ収集スクリプト
 - 投稿データ収集（新規検出・保存）
 - インサイトデータ収集（投稿毎）
 - アカウントインサイト収集（アカウント毎）
+  ※ 投稿インサイトは経過日数・リーチ増加速度に応じて更新対象を絞り込む（--full-refresh で全件）
+- ダッシュボードキャッシュのウォームアップ（設定時のみ）
 """
 
+import argparse
 import asyncio
 import sys
 import os
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import json
 
 # Backend path setup
@@ -21,13 +24,38 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from repositories.instagram_repository import instagram_repository
 from services.instagram_service import instagram_service
+from cache_warmer import warm_dashboard_cache, warmup_settings_from_env
 
-async def collect_all_instagram_data() -> Dict[str, Any]:
-    """Complete Instagram data collection pipeline"""
+async def run_for_accounts(accounts_data: List[Dict], collect, concurrency: int = 1) -> List[Any]:
+    """Run collect(account_data) for every account, at most `concurrency` at a time
+    
+    Results are returned in account order; an exception is returned in place of its result.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    
+    async def run(account_data: Dict) -> Any:
+        async with semaphore:
+            try:
+                return await collect(account_data)
+            except Exception as e:
+                return e
+    
+    return await asyncio.gather(*(run(account_data) for account_data in accounts_data))
+
+async def collect_all_instagram_data(full_refresh: bool = False, fetch_mode: Optional[str] = None, concurrency: int = 1) -> Dict[str, Any]:
+    """Complete Instagram data collection pipeline
+    
+    fetch_mode: media insights fetch mode ("nested" / "per_metric", default MEDIA_INSIGHTS_FETCH_MODE)
+    concurrency: accounts collected at the same time in the media steps
+    """
     
     print("🚀 Instagram Daily Data Collection 開始")
     print(f"📅 実行日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}")
     print(f"🌍 タイムゾーン: JST (GitHub Actions: UTC)")
+    if full_refresh:
+        print("🔄 フルリフレッシュ: 全投稿のインサイトを再取得")
+    if concurrency > 1:
+        print(f"⚡ 同時処理アカウント数: {concurrency}")
     print()
     
     results = {
@@ -36,6 +64,8 @@ async def collect_all_instagram_data() -> Dict[str, Any]:
         "accounts_processed": 0,
         "media_posts_collected": 0,
         "insights_collected": 0,
+        "insights_skipped": 0,
+        "media_counts_refreshed": 0,
         "account_insights_collected": 0,
         "detailed_results": {
             "accounts": [],
@@ -49,7 +79,7 @@ async def collect_all_instagram_data() -> Dict[str, Any]:
     try:
         # 1. Get all Instagram accounts from database
         print("📋 Step 0: データベースからアカウント一覧取得...")
-        accounts = await instagram_repository.get_all()
+        accounts = await instagram_repository.get_all(with_token=True)
         
         if not accounts:
             error_msg = "No Instagram accounts found in database"
@@ -87,14 +117,18 @@ async def collect_all_instagram_data() -> Dict[str, Any]:
         media_results = []
         total_media_collected = 0
         
-        for account_data in accounts_data:
-            print(f"   🔍 {account_data['name']} の投稿データ収集中...")
+        outcomes = await run_for_accounts(
+            accounts_data,
+            lambda account_data: instagram_service.collect_media_posts(account_data['ig_user_id'], account_data['access_token']),
+            concurrency
+        )
+        
+        for account_data, result in zip(accounts_data, outcomes):
+            print(f"   🔍 {account_data['name']} の投稿データ収集")
             
             try:
-                result = await instagram_service.collect_media_posts(
-                    account_data['ig_user_id'], 
-                    account_data['access_token']
-                )
+                if isinstance(result, Exception):
+                    raise result
                 
                 account_result = {
                     "account": account_data['name'],
@@ -127,14 +161,23 @@ async def collect_all_instagram_data() -> Dict[str, Any]:
         insights_results = []
         total_insights_collected = 0
         
-        for account_data in accounts_data:
-            print(f"   🔍 {account_data['name']} のインサイトデータ収集中...")
+        outcomes = await run_for_accounts(
+            accounts_data,
+            lambda account_data: instagram_service.collect_all_media_insights(
+                account_data['ig_user_id'],
+                account_data['access_token'],
+                full_refresh=full_refresh,
+                fetch_mode=fetch_mode
+            ),
+            concurrency
+        )
+        
+        for account_data, result in zip(accounts_data, outcomes):
+            print(f"   🔍 {account_data['name']} のインサイトデータ収集")
             
             try:
-                result = await instagram_service.collect_all_media_insights(
-                    account_data['ig_user_id'], 
-                    account_data['access_token']
-                )
+                if isinstance(result, Exception):
+                    raise result
                 
                 account_result = {
                     "account": account_data['name'],
@@ -147,8 +190,11 @@ async def collect_all_instagram_data() -> Dict[str, Any]:
                 if result.get("success"):
                     successful = result.get("successful_media", 0)
                     processed = result.get("processed_media", 0)
+                    skipped = result.get("skipped_media", 0)
                     total_insights_collected += successful
-                    print(f"   ✅ {account_data['name']}: {successful}/{processed} 投稿のインサイト収集成功")
+                    results["insights_skipped"] += skipped
+                    results["media_counts_refreshed"] += result.get("counts_refreshed", 0)
+                    print(f"   ✅ {account_data['name']}: {successful}/{processed} 投稿のインサイト収集成功 ({skipped}件は更新不要)")
                 else:
                     error_msg = f"Media insights failed for {account_data['name']}: {result.get('error', 'Unknown error')}"
                     results["errors"].append(error_msg)
@@ -198,12 +244,24 @@ async def collect_all_instagram_data() -> Dict[str, Any]:
         
         print()
         
-        # 5. Final Summary
+        # 5. Warm dashboard cache (failures here do not fail the collection)
+        warmup_settings = warmup_settings_from_env()
+        if warmup_settings:
+            print("🔥 Step 4: ダッシュボードキャッシュ ウォームアップ...")
+            try:
+                results["cache_warmup"] = await warm_dashboard_cache(**warmup_settings)
+            except Exception as e:
+                results["cache_warmup"] = {"success": False, "errors": [str(e)]}
+                print(f"⚠️ キャッシュウォームアップ例外: {str(e)}")
+            print()
+        
+        # 6. Final Summary
         print(f"🏁 Instagram Daily Data Collection 完了")
         print(f"📊 収集サマリー:")
         print(f"   🔍 処理アカウント: {results['accounts_processed']}件")
         print(f"   📸 投稿データ: {results['media_posts_collected']}件")
-        print(f"   📊 投稿インサイト: {results['insights_collected']}件")
+        print(f"   📊 投稿インサイト: {results['insights_collected']}件 (更新不要でスキップ: {results['insights_skipped']}件)")
+        print(f"   ❤️ いいね・コメント数のみ更新: {results['media_counts_refreshed']}件")
         print(f"   📈 アカウントインサイト: {results['account_insights_collected']}件")
         print(f"   ❌ エラー: {len(results['errors'])}件")
         
@@ -243,6 +301,27 @@ def save_results_to_file(results: Dict[str, Any]):
         print(f"⚠️ 結果ファイル保存に失敗: {str(e)}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instagram daily data collection")
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        default=os.getenv('FULL_REFRESH', 'false').lower() == 'true',
+        help="Refresh insights of every post regardless of the refresh policy"
+    )
+    parser.add_argument(
+        "--fetch-mode",
+        choices=["nested", "per_metric"],
+        default=None,
+        help="Media insights fetch mode (default: MEDIA_INSIGHTS_FETCH_MODE)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv('COLLECTION_CONCURRENCY', '1')),
+        help="Accounts collected at the same time"
+    )
+    args = parser.parse_args()
+    
     # Set environment variables for debugging
     debug_mode = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
     
@@ -250,7 +329,11 @@ if __name__ == "__main__":
         print("🐛 DEBUG MODE: 詳細ログを有効化")
     
     # Run collection
-    results = asyncio.run(collect_all_instagram_data())
+    results = asyncio.run(collect_all_instagram_data(
+        full_refresh=args.full_refresh,
+        fetch_mode=args.fetch_mode,
+        concurrency=args.concurrency
+    ))
     
     # Save detailed results if in debug mode or if errors occurred
     if debug_mode or len(results.get("errors", [])) > 0:
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Analytics API Load Test
+
+分析API (/analytics/yearly, /analytics/monthly, /analytics/posts) をプロセス内で実行し、
+エンドポイント毎のレイテンシ分布 (p50/p90/p95/p99) とスループットを計測するスクリプト
+- FastAPIアプリをHTTPサーバーなしで直接呼び出す (httpx ASGITransport)
+- 認証は固定ユーザーに差し替え
+- 既定ではレスポンスキャッシュを無効化し、毎回DB集計まで実行する (--warm-cache でキャッシュ込み)
+- リクエストのパラメータ (年・月・期間・メディアタイプ・ソート) は seed から決定的に生成
+
+generate_synthetic_data.py で投入したデータ (Settings の接続先) に対して実行する。
+
+使い方:
+    python scripts/load_test_analytics.py --requests 200 --concurrency 8 --years 3
+    python scripts/load_test_analytics.py --endpoints yearly monthly --output load_results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import httpx
+import numpy as np
+
+# Backend path setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from core.cache import response_cache
+from main import app
+from middleware.auth.simple_auth import get_current_user
+from models.user import User
+from repositories.instagram_repository import instagram_repository
+
+ENDPOINTS = ['yearly', 'monthly', 'posts']
+MEDIA_TYPES = ['IMAGE', 'VIDEO', 'CAROUSEL_ALBUM']
+POST_SORT_FIELDS = ['timestamp', 'like_count', 'reach', 'engagement_rate']
+
+def build_requests(endpoint: str, account_ids: List[str], count: int, start: date, end: date, rng: random.Random) -> List[Tuple[str, Dict[str, Any]]]:
+    """Deterministic (path, params) pairs spread over accounts and the data period"""
+    requests = []
+    for _ in range(count):
+        account_id = rng.choice(account_ids)
+        day = start + timedelta(days=rng.randint(0, (end - start).days))
+        
+        if endpoint == 'yearly':
+            requests.append((f"/analytics/yearly/{account_id}", {"year": day.year}))
+        elif endpoint == 'monthly':
+            requests.append((f"/analytics/monthly/{account_id}", {"year": day.year, "month": day.month}))
+        else:
+            window_end = min(day + timedelta(days=rng.choice([7, 30, 90, 365])), end)
+            params = {
+                "start_date": day.isoformat(),
+                "end_date": window_end.isoformat(),
+                "sort_by": rng.choice(POST_SORT_FIELDS),
+                "sort_order": rng.choice(['asc', 'desc']),
+                "limit": rng.choice([25, 50, 100])
+            }
+            if rng.random() < 0.3:
+                params["media_type"] = rng.sample(MEDIA_TYPES, rng.randint(1, 2))
+            requests.append((f"/analytics/posts/{account_id}", params))
+    return requests
+
+def summarize(durations: List[float], statuses: Dict[int, int], elapsed: float) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput of one endpoint"""
+    summary = {
+        "requests": len(durations),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "requests_per_second": round(len(durations) / elapsed, 1) if elapsed > 0 else None
+    }
+    if durations:
+        values = np.asarray(durations) * 1000
+        p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+        summary.update({
+            "mean_ms": round(float(values.mean()), 2),
+            "p50_ms": round(float(p50), 2),
+            "p90_ms": round(float(p90), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(values.max()), 2)
+        })
+    return summary
+
+async def run_endpoint(client: httpx.AsyncClient, requests: List[Tuple[str, Dict[str, Any]]], concurrency: int) -> Dict[str, Any]:
+    """Send requests with bounded concurrency and collect per-request latency"""
+    semaphore = asyncio.Semaphore(concurrency)
+    durations: List[float] = []
+    statuses: Dict[int, int] = {}
+    
+    async def send(path: str, params: Dict[str, Any]):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path, params=params)
+            durations.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(send(path, params) for path, params in requests))
+    return summarize(durations, statuses, time.perf_counter() - started)
+
+async def run_load_test(args) -> Dict[str, Any]:
+    """Run every endpoint against the configured database and report latency percentiles"""
+    print("🚀 Analytics Load Test 開始")
+    
+    app.dependency_overrides[get_current_user] = lambda: User(id=0, username="load_test", password_hash="")
+    if not args.warm_cache:
+        # Every response is evicted immediately, so each request runs the database path
+        response_cache.max_entries = 0
+    
+    account_ids = args.account_ids or [account.ig_user_id for account in await instagram_repository.get_all()]
+    if not account_ids:
+        print("❌ アカウントがありません (generate_synthetic_data.py でデータを投入してください)")
+        sys.exit(1)
+    
+    rng = random.Random(args.seed)
+    if args.sample_accounts and len(account_ids) > args.sample_accounts:
+        account_ids = rng.sample(sorted(account_ids), args.sample_accounts)
+    
+    end = args.end_date or date.today()
+    start = end - timedelta(days=max(int(round(args.years * 365)), 1) - 1)
+    print(f"   📱 対象アカウント: {len(account_ids)}件, 期間: {start} 〜 {end}")
+    print(f"   ⚙️  {args.requests}リクエスト/エンドポイント, 並列数 {args.concurrency}, キャッシュ {'有効' if args.warm_cache else '無効'}")
+    
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+        for endpoint in args.endpoints:
+            requests = build_requests(endpoint, account_ids, args.warmup + args.requests, start, end, rng)
+            if args.warmup:
+                await run_endpoint(client, requests[:args.warmup], args.concurrency)
+            results[endpoint] = await run_endpoint(client, requests[args.warmup:], args.concurrency)
+            summary = results[endpoint]
+            print(f"   ✅ /analytics/{endpoint}: p50 {summary.get('p50_ms')}ms, p95 {summary.get('p95_ms')}ms, p99 {summary.get('p99_ms')}ms, エラー {summary['errors']}件")
+    
+    report = {
+        "executed_at": datetime.now().isoformat(),
+        "config": {
+            "accounts": len(account_ids),
+            "period": [start.isoformat(), end.isoformat()],
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "warm_cache": args.warm_cache,
+            "seed": args.seed
+        },
+        "endpoints": results
+    }
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f"📄 結果を保存: {args.output}")
+    
+    print("🏁 Analytics Load Test 完了")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-process load test of the analytics endpoints")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--account-ids", nargs="*", help="Target accounts (default: all accounts in the database)")
+    parser.add_argument("--sample-accounts", type=int, default=20, help="Accounts sampled from the database (0 = all)")
+    parser.add_argument("--years", type=float, default=1.0, help="Period of the generated data")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last day of the generated data (default: today)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the response cache enabled")
+    parser.add_argument("--output", help="Result JSON path")
+    args = parser.parse_args()
+    
+    asyncio.run(run_load_test(args))
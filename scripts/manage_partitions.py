@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Partition Management Script
+
+月単位にパーティション化した daily_media_stats のパーティションを管理するスクリプト (Postgres, migrations/002)
+- 当月から --months-ahead か月先までのパーティションを事前作成 (日次収集の行が既定パーティションに入らないように)
+- 直近 STATS_ARCHIVE_HOT_MONTHS か月より前のパーティションのうち、空になったものを切り離して削除
+  古い月の行は archive_daily_stats.py (Parquetへ移動) / compact_daily_stats.py (ロールアップへ集約) が先に移す
+  行が残っているパーティション (収集されなくなった投稿の最新の行など) はそのまま残して件数を報告
+- --since で過去の月のパーティションも作成 (既定パーティションに入った過去の行を移す。合成データ投入後など)
+ローカルバックエンド (SQLite) はパーティション化しないため何もしない。
+
+使い方:
+    python scripts/manage_partitions.py
+    python scripts/manage_partitions.py --months-ahead 6 --hot-months 3
+    python scripts/manage_partitions.py --since 2023-01-01 --no-drop
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+from typing import Any, Dict, Optional
+
+# Backend path setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from core.config import settings
+from repositories.instagram_repository import instagram_repository
+from archive_daily_stats import archive_cutoff
+
+def months_between(start: date, end: date) -> int:
+    """Months from the month of start to the month of end, both included"""
+    return (end.year - start.year) * 12 + end.month - start.month + 1
+
+async def manage_partitions(months_ahead: int = 3, hot_months: int = 3, since: Optional[date] = None, drop: bool = True) -> Dict[str, Any]:
+    """Pre-create upcoming month partitions and drop emptied old ones"""
+    
+    print("🚀 Partition Management 開始")
+    
+    results = {"created": [], "dropped": [], "kept": []}
+    if settings.DATABASE_BACKEND == "local":
+        print("   ⏭️  ローカルバックエンドは daily_media_stats をパーティション化しません")
+        return results
+    
+    today = date.today()
+    start = min(since or today, today)
+    results["created"] = await instagram_repository.ensure_media_stats_partitions(start, months_between(start, today) + months_ahead)
+    print(f"   🧱 作成: {', '.join(results['created']) or 'なし'} ({today.strftime('%Y-%m')} から{months_ahead}か月先まで)")
+    
+    if drop:
+        cutoff = archive_cutoff(today, hot_months)
+        for partition in await instagram_repository.drop_empty_media_stats_partitions(cutoff):
+            results["dropped" if partition["dropped"] else "kept"].append(partition["partition_name"])
+        print(f"   🗑️  {cutoff} より前の空のパーティションを削除: {len(results['dropped'])}件")
+        if results["kept"]:
+            print(f"   📦 行が残っているため保持: {', '.join(results['kept'])} (archive_daily_stats.py / compact_daily_stats.py で移動)")
+    
+    print(f"🏁 Partition Management 完了: 作成 {len(results['created'])}件, 削除 {len(results['dropped'])}件")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-create and drop monthly daily_media_stats partitions")
+    parser.add_argument("--months-ahead", type=int, default=3, help="Months created ahead of the current month")
+    parser.add_argument("--hot-months", type=int, default=settings.STATS_ARCHIVE_HOT_MONTHS, help="Recent months never dropped, current month included")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="Also create partitions from this day's month")
+    parser.add_argument("--no-drop", action="store_true", help="Only create partitions")
+    args = parser.parse_args()
+    
+    asyncio.run(manage_partitions(args.months_ahead, args.hot_months, args.since, not args.no_drop))
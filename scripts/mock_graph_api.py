@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Mock Graph API Server
+
+Instagram Graph API のローカル代替サーバー (APIクォータ・トークンを使わないベンチマーク/テスト用)
+- /me/accounts, /oauth/access_token
+- /{ig_user_id}, /{ig_user_id}/media (カーソルページング・insights.metric(...) 展開), /{ig_user_id}/insights
+- /{media_id}, /{media_id}/insights
+- ?ids=a,b,c の複数ID取得, POST batch
+シード値から決定的な合成データを生成し、レイテンシ・エラー率・429・使用量ヘッダーを設定できる。
+
+使い方:
+    python scripts/mock_graph_api.py --port 8800 --latency-ms 50 --error-rate 0.01
+    INSTAGRAM_GRAPH_API_URL=http://127.0.0.1:8800/v23.0 python scripts/daily_data_collection.py
+
+fastapi / uvicorn (backend/requirements.txt) が必要。
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DEFAULT_API_VERSION = "v23.0"
+# Graph API batch requests accept at most 50 operations
+BATCH_LIMIT = 50
+# Nominal calls per window used for usage headers when rate limiting is off
+DEFAULT_USAGE_BUDGET = 4800
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+MEDIA_FIELDS = ['id', 'timestamp', 'media_type', 'media_product_type', 'caption', 'like_count', 'comments_count', 'media_url', 'thumbnail_url', 'permalink', 'username', 'shortcode']
+ACCOUNT_FIELDS = ['id', 'username', 'name', 'profile_picture_url', 'followers_count', 'follows_count', 'media_count', 'biography', 'website']
+# Media insight metrics per media type (views only on VIDEO, as the collector expects)
+MEDIA_METRICS = {
+    'IMAGE': ['reach', 'likes', 'comments', 'shares', 'saved', 'total_interactions'],
+    'CAROUSEL_ALBUM': ['reach', 'likes', 'comments', 'shares', 'saved', 'total_interactions'],
+    'VIDEO': ['reach', 'likes', 'comments', 'shares', 'saved', 'total_interactions', 'views']
+}
+ALL_MEDIA_METRICS = sorted({metric for metrics in MEDIA_METRICS.values() for metric in metrics})
+ACCOUNT_METRICS = ['reach', 'profile_views', 'website_clicks', 'accounts_engaged', 'total_interactions']
+
+class GraphError(Exception):
+    """Graph API error response"""
+    
+    def __init__(self, status: int, message: str, code: int, subcode: Optional[int] = None, is_transient: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.body = {
+            "error": {
+                "message": message,
+                "type": "OAuthException",
+                "code": code,
+                "fbtrace_id": "MockGraphApi"
+            }
+        }
+        if subcode is not None:
+            self.body["error"]["error_subcode"] = subcode
+        if is_transient:
+            self.body["error"]["is_transient"] = True
+
+class MockGraphConfig:
+    """Mock server settings (data size, latency and failure injection)"""
+    
+    def __init__(
+        self,
+        seed: int = 42,
+        accounts: int = 3,
+        posts_per_account: int = 60,
+        base_date: Optional[date] = None,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_calls: int = 0,
+        rate_limit_window_seconds: float = 3600.0
+    ):
+        self.seed = seed
+        self.accounts = accounts
+        self.posts_per_account = posts_per_account
+        # Metrics are generated as of this date (posts keep growing day by day)
+        self.base_date = base_date or date.today()
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        # Share of requests answered with a transient 500
+        self.error_rate = error_rate
+        # Calls per window before 429 responses (0 = unlimited)
+        self.rate_limit_calls = rate_limit_calls
+        self.rate_limit_window_seconds = rate_limit_window_seconds
+
+class MockGraphData:
+    """Deterministic synthetic pages, accounts, media and insights derived from the seed"""
+    
+    def __init__(self, config: MockGraphConfig):
+        self.config = config
+        self.pages: List[Dict] = []
+        self.accounts: Dict[str, Dict] = {}
+        self.media: Dict[str, Dict] = {}
+        self.media_by_account: Dict[str, List[str]] = {}
+        
+        for index in range(config.accounts):
+            self._generate_account(index)
+    
+    def _rng(self, *parts) -> random.Random:
+        return random.Random(":".join(str(part) for part in (self.config.seed,) + parts))
+    
+    def _generate_account(self, index: int):
+        rng = self._rng("account", index)
+        ig_user_id = f"178414{self.config.seed % 10000:04d}{index:07d}"
+        page_id = f"10{self.config.seed % 10000:04d}{index:09d}"
+        
+        self.pages.append({
+            "id": page_id,
+            "name": f"Mock Page {index + 1}",
+            "access_token": f"mock-page-token-{page_id}",
+            "instagram_business_account": {"id": ig_user_id}
+        })
+        
+        # Posts newest first, 0-3 days apart
+        published = datetime.combine(self.config.base_date, datetime.min.time()) - timedelta(hours=rng.randint(1, 20))
+        media_ids = []
+        for number in range(self.config.posts_per_account):
+            media_id = f"18{self.config.seed % 1000:03d}{index:05d}{number:08d}"
+            self.media[media_id] = self._generate_media(media_id, ig_user_id, f"mock_account_{index + 1}", published)
+            media_ids.append(media_id)
+            published -= timedelta(days=rng.randint(0, 3), hours=rng.randint(0, 23))
+        
+        self.media_by_account[ig_user_id] = media_ids
+        self.accounts[ig_user_id] = {
+            "id": ig_user_id,
+            "username": f"mock_account_{index + 1}",
+            "name": f"Mock Account {index + 1}",
+            "profile_picture_url": f"https://example.com/mock/{ig_user_id}.jpg",
+            "biography": "Mock Graph API account",
+            "website": "https://example.com",
+            "base_followers": rng.randint(500, 50000),
+            "daily_growth": rng.uniform(-2, 40),
+            "follows_count": rng.randint(50, 1500),
+            "media_count": len(media_ids)
+        }
+    
+    def _generate_media(self, media_id: str, ig_user_id: str, username: str, published: datetime) -> Dict:
+        rng = self._rng("media", media_id)
+        media_type = rng.choices(['IMAGE', 'CAROUSEL_ALBUM', 'VIDEO'], weights=[5, 2, 3])[0]
+        shortcode = f"MOCK{media_id[-8:]}"
+        return {
+            "id": media_id,
+            "ig_user_id": ig_user_id,
+            "username": username,
+            "timestamp": published.strftime("%Y-%m-%dT%H:%M:%S+0000"),
+            "media_type": media_type,
+            "media_product_type": 'REELS' if media_type == 'VIDEO' and rng.random() < 0.8 else 'FEED',
+            "caption": f"Mock post {media_id[-4:]} #mock",
+            "media_url": f"https://example.com/mock/{media_id}.jpg",
+            "thumbnail_url": f"https://example.com/mock/{media_id}_thumb.jpg" if media_type == 'VIDEO' else None,
+            "permalink": f"https://www.instagram.com/p/{shortcode}/",
+            "shortcode": shortcode,
+            # Lifetime reach potential and how fast it is reached
+            "potential_reach": rng.lognormvariate(7, 0.8),
+            "half_life_days": rng.uniform(0.5, 6),
+            "like_rate": rng.uniform(0.02, 0.12),
+            "comment_rate": rng.uniform(0.001, 0.01),
+            "share_rate": rng.uniform(0.0, 0.02),
+            "save_rate": rng.uniform(0.0, 0.03),
+            "views_ratio": rng.uniform(1.5, 3.5)
+        }
+    
+    def media_metrics(self, media: Dict) -> Dict[str, int]:
+        """Lifetime metrics of a post as of base_date"""
+        published = datetime.strptime(media["timestamp"][:10], "%Y-%m-%d").date()
+        age_days = max((self.config.base_date - published).days, 0)
+        reach = int(media["potential_reach"] * (1 - math.exp(-(age_days + 1) / media["half_life_days"])))
+        metrics = {
+            "reach": reach,
+            "likes": int(reach * media["like_rate"]),
+            "comments": int(reach * media["comment_rate"]),
+            "shares": int(reach * media["share_rate"]),
+            "saved": int(reach * media["save_rate"]),
+            "views": int(reach * media["views_ratio"])
+        }
+        metrics["total_interactions"] = metrics["likes"] + metrics["comments"] + metrics["shares"] + metrics["saved"]
+        return metrics
+    
+    def media_object(self, media: Dict) -> Dict:
+        metrics = self.media_metrics(media)
+        public = {field: media.get(field) for field in MEDIA_FIELDS if media.get(field) is not None}
+        public["like_count"] = metrics["likes"]
+        public["comments_count"] = metrics["comments"]
+        return public
+    
+    def account_object(self, account: Dict) -> Dict:
+        day_index = (self.config.base_date - date(2024, 1, 1)).days
+        public = {field: account.get(field) for field in ACCOUNT_FIELDS if account.get(field) is not None}
+        public["followers_count"] = max(int(account["base_followers"] + account["daily_growth"] * day_index), 0)
+        return public
+    
+    def account_metric(self, ig_user_id: str, metric: str) -> int:
+        rng = self._rng("account_insights", ig_user_id, self.config.base_date.isoformat(), metric)
+        scale = {"reach": 3000, "profile_views": 150, "website_clicks": 12, "accounts_engaged": 200, "total_interactions": 400}[metric]
+        return int(rng.uniform(0.3, 1.7) * scale)
+
+def split_fields(fields: str) -> List[str]:
+    """Split a fields parameter on top-level commas (keeps insights.metric(a,b) together)"""
+    parts, depth, current = [], 0, ''
+    for char in fields:
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        depth += (char == '(') - (char == ')')
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+class MockGraphApi:
+    """Request dispatcher shared by plain HTTP requests and batch operations"""
+    
+    def __init__(self, config: MockGraphConfig):
+        self.config = config
+        self.data = MockGraphData(config)
+        self.request_counts: Dict[str, int] = {}
+        self._calls: deque = deque()
+        self._rng = random.Random(config.seed)
+    
+    # --- Call accounting and failure injection ---
+    
+    def count(self, kind: str):
+        self.request_counts[kind] = self.request_counts.get(kind, 0) + 1
+    
+    def record_calls(self, calls: int = 1):
+        """Add calls to the rate limit window"""
+        now = time.monotonic()
+        self._calls.extend([now] * calls)
+        while self._calls and now - self._calls[0] > self.config.rate_limit_window_seconds:
+            self._calls.popleft()
+    
+    def usage_percent(self) -> int:
+        budget = self.config.rate_limit_calls or DEFAULT_USAGE_BUDGET
+        return min(int(len(self._calls) * 100 / budget), 100)
+    
+    def usage_headers(self, ig_user_id: Optional[str]) -> Dict[str, str]:
+        usage = self.usage_percent()
+        headers = {"X-App-Usage": json.dumps({"call_count": usage, "total_cputime": usage // 2, "total_time": usage // 2})}
+        if ig_user_id:
+            headers["X-Business-Use-Case-Usage"] = json.dumps({ig_user_id: [{
+                "type": "instagram",
+                "call_count": usage,
+                "total_cputime": usage // 2,
+                "total_time": usage // 2,
+                "estimated_time_to_regain_access": 0 if usage < 100 else int(self.config.rate_limit_window_seconds // 60)
+            }]})
+        return headers
+    
+    def check_limits(self):
+        """Raise 429 when over the rate limit, or a transient 500 at the configured error rate"""
+        if self.config.rate_limit_calls and len(self._calls) > self.config.rate_limit_calls:
+            raise GraphError(429, "(#4) Application request limit reached", 4, is_transient=True)
+        if self.config.error_rate and self._rng.random() < self.config.error_rate:
+            raise GraphError(500, "An unexpected error has occurred. Please retry your request later.", 2, is_transient=True)
+    
+    async def delay(self):
+        if self.config.latency_ms or self.config.latency_jitter_ms:
+            await asyncio.sleep((self.config.latency_ms + self._rng.random() * self.config.latency_jitter_ms) / 1000)
+    
+    # --- Dispatch ---
+    
+    def dispatch(self, path: str, params: Dict[str, str]) -> Tuple[str, Any]:
+        """Handle a GET request path (without API version); returns (endpoint kind, response body)"""
+        parts = [part for part in path.strip('/').split('/') if part]
+        
+        if parts == ['oauth', 'access_token']:
+            return 'oauth', self.exchange_token(params)
+        
+        self.require_token(params)
+        if not parts:
+            if 'ids' not in params:
+                raise GraphError(400, "(#100) Missing 'ids' parameter", 100)
+            return 'ids', self.get_objects(params['ids'].split(','), params.get('fields'))
+        if parts == ['me', 'accounts']:
+            return 'me/accounts', {"data": self.data.pages}
+        if len(parts) == 1:
+            return 'object', self.get_object(parts[0], params.get('fields'))
+        if len(parts) == 2 and parts[1] == 'media' and parts[0] in self.data.accounts:
+            return 'media', self.list_media(parts[0], params)
+        if len(parts) == 2 and parts[1] == 'insights' and parts[0] in self.data.accounts:
+            return 'account_insights', self.account_insights(parts[0], params)
+        if len(parts) == 2 and parts[1] == 'insights' and parts[0] in self.data.media:
+            return 'media_insights', {"data": self.media_insights(parts[0], params.get('metric', ''))}
+        raise GraphError(400, f"Unsupported get request. Object with ID '{parts[0]}' does not exist, cannot be loaded due to missing permissions, or does not support this operation.", 100, 33)
+    
+    def require_token(self, params: Dict[str, str]):
+        token = params.get('access_token')
+        if not token:
+            raise GraphError(400, "An active access token must be used to query information about the current user.", 2500)
+        if token == 'expired':
+            raise GraphError(401, "Error validating access token: Session has expired.", 190, 463)
+    
+    def exchange_token(self, params: Dict[str, str]) -> Dict:
+        if params.get('grant_type') != 'fb_exchange_token' or not params.get('fb_exchange_token'):
+            raise GraphError(400, "Missing or invalid grant_type / fb_exchange_token", 100)
+        return {
+            "access_token": f"mock-long-lived-{hashlib.sha256(params['fb_exchange_token'].encode()).hexdigest()[:24]}",
+            "token_type": "bearer",
+            "expires_in": 5183944
+        }
+    
+    def get_objects(self, ids: List[str], fields: Optional[str]) -> Dict:
+        return {object_id: self.get_object(object_id, fields) for object_id in ids}
+    
+    def get_object(self, object_id: str, fields: Optional[str]) -> Dict:
+        if object_id in self.data.media:
+            return self.select_media(self.data.media[object_id], fields or 'id')
+        if object_id in self.data.accounts:
+            account = self.data.account_object(self.data.accounts[object_id])
+            return self.select(account, split_fields(fields or 'id'))
+        raise GraphError(400, f"Unsupported get request. Object with ID '{object_id}' does not exist, cannot be loaded due to missing permissions, or does not support this operation.", 100, 33)
+    
+    def select(self, source: Dict, fields: List[str]) -> Dict:
+        selected = {field: source[field] for field in fields if field in source}
+        selected["id"] = source["id"]
+        return selected
+    
+    def select_media(self, media: Dict, fields: str) -> Dict:
+        plain, nested = [], []
+        for field in split_fields(fields):
+            (nested if field.startswith('insights') else plain).append(field)
+        selected = self.select(self.data.media_object(media), plain)
+        for field in nested:
+            # insights.metric(reach,saved)
+            match = re.fullmatch(r'insights\.metric\(([^)]*)\)', field)
+            if not match:
+                raise GraphError(400, f"(#100) Invalid field expansion: {field}", 100)
+            selected["insights"] = {"data": self.media_insights(media["id"], match.group(1))}
+        return selected
+    
+    def list_media(self, ig_user_id: str, params: Dict[str, str]) -> Dict:
+        media_ids = self.data.media_by_account[ig_user_id]
+        limit = min(int(params.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        start = int(params['after']) if params.get('after') else 0
+        page_ids = media_ids[start:start + limit]
+        fields = params.get('fields', 'id')
+        
+        page = {
+            "data": [self.select_media(self.data.media[media_id], fields) for media_id in page_ids],
+            "paging": {"cursors": {"before": str(start), "after": str(start + len(page_ids))}}
+        }
+        if start + len(page_ids) < len(media_ids):
+            page["paging"]["next"] = f"/{ig_user_id}/media?after={start + len(page_ids)}&limit={limit}"
+        return page
+    
+    def media_insights(self, media_id: str, metric_param: str) -> List[Dict]:
+        media = self.data.media[media_id]
+        metrics = [metric for metric in metric_param.split(',') if metric]
+        if not metrics:
+            raise GraphError(400, "(#100) The parameter metric is required", 100)
+        
+        values = self.data.media_metrics(media)
+        supported = MEDIA_METRICS[media["media_type"]]
+        insights = []
+        for metric in metrics:
+            if metric not in ALL_MEDIA_METRICS:
+                raise GraphError(400, f"(#100) metric[0] must be one of the following values: {', '.join(ALL_MEDIA_METRICS)}", 100)
+            if metric not in supported:
+                raise GraphError(400, f"(#100) The Media Insights API does not support the {metric} metric for this media product type.", 100, 2108006)
+            insights.append({
+                "name": metric,
+                "period": "lifetime",
+                "values": [{"value": values[metric]}],
+                "title": metric,
+                "id": f"{media_id}/insights/{metric}/lifetime"
+            })
+        return insights
+    
+    def account_insights(self, ig_user_id: str, params: Dict[str, str]) -> Dict:
+        metrics = [metric for metric in params.get('metric', '').split(',') if metric]
+        if not metrics:
+            raise GraphError(400, "(#100) The parameter metric is required", 100)
+        unknown = [metric for metric in metrics if metric not in ACCOUNT_METRICS]
+        if unknown:
+            raise GraphError(400, f"(#100) metric[0] must be one of the following values: {', '.join(ACCOUNT_METRICS)}", 100)
+        if params.get('metric_type') != 'total_value':
+            raise GraphError(400, "(#100) The following metrics should be specified with parameter metric_type=total_value", 100)
+        
+        return {"data": [
+            {
+                "name": metric,
+                "period": params.get('period', 'day'),
+                "title": metric,
+                "description": "",
+                "total_value": {"value": self.data.account_metric(ig_user_id, metric)},
+                "id": f"{ig_user_id}/insights/{metric}/{params.get('period', 'day')}"
+            }
+            for metric in metrics
+        ]}
+    
+    def batch(self, operations: List[Dict], access_token: Optional[str]) -> List[Dict]:
+        """Run batch operations; each returns {code, headers, body} like the Graph API"""
+        if len(operations) > BATCH_LIMIT:
+            raise GraphError(400, f"(#100) Too many requests in batch message. Maximum batch size is {BATCH_LIMIT}", 100)
+        
+        responses = []
+        for operation in operations:
+            url = urlsplit(operation.get('relative_url', ''))
+            params = dict(parse_qsl(url.query))
+            params.setdefault('access_token', access_token)
+            try:
+                if operation.get('method', 'GET').upper() != 'GET':
+                    raise GraphError(400, "(#100) Only GET operations are supported by the mock", 100)
+                kind, body = self.dispatch(url.path, params)
+                self.count(f"batch:{kind}")
+                code = 200
+            except GraphError as e:
+                self.count(f"batch:error:{e.status}")
+                code, body = e.status, e.body
+            responses.append({
+                "code": code,
+                "headers": [{"name": "Content-Type", "value": "application/json; charset=UTF-8"}],
+                "body": json.dumps(body)
+            })
+        return responses
+
+def first_account_id(api: MockGraphApi, path: str) -> Optional[str]:
+    """Account id for business use case usage headers"""
+    for part in path.strip('/').split('/'):
+        if part in api.data.accounts:
+            return part
+        if part in api.data.media:
+            return api.data.media[part]["ig_user_id"]
+    return None
+
+def create_app(config: Optional[MockGraphConfig] = None) -> FastAPI:
+    """Create the mock Graph API application"""
+    api = MockGraphApi(config or MockGraphConfig())
+    app = FastAPI(title="Mock Graph API")
+    app.state.api = api
+    
+    @app.get("/__stats")
+    async def stats():
+        """Request counts per endpoint kind (for benchmarks)"""
+        total = sum(count for kind, count in api.request_counts.items() if not kind.startswith("batch:"))
+        return {"total": total, "by_endpoint": api.request_counts}
+    
+    @app.post("/__reset")
+    async def reset():
+        """Reset request counts and the rate limit window"""
+        api.request_counts.clear()
+        api._calls.clear()
+        return {"success": True}
+    
+    @app.api_route("/{version}/{path:path}", methods=["GET", "POST"])
+    async def graph(version: str, path: str, request: Request):
+        params = dict(request.query_params)
+        ig_user_id = first_account_id(api, path)
+        await api.delay()
+        
+        try:
+            if request.method == "POST":
+                form = dict(await request.form())
+                params.update(form)
+                if path.strip('/') or 'batch' not in params:
+                    raise GraphError(400, "(#100) Only batch requests are supported for POST", 100)
+                operations = json.loads(params['batch'])
+                # Each batch operation counts as a call
+                api.record_calls(len(operations))
+                api.check_limits()
+                api.count("batch")
+                body = api.batch(operations, params.get('access_token'))
+            else:
+                api.record_calls()
+                api.check_limits()
+                kind, body = api.dispatch(path, params)
+                api.count(kind)
+            return JSONResponse(body, headers=api.usage_headers(ig_user_id))
+        except GraphError as e:
+            api.count(f"error:{e.status}")
+            return JSONResponse(e.body, status_code=e.status, headers=api.usage_headers(ig_user_id))
+    
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of the Instagram Graph API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--accounts", type=int, default=3)
+    parser.add_argument("--posts", type=int, default=60, help="Posts per account")
+    parser.add_argument("--base-date", type=date.fromisoformat, default=None, help="Date metrics are generated for (default: today)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a transient 500")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Calls per window before 429 (0 = unlimited)")
+    parser.add_argument("--rate-window", type=float, default=3600.0, help="Rate limit window in seconds")
+    args = parser.parse_args()
+    
+    import uvicorn
+    
+    config = MockGraphConfig(
+        seed=args.seed,
+        accounts=args.accounts,
+        posts_per_account=args.posts,
+        base_date=args.base_date,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_calls=args.rate_limit,
+        rate_limit_window_seconds=args.rate_window
+    )
+    print(f"🧪 Mock Graph API: http://{args.host}:{args.port}/{DEFAULT_API_VERSION} ({args.accounts}アカウント x {args.posts}投稿, seed={args.seed})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Media Trajectory Rebuild Script
+
+daily_media_stats の履歴から投稿メトリクス推移 (media_trajectories) を再構築するスクリプト
+- テーブル追加後の初回バックフィル
+- 推移データの不整合修復
+日次収集では save_daily_media_stats が当日分を追記するため、通常は実行不要。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import Dict, Any, List, Optional
+
+# Backend path setup
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from repositories.instagram_repository import instagram_repository
+
+async def rebuild_all_trajectories(ig_user_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Rebuild post trajectories for the given accounts (all accounts when omitted)"""
+    
+    print("🚀 Media Trajectory Rebuild 開始")
+    
+    if not ig_user_ids:
+        accounts = await instagram_repository.get_all()
+        ig_user_ids = [account.ig_user_id for account in accounts]
+    
+    results = {
+        "accounts": len(ig_user_ids),
+        "trajectories": 0
+    }
+    
+    for ig_user_id in ig_user_ids:
+        rebuilt = await instagram_repository.rebuild_media_trajectories(ig_user_id)
+        results["trajectories"] += rebuilt
+        print(f"   📈 {ig_user_id}: {rebuilt}件")
+    
+    print(f"🏁 Media Trajectory Rebuild 完了: {results['accounts']}アカウント, {results['trajectories']}件")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild media trajectories from daily_media_stats history")
+    parser.add_argument("ig_user_ids", nargs="*", help="Target account ids (default: all accounts)")
+    args = parser.parse_args()
+    
+    asyncio.run(rebuild_all_trajectories(args.ig_user_ids))
@@ -27,7 +27,8 @@ def setup_environment():
         'DEBUG_MODE',
         'GITHUB_REPOSITORY',
         'GITHUB_RUN_ID',
-        'GITHUB_SHA'
+        'GITHUB_SHA',
+        'CACHE_WARMUP_API_URL'
     ]
     
     print("📋 必須環境変数チェック:")